@@ -1,11 +1,12 @@
-from fastapi import Request, Depends
+from fastapi import Request, Response, Depends
 from platform_common.db.dal.user_dal import UserDAL
 from app.api.interface.abstract_handler import AbstractHandler
-from platform_common.utils.service_response import ServiceResponse
 from platform_common.logging.logging import get_logger
 from platform_common.models.user import User
-from platform_common.db.dependencies.get_dal import get_dal
-from platform_common.db.dal.user_dal import UserDAL
+from app.api.negotiation import read_payload, respond
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
+from app.pubsub.events.user_events import publish_user_updated_event
+from app.search.sync import index_user
 from platform_common.errors.base import (
     BadRequestError,
 )  # or your custom error
@@ -20,17 +21,18 @@ class CreateUserHandler(AbstractHandler):
 
     def __init__(
         self,
-        user_dal: UserDAL = Depends(get_dal(UserDAL)),
+        uow: UnitOfWork = Depends(get_unit_of_work),
     ):
         super().__init__()
-        self.user_dal = user_dal
+        self.uow = uow
+        self.user_dal = uow.get(UserDAL)
 
-    async def do_process(self, request: Request) -> ServiceResponse:
+    async def do_process(self, request: Request) -> Response:
         """
         Handle the request to create a user.
         """
         try:
-            payload = await request.json()
+            payload = await read_payload(request)
             user = User(**payload)
 
         except TypeError as e:
@@ -38,9 +40,12 @@ class CreateUserHandler(AbstractHandler):
             raise BadRequestError(message="Invalid user data", code="INVALID_PAYLOAD")
 
         created_user = await self.user_dal.create(user)
-        logger.info(f"User created: {created_user.id}")
-        return ServiceResponse(
-            message="User created successfully",
-            status_code=201,
-            data=created_user.dict(),
+        await self.uow.commit()
+        index_user(created_user)
+        await publish_user_updated_event(
+            user_id=created_user.id,
+            email=created_user.email,
+            username=created_user.username,
         )
+        logger.info(f"User created: {created_user.id}")
+        return respond(request, "User created successfully", 201, created_user)
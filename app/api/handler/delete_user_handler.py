@@ -1,10 +1,14 @@
-from fastapi import Request, Depends
-from platform_common.db.dal.user_dal import UserDAL
+from fastapi import Request, Response, Depends
 from app.api.interface.abstract_handler import AbstractHandler
-from platform_common.utils.service_response import ServiceResponse
 from platform_common.logging.logging import get_logger
 from platform_common.errors.base import NotFoundError
-from platform_common.db.dependencies.get_dal import get_dal
+from platform_common.utils.time_helpers import get_current_epoch
+from app.api.negotiation import respond
+from app.db.dal.hot_path import HotPathUserDAL, HotPathUserSessionDAL
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
+from app.jobs.user_purge import enqueue_purge
+from app.pubsub.events.user_events import publish_user_deleted_event
+from app.search.sync import unindex_user
 
 logger = get_logger("delete_user_handler")
 
@@ -12,22 +16,31 @@ logger = get_logger("delete_user_handler")
 class DeleteUserHandler(AbstractHandler):
     """
     Handler for deleting a user by ID.
+
+    The request does a fixed amount of work however much data the user has:
+    it marks the user deleted, revokes their sessions and queues a purge job
+    in one transaction. Dependent rows are removed later, in batches, by
+    app/jobs/user_purge.py.
     """
 
-    def __init__(self, user_dal: UserDAL = Depends(get_dal(UserDAL))):
+    def __init__(self, uow: UnitOfWork = Depends(get_unit_of_work)):
         super().__init__()
-        self.user_dal = user_dal
+        self.uow = uow
+        self.user_dal = uow.get(HotPathUserDAL)
+        self.session_dal = uow.get(HotPathUserSessionDAL)
+
+    async def do_process(self, request: Request, user_id: str) -> Response:
+        user = await self.user_dal.get_by_id(user_id)
+        if user is None:
+            raise NotFoundError(message="User not found", code="USER_NOT_FOUND")
 
-    async def do_process(self, user_id: str) -> ServiceResponse:
-        deleted = await self.user_dal.delete(user_id)
+        await self.user_dal.soft_delete(user_id)
+        revoked = await self.session_dal.revoke_all_for_user(user_id)
+        await enqueue_purge(self.uow.session, user_id, int(get_current_epoch()))
+        await self.uow.commit()
 
-        if not deleted:
-            raise NotFoundError(
-                message="User not found or could not be deleted", code="USER_NOT_FOUND"
-            )
+        logger.info("User deleted", user_id=user_id, sessions_revoked=revoked)
+        unindex_user(user_id)
+        await publish_user_deleted_event(user_id)
 
-        return ServiceResponse(
-            message="User deleted successfully",
-            status_code=200,
-            data={"user_id": user_id},
-        )
+        return respond(request, "User deleted successfully", 200, {"user_id": user_id})
@@ -1,20 +1,25 @@
 from fastapi import Request, Depends
-from platform_common.db.dal.organization_invite_dal import OrganizationInviteDAL
 from platform_common.db.dal.organization_member_dal import OrganizationMemberDAL
-from platform_common.db.dal.user_dal import UserDAL
-from platform_common.db.dal.user_session_dal import UserSessionDAL
+from app.db.dal.hot_path import (
+    HotPathOrganizationInviteDAL,
+    HotPathUserDAL,
+    HotPathUserSessionDAL,
+)
 from app.api.interface.abstract_handler import AbstractHandler
 from platform_common.utils.service_response import ServiceResponse
 from platform_common.logging.logging import get_logger
-from platform_common.db.dependencies.get_dal import get_dal
-from platform_common.models.user import User
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
 from platform_common.utils.time_helpers import get_current_epoch
 from platform_common.errors.base import AuthError, BadRequestError
 from platform_common.models.organization_invite import OrganizationInvite
 from platform_common.utils.invite_tokens import hash_invite_token
-from firebase_admin import auth as firebase_auth
+from app.auth.providers import is_trusted_oauth_provider
+from app.auth.token_verifier import verify_id_token
+from app.resilience.breaker import DependencyUnavailableError
 from platform_common.auth.jwt_utils import create_jwt
 from app.pubsub.events.user_events import publish_user_verified_event
+from app.invites.token_guard import invite_token_guard
+from app.search.sync import index_user
 import secrets
 import os
 
@@ -22,27 +27,19 @@ import os
 logger = get_logger("exchange_token_handler")
 
 
-def _is_trusted_oauth_provider(provider: str | None) -> bool:
-    return provider in {"google.com", "github.com"}
-
-
 class ExchangeFirebaseTokenHandler(AbstractHandler):
     def __init__(
         self,
-        user_dal: UserDAL = Depends(get_dal(UserDAL)),
-        session_dal: UserSessionDAL = Depends(get_dal(UserSessionDAL)),
-        organization_invite_dal: OrganizationInviteDAL = Depends(
-            get_dal(OrganizationInviteDAL)
-        ),
-        organization_member_dal: OrganizationMemberDAL = Depends(
-            get_dal(OrganizationMemberDAL)
-        ),
+        uow: UnitOfWork = Depends(get_unit_of_work),
     ):
         super().__init__()
-        self.user_dal = user_dal
-        self.session_dal = session_dal
-        self.organization_invite_dal = organization_invite_dal
-        self.organization_member_dal = organization_member_dal
+        # All four DALs share one connection/transaction; user create, invite
+        # acceptance and session create commit together at the end.
+        self.uow = uow
+        self.user_dal = uow.get(HotPathUserDAL)
+        self.session_dal = uow.get(HotPathUserSessionDAL)
+        self.organization_invite_dal = uow.get(HotPathOrganizationInviteDAL)
+        self.organization_member_dal = uow.get(OrganizationMemberDAL)
 
     async def do_process(self, request: Request) -> ServiceResponse:
         authorization = request.headers.get("authorization")
@@ -52,7 +49,9 @@ class ExchangeFirebaseTokenHandler(AbstractHandler):
         id_token = authorization.replace("Bearer ", "").strip()
 
         try:
-            decoded_token = firebase_auth.verify_id_token(id_token)
+            decoded_token = await verify_id_token(id_token)
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             logger.warning(f"Invalid Firebase token: {e}")
             raise AuthError("Invalid Firebase ID token")
@@ -64,65 +63,59 @@ class ExchangeFirebaseTokenHandler(AbstractHandler):
         team_invite = None
         if team_invite_token:
             token_hash = hash_invite_token(team_invite_token)
+            if not await invite_token_guard.admits(token_hash):
+                raise AuthError("Invalid team invite token")
             team_invite = await self.organization_invite_dal.get_by_token_hash(token_hash)
             if not team_invite:
+                invite_token_guard.remember_missing(token_hash)
                 raise AuthError("Invalid team invite token")
             if team_invite.status != OrganizationInvite.Status.PENDING:
                 raise AuthError("Team invite is not pending")
+            # Overdue invites are flipped to expired by the background sweeper
             if team_invite.expires_at < get_current_epoch():
-                await self.organization_invite_dal.mark_expired(team_invite)
                 raise AuthError("Team invite has expired")
             if not email or team_invite.email.strip().lower() != email.strip().lower():
                 raise AuthError("Invite email does not match current user")
 
         sign_in_provider = decoded_token.get("firebase", {}).get("sign_in_provider")
-        trusted_oauth = _is_trusted_oauth_provider(sign_in_provider)
+        trusted_oauth = is_trusted_oauth_provider(sign_in_provider)
         effective_email_verified = bool(
             email_verified or (trusted_oauth and email) or team_invite
         )
 
-        # Find or create user
-        user = await self.user_dal.get_by_idp_uid(uid)
-        just_created = False
-
-        if not user:
-            if not email:
-                raise BadRequestError("Email required to create user")
-
-            user = User(
+        # Find or create user in one statement; concurrent first logins
+        # (two tabs) converge on the same row instead of one failing on the
+        # idp_uid unique constraint.
+        if email:
+            upserted = await self.user_dal.upsert_from_idp(
                 idp_uid=uid,
                 email=email,
                 username=email.split("@")[0],
                 # Treat trusted OAuth providers as verified when email is present.
                 is_verified=effective_email_verified,
             )
-            user = await self.user_dal.create(user)
-            just_created = True
-            logger.info(f"Created new user from Firebase: {user.id}")
+            if upserted is None:
+                raise AuthError("User account has been deleted")
+            user, just_created, newly_verified = upserted
+        else:
+            user = await self.user_dal.get_by_idp_uid(uid)
+            if not user:
+                raise BadRequestError("Email required to create user")
+            # Without an email only an invite could verify, and invites
+            # require one; nothing to upgrade here.
+            just_created = newly_verified = False
 
-        # track previous verification state
-        was_verified_before = bool(getattr(user, "is_verified", False))
+        if just_created:
+            logger.info("Created new user from Firebase", user_id=user.id)
 
         if not user.is_verified:
-            if effective_email_verified:
-                user = await self.user_dal.update(user.id, {"is_verified": True})
-            else:
-                raise AuthError("Email not verified")
+            # Rolled back with the unit of work, including a fresh insert
+            raise AuthError("Email not verified")
 
         # 🔑 If user is verified now and wasn't before, emit user_verified
-        if user.is_verified and (just_created or not was_verified_before):
-            org_id = getattr(user, "organization_id", None)
-            logger.info(
-                "Emitting user_verified event for user_id=%s organization_id=%s",
-                user.id,
-                org_id,
-            )
-            await publish_user_verified_event(
-                user_id=user.id,
-                organization_id=org_id,
-                email=user.email,
-                username=getattr(user, "username", None),
-            )
+        # (published after the unit of work commits so subscribers can read
+        # the user row)
+        emit_user_verified = bool(just_created or newly_verified)
 
         if team_invite:
             existing_membership = await self.organization_member_dal.get_active_by_user_and_org(
@@ -154,7 +147,22 @@ class ExchangeFirebaseTokenHandler(AbstractHandler):
             user_agent=request.headers.get("user-agent"),
         )
 
-        logger.info(f"Session created: {session.id} for user {user.id}")
+        logger.info("Session created", session_id=session.id, user_id=user.id)
+        await self.uow.commit()
+        if just_created:
+            index_user(user)
+
+        if emit_user_verified:
+            org_id = getattr(user, "organization_id", None)
+            logger.info(
+                "Emitting user_verified event", user_id=user.id, organization_id=org_id
+            )
+            await publish_user_verified_event(
+                user_id=user.id,
+                organization_id=org_id,
+                email=user.email,
+                username=getattr(user, "username", None),
+            )
 
         token_payload = {
             "sub": user.id,
@@ -163,7 +171,7 @@ class ExchangeFirebaseTokenHandler(AbstractHandler):
         access_token = create_jwt(payload=token_payload, expires_in=access_token_exp)
 
         is_local = os.getenv("ENVIRONMENT", "local") == "local"
-        logger.info(f"is_local: {is_local}")
+        logger.debug("Cookie mode", is_local=is_local)
 
         service_response = ServiceResponse(
             message="Login successful",
@@ -192,5 +200,5 @@ class ExchangeFirebaseTokenHandler(AbstractHandler):
             path="/",
         )
 
-        logger.info(f"Access token created for user {user.id}")
+        logger.info("Access token created", user_id=user.id)
         return service_response
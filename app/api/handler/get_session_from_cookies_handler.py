@@ -1,10 +1,9 @@
 from fastapi import Request, Depends
-from platform_common.db.dal.user_dal import UserDAL
-from platform_common.db.dal.user_session_dal import UserSessionDAL
 from app.api.interface.abstract_handler import AbstractHandler
 from platform_common.utils.service_response import ServiceResponse
 from platform_common.logging.logging import get_logger
-from platform_common.db.dependencies.get_dal import get_dal
+from app.db.dal.hot_path import HotPathUserDAL, HotPathUserSessionDAL
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
 from platform_common.utils.time_helpers import get_current_epoch
 from platform_common.errors.base import AuthError
 from platform_common.auth.jwt_utils import create_jwt
@@ -17,12 +16,12 @@ logger = get_logger("get_session_handler")
 class GetSessionFromCookiesHandler(AbstractHandler):
     def __init__(
         self,
-        user_dal: UserDAL = Depends(get_dal(UserDAL)),
-        session_dal: UserSessionDAL = Depends(get_dal(UserSessionDAL)),
+        uow: UnitOfWork = Depends(get_unit_of_work),
     ):
         super().__init__()
-        self.user_dal = user_dal
-        self.session_dal = session_dal
+        self.uow = uow
+        self.user_dal = uow.get(HotPathUserDAL)
+        self.session_dal = uow.get(HotPathUserSessionDAL)
 
     async def do_process(self, request: Request) -> ServiceResponse:
         """
@@ -47,9 +46,10 @@ class GetSessionFromCookiesHandler(AbstractHandler):
 
         now = int(get_current_epoch())
         if session.expires_at <= now:
-            logger.info(f"Session expired for session {session.id}")
+            logger.info("Session expired", session_id=session.id)
             # You may optionally revoke here
             await self.session_dal.revoke_session(session.id)
+            await self.uow.commit()
             raise AuthError("Session expired")
 
         # Load user
@@ -63,6 +63,7 @@ class GetSessionFromCookiesHandler(AbstractHandler):
 
         # Optionally update last_active_at
         await self.session_dal.update_last_active(session.id)
+        await self.uow.commit()
 
         is_local = os.getenv("ENVIRONMENT", "local") == "local"
 
@@ -1,11 +1,11 @@
-from fastapi import Request, Depends
-from platform_common.db.dal.user_dal import UserDAL
+from fastapi import Request, Response, Depends
 from app.api.interface.abstract_handler import AbstractHandler
-from platform_common.utils.service_response import ServiceResponse
 from platform_common.logging.logging import get_logger
 from platform_common.errors.base import NotFoundError
 from platform_common.errors.base import BadRequestError
-from platform_common.db.dependencies.get_dal import get_dal
+from app.api.negotiation import respond
+from app.db.dal.hot_path import HotPathUserDAL
+from app.db.unit_of_work import UnitOfWork, get_read_unit_of_work
 
 logger = get_logger("get_user_handler")
 
@@ -15,11 +15,11 @@ class GetUserHandler(AbstractHandler):
     Handler for retrieving a user by ID.
     """
 
-    def __init__(self, user_dal: UserDAL = Depends(get_dal(UserDAL))):
+    def __init__(self, uow: UnitOfWork = Depends(get_read_unit_of_work)):
         super().__init__()
-        self.user_dal = user_dal
+        self.user_dal = uow.get(HotPathUserDAL)
 
-    async def do_process(self, request: Request) -> ServiceResponse:
+    async def do_process(self, request: Request) -> Response:
 
         email = request.query_params.get("email")
         user_id = request.query_params.get("user_id")
@@ -47,8 +47,4 @@ class GetUserHandler(AbstractHandler):
         if not user:
             raise NotFoundError(message="User not found", code="USER_NOT_FOUND")
 
-        return ServiceResponse(
-            message="User retrieved successfully",
-            status_code=200,
-            data=user.dict(),
-        )
+        return respond(request, "User retrieved successfully", 200, user)
@@ -1,9 +1,9 @@
-from fastapi import Request, Depends
-from platform_common.db.dal.user_dal import UserDAL
+from fastapi import Request, Response, Depends
+from app.db.dal.hot_path import HotPathUserDAL
 from app.api.interface.abstract_handler import AbstractHandler
-from platform_common.utils.service_response import ServiceResponse
 from platform_common.logging.logging import get_logger
-from platform_common.db.dependencies.get_dal import get_dal
+from app.api.negotiation import respond
+from app.db.unit_of_work import UnitOfWork, get_read_unit_of_work
 
 logger = get_logger("get_user_list_handler")
 
@@ -13,11 +13,11 @@ class GetUserListHandler(AbstractHandler):
     Handler for retrieving a list of users.
     """
 
-    def __init__(self, user_dal: UserDAL = Depends(get_dal(UserDAL))):
+    def __init__(self, uow: UnitOfWork = Depends(get_read_unit_of_work)):
         super().__init__()
-        self.user_dal = user_dal
+        self.user_dal = uow.get(HotPathUserDAL)
 
-    async def do_process(self, request: Request) -> ServiceResponse:
+    async def do_process(self, request: Request) -> Response:
 
         raw_filters = dict(request.query_params)
 
@@ -39,8 +39,4 @@ class GetUserListHandler(AbstractHandler):
 
         users = await self.user_dal.get_list(filters=normalized_filters)
 
-        return ServiceResponse(
-            message="User list retrieved successfully",
-            status_code=200,
-            data=[user.dict() for user in users],
-        )
+        return respond(request, "User list retrieved successfully", 200, users)
@@ -1,10 +1,7 @@
 import secrets
 from fastapi import Depends, Request
 from platform_common.utils.service_response import ServiceResponse
-from platform_common.db.dal.user_dal import UserDAL
-from platform_common.db.dal.user_session_dal import UserSessionDAL
 from platform_common.errors.base import AuthError
-from platform_common.db.dependencies.get_dal import get_dal
 from platform_common.utils.time_helpers import get_current_epoch
 from platform_common.logging.logging import get_logger
 from platform_common.auth.jwt_utils import create_jwt
@@ -12,10 +9,13 @@ from platform_common.auth.token_sources import (
     issue_access_token,
     REFRESH_TOKEN_TTL_SECONDS,
 )
-from firebase_admin import auth as firebase_auth
+from app.auth.token_verifier import verify_id_token
+from app.resilience.breaker import DependencyUnavailableError
 import os
 
 from app.api.interface.abstract_handler import AbstractHandler
+from app.db.dal.hot_path import HotPathUserDAL, HotPathUserSessionDAL
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
 
 logger = get_logger("login_user_handler")
 
@@ -23,16 +23,16 @@ logger = get_logger("login_user_handler")
 class LoginUserHandler(AbstractHandler):
     def __init__(
         self,
-        user_dal: UserDAL = Depends(get_dal(UserDAL)),
-        session_dal: UserSessionDAL = Depends(get_dal(UserSessionDAL)),
+        uow: UnitOfWork = Depends(get_unit_of_work),
     ):
         super().__init__()
-        self.user_dal = user_dal
-        self.session_dal = session_dal
+        self.uow = uow
+        self.user_dal = uow.get(HotPathUserDAL)
+        self.session_dal = uow.get(HotPathUserSessionDAL)
 
     async def do_process(self, request: Request) -> ServiceResponse:
         try:
-            logger.info(f"[C: LoginUserHandler -- F: do_process] ==== START ====")
+            logger.debug("Login started")
             authorization = request.headers.get("authorization")
             if not authorization or not authorization.startswith("Bearer "):
                 raise AuthError("Missing or invalid Authorization header")
@@ -40,12 +40,14 @@ class LoginUserHandler(AbstractHandler):
             id_token = authorization.replace("Bearer ", "").strip()
 
             try:
-                decoded_token = firebase_auth.verify_id_token(id_token)
+                decoded_token = await verify_id_token(id_token)
+            except DependencyUnavailableError:
+                raise
             except Exception as e:
                 logger.warning(f"Invalid Firebase token: {e}")
                 raise AuthError("[Login User Handler] Invalid Firebase ID token")
 
-            logger.debug(f"[{__class__}] Firebase token decoded")
+            logger.debug("Firebase token decoded")
             uid = decoded_token["uid"]
             user = await self.user_dal.get_by_idp_uid(uid)
             if not user:
@@ -69,7 +71,8 @@ class LoginUserHandler(AbstractHandler):
                 user_agent=request.headers.get("user-agent"),
             )
 
-            logger.info(f"Session created: {session.id} for user {user.id}")
+            logger.info("Session created", session_id=session.id, user_id=user.id)
+            await self.uow.commit()
 
             # token_payload = {
             #     "sub": user.id,
@@ -80,7 +83,7 @@ class LoginUserHandler(AbstractHandler):
             # )
 
             is_local = os.getenv("ENVIRONMENT", "local") == "local"
-            logger.info(f"is_local: {is_local}")
+            logger.debug("Cookie mode", is_local=is_local)
 
             service_response = ServiceResponse(
                 message="Login successful",
@@ -118,7 +121,9 @@ class LoginUserHandler(AbstractHandler):
             #     path="/",
             # )
 
-            logger.info(f"Access token created for user {user.id}")
+            logger.info("Access token created", user_id=user.id)
             return service_response
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"\n\n[login_user_handler] Error {e}\n\n")
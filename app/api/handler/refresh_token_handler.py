@@ -0,0 +1,192 @@
+import datetime
+import os
+import secrets
+from typing import Any, Optional
+
+from fastapi import Request
+from platform_common.auth.token_sources import issue_access_token
+from platform_common.errors.base import AuthError
+from platform_common.logging.logging import get_logger
+from platform_common.utils.service_response import ServiceResponse
+from platform_common.utils.time_helpers import get_current_epoch
+
+from app.api.interface.abstract_handler import AbstractHandler
+from app.auth.access_tokens import (
+    decode_access_token,
+    read_access_token,
+    seconds_remaining,
+    signing_key,
+)
+from app.db.dal.hot_path import HotPathUserSessionDAL
+from app.db.engine import get_engine
+from app.db.revocation import REVOKED_AT, is_revoked
+from app.db.unit_of_work import UnitOfWork
+from app.metrics.instruments import TOKEN_REFRESHES
+from app.utils.constants import TokenRefreshConstants
+
+logger = get_logger("refresh_token_handler")
+
+
+def _epoch(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class RefreshTokenHandler(AbstractHandler):
+    """
+    Keep a browser session alive.
+
+    While the caller's access token still has MIN_REMAINING_SECONDS of
+    lifetime it is validated locally and the call returns without any I/O.
+    Otherwise the refresh token cookie is rotated: the old session row is
+    revoked, a new one inherits its absolute expiry, and a new access token
+    is issued. The revoke is conditional, so of several concurrent refreshes
+    with one token only the first rotates. A rotated-out refresh token that
+    shows up again (outside a short grace window for concurrent tabs) means
+    it leaked, so every active session of the user is revoked. An expired
+    session is only refused, never treated as reuse.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    async def do_process(self, request: Request) -> ServiceResponse:
+        now = int(get_current_epoch())
+
+        fresh = self._fresh_access_token(request, now)
+        if fresh is not None:
+            TOKEN_REFRESHES.inc(outcome="fresh")
+            return ServiceResponse(
+                message="Access token still valid",
+                status_code=200,
+                success=True,
+                data={
+                    "user_id": fresh["sub"],
+                    "session_id": fresh["session_id"],
+                    "expires_at": int(fresh["exp"]),
+                    "refreshed": False,
+                },
+            )
+
+        # Opened here rather than through the get_unit_of_work dependency,
+        # which would check out a pool connection for the fast path too.
+        async with UnitOfWork(get_engine()) as uow:
+            return await self._rotate(uow, request, now)
+
+    def _fresh_access_token(
+        self, request: Request, now: int
+    ) -> Optional[dict[str, Any]]:
+        token = read_access_token(request)
+        key = signing_key()
+        if not token or not key:
+            return None
+        claims = decode_access_token(token, key, (TokenRefreshConstants.JWT_ALGORITHM,))
+        if claims is None:
+            return None
+        if seconds_remaining(claims, now) < TokenRefreshConstants.MIN_REMAINING_SECONDS:
+            return None
+        return claims
+
+    async def _rotate(
+        self, uow: UnitOfWork, request: Request, now: int
+    ) -> ServiceResponse:
+        session_dal = uow.get(HotPathUserSessionDAL)
+        refresh_token = request.cookies.get("refresh_token")
+        if not refresh_token:
+            TOKEN_REFRESHES.inc(outcome="unauthenticated")
+            raise AuthError("Not authenticated")
+
+        session = await session_dal.get_by_refresh_token_including_revoked(
+            refresh_token
+        )
+        if session is None:
+            TOKEN_REFRESHES.inc(outcome="unauthenticated")
+            raise AuthError("Not authenticated")
+
+        if is_revoked(session):
+            await self._handle_reuse(uow, session, now)
+            raise AuthError("Not authenticated")
+
+        if session.expires_at <= now:
+            # Left as is: revoking it would make the same cookie look like
+            # reuse of a rotated token next time.
+            logger.info("Session expired", session_id=session.id)
+            TOKEN_REFRESHES.inc(outcome="expired")
+            raise AuthError("Session expired")
+
+        # The read above takes no lock; revoking first, conditionally, lets
+        # exactly one of several concurrent refreshes with this token rotate.
+        if not await session_dal.revoke_if_live(session.id):
+            TOKEN_REFRESHES.inc(outcome="concurrent")
+            logger.info(f"Refresh token of session {session.id} rotated just now")
+            raise AuthError("Not authenticated")
+
+        new_refresh_token = secrets.token_urlsafe(32)
+        new_session = await session_dal.create_session(
+            user_id=session.user_id,
+            refresh_token=new_refresh_token,
+            # Rotation never extends the session's absolute lifetime
+            expires_at=session.expires_at,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+        )
+        await uow.commit()
+        TOKEN_REFRESHES.inc(outcome="rotated")
+        logger.info(
+            "Rotated session", session_id=session.id, new_session_id=new_session.id
+        )
+
+        is_local = os.getenv("ENVIRONMENT", "local") == "local"
+        service_response = ServiceResponse(
+            message="Session refreshed",
+            status_code=200,
+            success=True,
+            data={
+                "user_id": session.user_id,
+                "session_id": new_session.id,
+                "refreshed": True,
+            },
+        )
+        service_response.set_cookie(
+            key="refresh_token",
+            value=new_refresh_token,
+            httponly=not is_local,
+            secure=not is_local,
+            samesite="Lax" if is_local else "Strict",
+            max_age=max(int(session.expires_at) - now, 0),
+            path="/",
+        )
+        issue_access_token(
+            response=service_response,
+            user_id=session.user_id,
+            session_id=new_session.id,
+        )
+        return service_response
+
+    async def _handle_reuse(self, uow: UnitOfWork, session: Any, now: int) -> None:
+        revoked_at = _epoch(getattr(session, REVOKED_AT))
+        if (
+            revoked_at is not None
+            and now - revoked_at <= TokenRefreshConstants.REUSE_GRACE_SECONDS
+        ):
+            # Two tabs refreshing with the same cookie: the loser retries
+            # with the cookie the winner received.
+            TOKEN_REFRESHES.inc(outcome="concurrent")
+            logger.info(f"Refresh token of session {session.id} rotated just now")
+            return
+        if revoked_at is not None and session.expires_at <= revoked_at:
+            # Revoked only once it had expired: an old cookie, not a theft
+            TOKEN_REFRESHES.inc(outcome="expired")
+            return
+
+        session_dal = uow.get(HotPathUserSessionDAL)
+        revoked = await session_dal.revoke_all_for_user(session.user_id)
+        await uow.commit()
+        TOKEN_REFRESHES.inc(outcome="reuse_detected")
+        logger.warning(
+            f"Refresh token reuse on revoked session {session.id}; revoked "
+            f"{revoked} active session(s) of user {session.user_id}"
+        )
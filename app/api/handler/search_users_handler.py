@@ -0,0 +1,43 @@
+from fastapi import Query, Request, Response
+from app.api.interface.abstract_handler import AbstractHandler
+from platform_common.logging.logging import get_logger
+from app.api.negotiation import respond
+from app.search.user_index import user_search_index
+from app.utils.constants import SearchConstants
+
+logger = get_logger("search_users_handler")
+
+
+class SearchUsersHandler(AbstractHandler):
+    """
+    Handler for typeahead search over user emails and usernames.
+
+    Served from the in-memory index (app/search); no database round trip.
+    """
+
+    def __init__(
+        self,
+        q: str = Query(..., min_length=1, max_length=254),
+        limit: int = Query(10, ge=1, le=SearchConstants.MAX_LIMIT),
+    ):
+        super().__init__()
+        self.q = q
+        self.limit = limit
+
+    async def do_process(self, request: Request) -> Response:
+        matches = user_search_index.search(self.q, self.limit)
+
+        return respond(
+            request,
+            "User search completed",
+            200,
+            {
+                "users": [
+                    {"id": u.id, "email": u.email, "username": u.username}
+                    for u in matches
+                ],
+                # False while the startup scan is still running; results may
+                # be incomplete until then.
+                "index_ready": user_search_index.ready,
+            },
+        )
@@ -1,16 +1,22 @@
+from typing import Any
+
 from fastapi import Request, Depends, status
 from platform_common.config.settings import get_settings
 from platform_common.db.dal.notification_outbox_dal import NotificationOutboxDAL
 from platform_common.db.dal.user_invite_dal import UserInviteDAL
-from platform_common.db.dependencies.get_dal import get_dal
 from platform_common.utils.service_response import ServiceResponse
 from platform_common.utils.time_helpers import get_current_epoch
 from platform_common.logging.logging import get_logger
 from platform_common.errors.base import AuthError, BadRequestError
 from platform_common.utils.enums import NotificationChannel
-from firebase_admin import auth as firebase_auth
+from app.auth.token_verifier import verify_id_token
+from app.resilience.breaker import DependencyUnavailableError
 
+from app.db.group_commit import get_outbox_writer
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
 from app.enum.user_enum import SYSTEM_USER_IDS
+from app.invites.registration import register
+from app.utils.constants import GroupCommitConstants
 
 logger = get_logger("self_register_handler")
 
@@ -18,11 +24,11 @@ logger = get_logger("self_register_handler")
 class SelfRegisterHandler:
     def __init__(
         self,
-        invite_dal: UserInviteDAL = Depends(get_dal(UserInviteDAL)),
-        outbox_dal: NotificationOutboxDAL = Depends(get_dal(NotificationOutboxDAL)),
+        uow: UnitOfWork = Depends(get_unit_of_work),
     ):
-        self.invite_dal = invite_dal
-        self.outbox_dal = outbox_dal
+        self.uow = uow
+        self.invite_dal = uow.get(UserInviteDAL)
+        self.outbox_dal = uow.get(NotificationOutboxDAL)
         self.settings = get_settings()
 
     async def do_process(self, request: Request) -> ServiceResponse:
@@ -34,7 +40,9 @@ class SelfRegisterHandler:
 
         id_token = auth_header.removeprefix("Bearer ").strip()
         try:
-            decoded = firebase_auth.verify_id_token(id_token)
+            decoded = await verify_id_token(id_token)
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             logger.warning(f"Invalid Firebase ID token: {e}")
             raise AuthError("Invalid Firebase ID token")
@@ -58,22 +66,50 @@ class SelfRegisterHandler:
             f"[SelfRegisterHandler] Invite expiration set to {expiration} for {email}"
         )
 
-        invite = await self.invite_dal.create_invite(
+        invite_fields = dict(
             email=email,
             roles=[],  # assign roles later upon redemption
             expiration=expiration,
             invited_by=SYSTEM_USER_IDS["ROOT"],
             idp_uid=decoded["uid"],
         )
-        logger.info(f"Created self-registration invite {invite.id} for {email}")
 
-        # 4) Queue verification email notification
+        # 4) Create the invite and queue its verification email
+        if GroupCommitConstants.ENABLED:
+            # Built in memory; written in one batch with other registrations
+            invite = await register(
+                get_outbox_writer(),
+                self.invite_dal.model,
+                self.outbox_dal.model,
+                invite_fields,
+                lambda invite: self._notification(invite, email, display_name),
+            )
+            invite_id = invite.id
+        else:
+            invite = await self.invite_dal.create_invite(**invite_fields)
+            invite_id = invite.id
+            await self.outbox_dal.enqueue(
+                **self._notification(invite, email, display_name)
+            )
+            await self.uow.commit()
+        logger.info(f"Created self-registration invite {invite_id} for {email}")
+
+        return ServiceResponse(
+            message="Registration email queued; please check your inbox shortly",
+            status_code=status.HTTP_201_CREATED,
+            data={"invite_id": invite_id},
+        )
+
+    def _notification(
+        self, invite: Any, email: str, display_name: str
+    ) -> dict[str, Any]:
+        """The verification email for `invite`, as `enqueue` arguments."""
         accept_link = (
             f"{self.settings.frontend_url.rstrip('/')}"
             f"/accept-invite?token={invite.token}"
         )
         template_key = "user_invite_email"
-        await self.outbox_dal.enqueue(
+        return dict(
             event_type="invite.created",
             channel=NotificationChannel.EMAIL.value,
             template_key=template_key,
@@ -90,9 +126,3 @@ class SelfRegisterHandler:
             },
             idempotency_key=f"email:{template_key}:{invite.id}:{email.lower()}",
         )
-
-        return ServiceResponse(
-            message="Registration email queued; please check your inbox shortly",
-            status_code=status.HTTP_201_CREATED,
-            data={"invite_id": invite.id},
-        )
@@ -1,10 +1,12 @@
-from fastapi import Request, Depends
+from fastapi import Request, Response, Depends
 from app.api.interface.abstract_handler import AbstractHandler
-from platform_common.utils.service_response import ServiceResponse
 from platform_common.logging.logging import get_logger
 from platform_common.errors.base import BadRequestError, NotFoundError
-from platform_common.db.dependencies.get_dal import get_dal
-from platform_common.db.dal.user_dal import UserDAL
+from app.db.dal.hot_path import HotPathUserDAL, is_deleted
+from app.api.negotiation import read_payload, respond
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
+from app.pubsub.events.user_events import publish_user_updated_event
+from app.search.sync import index_user
 
 logger = get_logger("update_user_handler")
 
@@ -14,27 +16,34 @@ class UpdateUserHandler(AbstractHandler):
     Handler for updating user information.
     """
 
-    def __init__(self, user_dal: UserDAL = Depends(get_dal(UserDAL))):
+    def __init__(self, uow: UnitOfWork = Depends(get_unit_of_work)):
         super().__init__()
-        self.user_dal = user_dal
+        self.uow = uow
+        self.user_dal = uow.get(HotPathUserDAL)
 
-    async def do_process(self, request: Request, user_id: str) -> ServiceResponse:
+    async def do_process(self, request: Request, user_id: str) -> Response:
 
-        update_data = await request.json()
+        update_data = await read_payload(request)
 
         if not update_data:
             raise BadRequestError(message="Missing update data", code="NO_UPDATE_DATA")
 
-        # Confirm user exists before updating
+        # Confirm user exists (and is not soft-deleted) before updating
         user = await self.user_dal.get_by_id(user_id)
         if not user:
             raise NotFoundError(message="User not found", code="USER_NOT_FOUND")
 
         # Perform the update
         updated_user = await self.user_dal.update(user_id, update_data)
-
-        return ServiceResponse(
-            message="User updated successfully",
-            status_code=200,
-            data=updated_user.dict(),
+        # Deleted while we were updating: do not commit or re-index it
+        if not updated_user or is_deleted(updated_user):
+            raise NotFoundError(message="User not found", code="USER_NOT_FOUND")
+        await self.uow.commit()
+        index_user(updated_user)
+        await publish_user_updated_event(
+            user_id=updated_user.id,
+            email=updated_user.email,
+            username=updated_user.username,
         )
+
+        return respond(request, "User updated successfully", 200, updated_user)
@@ -1,9 +1,11 @@
 from fastapi import Depends, Request
 
 from app.api.interface.abstract_handler import AbstractHandler
+from app.db.dal.hot_path import HotPathOrganizationInviteDAL
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
+from app.invites.org_names import get_organization_name
+from app.invites.token_guard import invite_token_guard
 from platform_common.db.dal.organization_dal import OrganizationDAL
-from platform_common.db.dal.organization_invite_dal import OrganizationInviteDAL
-from platform_common.db.dependencies.get_dal import get_dal
 from platform_common.errors.base import BadRequestError
 from platform_common.models.organization_invite import OrganizationInvite
 from platform_common.utils.invite_tokens import hash_invite_token
@@ -14,12 +16,12 @@ from platform_common.utils.time_helpers import get_current_epoch
 class ValidateTeamInviteHandler(AbstractHandler):
     def __init__(
         self,
-        invite_dal: OrganizationInviteDAL = Depends(get_dal(OrganizationInviteDAL)),
-        organization_dal: OrganizationDAL = Depends(get_dal(OrganizationDAL)),
+        # The primary: a miss on a lagging replica would be negative-cached
+        uow: UnitOfWork = Depends(get_unit_of_work),
     ):
         super().__init__()
-        self.invite_dal = invite_dal
-        self.organization_dal = organization_dal
+        self.invite_dal = uow.get(HotPathOrganizationInviteDAL)
+        self.organization_dal = uow.get(OrganizationDAL)
 
     async def do_process(self, request: Request) -> ServiceResponse:
         token = request.query_params.get("token")
@@ -27,7 +29,11 @@ class ValidateTeamInviteHandler(AbstractHandler):
             raise BadRequestError(message="Missing token", code="MISSING_TOKEN")
 
         token_hash = hash_invite_token(token)
-        invite = await self.invite_dal.get_by_token_hash(token_hash)
+        invite = None
+        if await invite_token_guard.admits(token_hash):
+            invite = await self.invite_dal.get_by_token_hash(token_hash)
+            if not invite:
+                invite_token_guard.remember_missing(token_hash)
         if not invite:
             raise BadRequestError(
                 message="Invalid invite token",
@@ -40,7 +46,9 @@ class ValidateTeamInviteHandler(AbstractHandler):
         is_pending = invite.status == OrganizationInvite.Status.PENDING
         is_valid = bool(is_pending and not is_expired)
 
-        organization = await self.organization_dal.get_by_id(invite.organization_id)
+        organization_name = await get_organization_name(
+            self.organization_dal, invite.organization_id
+        )
 
         return ServiceResponse(
             message="Invite token checked",
@@ -48,7 +56,7 @@ class ValidateTeamInviteHandler(AbstractHandler):
             data={
                 "invite_id": invite.id,
                 "organization_id": invite.organization_id,
-                "organization_name": organization.name if organization else None,
+                "organization_name": organization_name,
                 "email": invite.email,
                 "role": invite.role,
                 "status": invite.status,
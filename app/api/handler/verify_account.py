@@ -1,13 +1,13 @@
 from fastapi import Request, Depends
-from platform_common.db.dal.user_dal import UserDAL
 from app.api.interface.abstract_handler import AbstractHandler
 from platform_common.utils.service_response import ServiceResponse
 from platform_common.logging.logging import get_logger
-from platform_common.models.user import User
 from platform_common.utils.time_helpers import get_current_epoch
-from platform_common.db.dependencies.get_dal import get_dal
 from platform_common.db.dal.user_invite_dal import UserInviteDAL
-from platform_common.db.dal.user_dal import UserDAL
+from app.db.dal.hot_path import HotPathUserDAL
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
+from app.pubsub.events.user_events import publish_user_updated_event
+from app.search.sync import index_user
 from platform_common.errors.base import (
     BadRequestError,
 )  # or your custom error
@@ -22,12 +22,12 @@ class VerifyAccountHandler(AbstractHandler):
 
     def __init__(
         self,
-        user_dal: UserDAL = Depends(get_dal(UserDAL)),
-        user_invite_dal: UserInviteDAL = Depends(get_dal(UserInviteDAL)),
+        uow: UnitOfWork = Depends(get_unit_of_work),
     ):
         super().__init__()
-        self.user_dal = user_dal
-        self.user_invite_dal = user_invite_dal
+        self.uow = uow
+        self.user_dal = uow.get(HotPathUserDAL)
+        self.user_invite_dal = uow.get(UserInviteDAL)
 
     async def do_process(self, request: Request) -> ServiceResponse:
         """
@@ -54,13 +54,8 @@ class VerifyAccountHandler(AbstractHandler):
             logger.info(
                 f"[Verify Account Handler] expiration {user_invite.expiration} now {get_current_epoch()}"
             )
-            expire = await self.user_invite_dal.expire_if_needed(
-                user_invite, get_current_epoch()
-            )
-
-            logger.info(f"[Verify Account Handler] expire: {expire}")
-
-            if expire is not None:
+            # Overdue invites are flipped to expired by the background sweeper
+            if user_invite.expiration < get_current_epoch():
                 logger.error(f"[Verify Account Handler] Token expired: {token}")
                 raise BadRequestError(
                     message="Token has expired", code="TOKEN_EXPIRED", status_code=404
@@ -75,18 +70,29 @@ class VerifyAccountHandler(AbstractHandler):
                 "is_verified": True,
             }
 
-            user = User(**user_payload)
-            user_response = await self.user_dal.create(user)
+            # A user who already signed in with this identity is verified in
+            # place instead of failing on the idp_uid unique constraint.
+            upserted = await self.user_dal.upsert_from_idp(**user_payload)
 
-            if not user_response:
+            if not upserted:
                 logger.error(
                     f"[Verify Account Handler] User creation failed: {user_payload}"
                 )
                 raise BadRequestError(
                     message="Failed to create user", code="USER_CREATION_FAILED"
                 )
+            user_response, _, _ = upserted
+
+            # Invite redemption and user creation commit together
+            await self.uow.commit()
+            index_user(user_response)
+            await publish_user_updated_event(
+                user_id=user_response.id,
+                email=user_response.email,
+                username=user_response.username,
+            )
 
-            logger.info(f"[Verify Account Handler] Email verified: {user.id}")
+            logger.info(f"[Verify Account Handler] Email verified: {user_response.id}")
             return ServiceResponse(
                 message="Email verified successfully",
                 status_code=200,
@@ -0,0 +1,114 @@
+# app/api/msgpack_codec.py
+"""
+MessagePack encoding for API payloads.
+
+Models are encoded with a per-class encoder that reads the declared fields
+directly (built once per model class), instead of going through `.dict()`
+and a JSON render for every response. Values msgpack has no type for
+(datetimes, enums, UUIDs, decimals) become the strings the JSON responses
+carry.
+"""
+import datetime
+import decimal
+import enum
+import uuid
+from operator import attrgetter
+from typing import Any, Callable, Optional
+
+import msgpack
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+JSON_MEDIA_TYPES = ("application/json", "application/*", "*/*")
+
+ModelEncoder = Callable[[Any], dict[str, Any]]
+
+_encoders: dict[type, ModelEncoder] = {}
+
+
+def _model_fields(model: type) -> Optional[list[str]]:
+    fields = getattr(model, "model_fields", None)  # pydantic v2 / SQLModel
+    if fields is None:
+        fields = getattr(model, "__fields__", None)  # pydantic v1
+    return list(fields) if fields is not None else None
+
+
+def _build_encoder(names: list[str]) -> ModelEncoder:
+    if not names:
+        return lambda obj: {}
+    if len(names) == 1:
+        (name,) = names
+        return lambda obj: {name: getattr(obj, name)}
+    read = attrgetter(*names)
+    return lambda obj: dict(zip(names, read(obj)))
+
+
+def model_encoder(model: type) -> Optional[ModelEncoder]:
+    """
+    Cached field-reading encoder for `model`, or None if it is not a model.
+    """
+    encoder = _encoders.get(model)
+    if encoder is None:
+        names = _model_fields(model)
+        if names is None:
+            return None
+        encoder = _encoders[model] = _build_encoder(names)
+    return encoder
+
+
+def _default(value: Any) -> Any:
+    encoder = model_encoder(type(value))
+    if encoder is not None:
+        return encoder(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} as msgpack")
+
+
+def packb(value: Any) -> bytes:
+    packed: bytes = msgpack.packb(value, default=_default, use_bin_type=True)
+    return packed
+
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False)
+
+
+def _quality(accept: str, media_types: tuple[str, ...]) -> float:
+    best = 0.0
+    for item in accept.split(","):
+        media_type, *params = (part.strip() for part in item.split(";"))
+        if media_type.lower() not in media_types:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        best = max(best, q)
+    return best
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """
+    True when the Accept header prefers MessagePack (ties go to msgpack,
+    since a client only lists it when it can decode it).
+    """
+    if not accept or "msgpack" not in accept:
+        return False
+    msgpack_q = _quality(accept, MSGPACK_MEDIA_TYPES)
+    return msgpack_q > 0 and msgpack_q >= _quality(accept, JSON_MEDIA_TYPES)
+
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    return content_type.split(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES
@@ -0,0 +1,74 @@
+# app/api/negotiation.py
+"""
+Content negotiation for ServiceResponse routes: JSON by default, MessagePack
+when the caller sends `Accept: application/msgpack` (internal services).
+"""
+import json
+from typing import Any
+
+from fastapi import Request, Response
+from platform_common.errors.base import BadRequestError
+from platform_common.utils.service_response import ServiceResponse
+
+from app.api.msgpack_codec import (
+    MSGPACK_MEDIA_TYPES,
+    is_msgpack,
+    packb,
+    unpackb,
+    wants_msgpack,
+)
+
+MSGPACK_MEDIA_TYPE = MSGPACK_MEDIA_TYPES[0]
+
+
+def _to_dict(data: Any) -> Any:
+    # What handlers passed to ServiceResponse before negotiation existed
+    if isinstance(data, list):
+        return [_to_dict(item) for item in data]
+    if hasattr(data, "dict"):
+        return data.dict()
+    return data
+
+
+def respond(
+    request: Request, message: str, status_code: int, data: Any = None
+) -> Response:
+    """
+    Build the route's response. `data` may hold models (or lists of them);
+    they are serialised with `.dict()` for JSON and with the cached per-model
+    encoders for MessagePack.
+    """
+    if not wants_msgpack(request.headers.get("accept")):
+        response: Response = ServiceResponse(
+            message=message, status_code=status_code, data=_to_dict(data)
+        )
+        response.headers["vary"] = "accept"
+        return response
+
+    # Render the (small) envelope once without data so MessagePack bodies
+    # carry exactly the fields ServiceResponse puts in JSON ones.
+    envelope_response = ServiceResponse(
+        message=message, status_code=status_code, data=None
+    )
+    envelope = json.loads(envelope_response.body)
+    envelope["data"] = data
+    return Response(
+        content=packb(envelope),
+        status_code=envelope_response.status_code,
+        media_type=MSGPACK_MEDIA_TYPE,
+        headers={"vary": "accept"},
+    )
+
+
+async def read_payload(request: Request) -> Any:
+    """
+    Request body as JSON, or MessagePack when Content-Type says so.
+    """
+    if not is_msgpack(request.headers.get("content-type")):
+        return await request.json()
+    try:
+        return unpackb(await request.body())
+    except Exception:
+        raise BadRequestError(
+            message="Invalid MessagePack body", code="INVALID_PAYLOAD"
+        )
@@ -7,6 +7,8 @@ from app.api.handler.exchange_token_handler import ExchangeFirebaseTokenHandler
 from app.api.handler.get_session_from_cookies_handler import (
     GetSessionFromCookiesHandler,
 )
+from app.api.handler.refresh_token_handler import RefreshTokenHandler
+from app.resilience.breaker import DependencyUnavailableError
 
 
 router = APIRouter(
@@ -27,6 +29,8 @@ async def exchange_auth_code(
     try:
         logger.info("Exchanging Firebase ID token for internal session")
         return await handler.do_process(request)
+    except DependencyUnavailableError:
+        raise  # 503 with Retry-After via the app's handler
     except Exception as e:
         logger.exception("Error exchanging auth code")
 
@@ -62,3 +66,16 @@ async def get_session_from_cookies(
             },
             status_code=400,
         )
+
+
+@router.post("/refresh")
+async def refresh_session(
+    request: Request,
+    handler: RefreshTokenHandler = Depends(RefreshTokenHandler),
+) -> ServiceResponse:
+    """
+    Keep the session alive: a no-I/O answer while the access token is fresh,
+    refresh-token rotation near its expiry. Auth failures surface as 401.
+    """
+    logger.info("Refreshing session")
+    return await handler.do_process(request)
@@ -0,0 +1,12 @@
+from strawberry.fastapi import GraphQLRouter
+
+from app.graphql.context import GraphQLContext, get_graphql_context
+from app.graphql.schema import schema
+from app.utils.constants import GraphQLConstants
+
+# POST (and GET) /api/graphql — read-only; see app/graphql/schema.py
+router: GraphQLRouter[GraphQLContext, None] = GraphQLRouter(
+    schema,
+    context_getter=get_graphql_context,
+    graphiql=GraphQLConstants.GRAPHIQL,
+)
@@ -5,6 +5,8 @@ from platform_common.logging.logging import get_logger
 from platform_common.utils.service_response import ServiceResponse
 from platform_common.errors.base import AuthError
 
+from app.db.prepared import hot_path_registry
+
 router = APIRouter()
 logger = get_logger("health")
 
@@ -12,6 +14,30 @@ logger = get_logger("health")
 @router.get("/")
 async def health_check(request: Request):
 
-    logger.info("Health check yuh mama!", path=request.url.path)
+    logger.info("Health check", path=request.url.path)
 
     return ServiceResponse(message="Service is healthy", status_code=200)
+
+
+@router.get("/ready")
+async def readiness(request: Request):
+    """
+    200 once the startup warm-up has finished (see app/lifespan.py), 503
+    before that and during shutdown.
+    """
+    if not getattr(request.app.state, "ready", False):
+        return ServiceResponse(message="Service is not ready", status_code=503)
+    return ServiceResponse(message="Service is ready", status_code=200)
+
+
+@router.get("/prepared-statements")
+async def prepared_statement_stats():
+    """
+    Hit counts and estimated compile/plan time saved by the hot-path
+    prepared statement cache.
+    """
+    return ServiceResponse(
+        message="Prepared statement cache stats",
+        status_code=200,
+        data=hot_path_registry.stats(),
+    )
@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Request, Response, Query
 from fastapi.responses import RedirectResponse, JSONResponse
 
+from app.resilience.breaker import DependencyUnavailableError
 from app.utils.github_oauth import GithubOAuth
 
 
@@ -42,5 +43,7 @@ async def github_callback(
 
         # Lookup or create user, issue token, etc.
         return JSONResponse(content={"email": email, "token": access_token})
+    except DependencyUnavailableError:
+        raise  # 503 via the app's handler
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
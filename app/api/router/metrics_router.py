@@ -0,0 +1,18 @@
+# app/api/router/metrics_router.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics.multiprocess import render
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """
+    Prometheus scrape endpoint; covers every worker when the launcher runs
+    several (app/metrics/multiprocess.py).
+    """
+    return PlainTextResponse(render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 from platform_common.logging.logging import get_logger
-from platform_common.utils.service_response import ServiceResponse
 
 from app.api.handler.get_user_list_handler import GetUserListHandler
 from app.api.handler.get_user_handler import GetUserHandler
 from app.api.handler.create_user_handler import CreateUserHandler
 from app.api.handler.update_user_handler import UpdateUserHandler
 from app.api.handler.delete_user_handler import DeleteUserHandler
+from app.api.handler.search_users_handler import SearchUsersHandler
 
 
 router = APIRouter()
@@ -17,7 +17,16 @@ logger = get_logger("user")
 @router.get("/list")
 async def get_user_list(
     request: Request, handler: GetUserListHandler = Depends(GetUserListHandler)
-) -> ServiceResponse:
+) -> Response:
+    return await handler.do_process(request)
+
+
+# GET typeahead search over email/username
+@router.get("/search")
+async def search_users(
+    request: Request,
+    handler: SearchUsersHandler = Depends(SearchUsersHandler),
+) -> Response:
     return await handler.do_process(request)
 
 
@@ -25,7 +34,7 @@ async def get_user_list(
 @router.get("/")
 async def get_user(
     request: Request, handler: GetUserHandler = Depends(GetUserHandler)
-) -> ServiceResponse:
+) -> Response:
     return await handler.do_process(request)
 
 
@@ -33,7 +42,7 @@ async def get_user(
 @router.post("/")
 async def create_user(
     request: Request, handler: CreateUserHandler = Depends(CreateUserHandler)
-) -> ServiceResponse:
+) -> Response:
     return await handler.do_process(request)
 
 
@@ -43,7 +52,7 @@ async def update_user(
     user_id: str,
     request: Request,
     handler: UpdateUserHandler = Depends(UpdateUserHandler),
-) -> ServiceResponse:
+) -> Response:
     return await handler.do_process(request, user_id)
 
 
@@ -51,6 +60,7 @@ async def update_user(
 @router.delete("/{user_id}")
 async def delete_user(
     user_id: str,
+    request: Request,
     handler: DeleteUserHandler = Depends(DeleteUserHandler),
-) -> ServiceResponse:
-    return await handler.do_process(user_id)
+) -> Response:
+    return await handler.do_process(request, user_id)
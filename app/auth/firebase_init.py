@@ -6,6 +6,7 @@ import os
 
 from platform_common.logging.logging import get_logger
 from platform_common.utils.service_response import ServiceResponse
+from app.utils.constants import ResilienceConstants
 
 logger = get_logger("firebase_init")
 settings = get_settings()
@@ -21,7 +22,11 @@ def init_firebase():
         try:
             logger.info(f"Initializing Firebase with: {cred_path}")
             cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred)
+            # Verification runs in worker threads that cannot be cancelled;
+            # bound their certificate fetches instead of the SDK's 120s.
+            firebase_admin.initialize_app(
+                cred, {"httpTimeout": ResilienceConstants.FIREBASE_TIMEOUT_SECONDS}
+            )
             logger.info("Firebase initialized successfully.")
         except Exception as e:
             return ServiceResponse(
@@ -0,0 +1,9 @@
+# app/auth/providers.py
+
+# Sign-in providers whose accounts are treated as email-verified when they
+# carry an email, even if Firebase's email_verified flag is false.
+TRUSTED_OAUTH_PROVIDERS = frozenset({"google.com", "github.com"})
+
+
+def is_trusted_oauth_provider(provider: str | None) -> bool:
+    return provider in TRUSTED_OAUTH_PROVIDERS
@@ -0,0 +1,23 @@
+# app/auth/token_verifier.py
+from typing import Any
+
+from firebase_admin import auth as firebase_auth
+
+from app.resilience.dependencies import firebase, firebase_threads
+
+
+async def verify_id_token(id_token: str) -> dict[str, Any]:
+    """
+    Verify a Firebase ID token. Single entry point for every handler so the
+    call is timed and guarded (breaker, timeout) in one place.
+
+    Runs on Firebase's own threads: verification is CPU work plus, whenever
+    the cached signing certs expire, a blocking fetch that must not stall
+    the loop. Raises DependencyUnavailableError when Firebase is unreachable
+    or all its threads are still busy.
+    """
+    decoded: dict[str, Any] = await firebase.call(
+        "verify_id_token",
+        lambda: firebase_threads.run(firebase_auth.verify_id_token, id_token),
+    )
+    return decoded
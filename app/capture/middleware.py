@@ -0,0 +1,118 @@
+# app/capture/middleware.py
+import random
+import time
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.capture.recorder import CaptureRecorder, Record
+from app.metrics.middleware import RouteTemplates
+from app.utils.constants import CaptureConstants
+
+# Query *names* are client-controlled; bound what a record can carry
+MAX_QUERY_KEYS = 16
+MAX_KEY_LENGTH = 40
+
+
+def auth_kind(headers: Headers) -> str:
+    """How the request authenticated, never with what."""
+    if headers.get("authorization", "").lower().startswith("bearer "):
+        return "bearer"
+    if "access_token=" in headers.get("cookie", ""):
+        return "cookie"
+    return "none"
+
+
+def content_length(headers: Headers) -> int:
+    """For bodies the handler never read."""
+    try:
+        return int(headers.get("content-length") or 0)
+    except ValueError:
+        return 0
+
+
+def query_keys(query_string: bytes) -> list[str]:
+    keys = {
+        key[:MAX_KEY_LENGTH]
+        for key, _ in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    }
+    return sorted(keys)[:MAX_QUERY_KEYS]
+
+
+class TrafficCaptureMiddleware:
+    """
+    Opt-in capture of production request mixes for replay
+    (benchmarks/load/replay.py).
+
+    Each sampled request produces one compact record:
+
+        {"t": 1718000000.123, "m": "GET", "r": "/api/user/{user_id}",
+         "q": ["id"], "a": "cookie", "b": 0, "s": 200, "o": 512, "d": 4.2}
+
+    start time (epoch seconds), method, route template, query parameter
+    names, auth kind, request and response body bytes, status and latency
+    (ms). Values are never recorded: no raw paths, query values, headers,
+    cookies, tokens or bodies. Requests matching no route are recorded as
+    "unmatched". main.py only installs it when TRAFFIC_CAPTURE_ENABLED is set.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        recorder: Optional[CaptureRecorder] = None,
+        sample_rate: float = CaptureConstants.SAMPLE_RATE,
+    ):
+        self.app = app
+        self.recorder = recorder or CaptureRecorder(
+            CaptureConstants.PATH,
+            CaptureConstants.MAX_BYTES,
+            CaptureConstants.BACKUP_COUNT,
+            CaptureConstants.QUEUE_SIZE,
+        )
+        self.sample_rate = sample_rate
+        self._route_template = RouteTemplates()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        headers = Headers(scope=scope)
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            record: Record = {
+                "t": round(started_at, 3),
+                "m": scope["method"],
+                "r": self._route_template(scope),
+                "q": query_keys(scope.get("query_string", b"")),
+                "a": auth_kind(headers),
+                "b": request_bytes or content_length(headers),
+                "s": status,
+                "o": response_bytes,
+                "d": round((time.perf_counter() - started) * 1000, 3),
+            }
+            self.recorder.record(record)
@@ -0,0 +1,268 @@
+# app/db/dal/hot_path.py
+"""
+DAL variants whose hottest lookups run through server-side prepared
+statements (see app/db/prepared.py). Every other method is inherited
+unchanged from platform_common.
+"""
+import datetime
+import time
+from typing import Any, Callable, Optional
+
+from platform_common.db.dal.organization_invite_dal import OrganizationInviteDAL
+from platform_common.db.dal.user_dal import UserDAL
+from platform_common.db.dal.user_session_dal import UserSessionDAL
+from sqlalchemy import Column, Table, bindparam, insert, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.db.prepared import hot_path_registry
+from app.db.revocation import REVOKED_AT, is_live, is_revoked
+from app.db.single_flight import SingleFlight, has_written, note_write
+from app.db.upsert import insert_values, upsert_idp_user
+from app.metrics.instruments import SINGLE_FLIGHT_LOOKUPS
+from app.utils.constants import SingleFlightConstants
+
+_lookups = SingleFlight(max_waiters=SingleFlightConstants.MAX_WAITERS)
+
+
+def _select_by(table: Table, column: str) -> Any:
+    return select(table).where(table.c[column] == bindparam(column)).limit(1)
+
+
+async def _fetch_shared(
+    session: AsyncSession,
+    name: str,
+    build: Callable[[], Any],
+    **params: Any,
+) -> Optional[dict[str, Any]]:
+    """
+    `hot_path_registry.fetch_one`, shared with concurrent callers running
+    the same lookup against the same database (see app/db/single_flight.py).
+    """
+    if not SingleFlightConstants.ENABLED:
+        return await hot_path_registry.fetch_one(session, name, build, **params)
+    if has_written(session):
+        SINGLE_FLIGHT_LOOKUPS.inc(lookup=name, outcome="bypass")
+        return await hot_path_registry.fetch_one(session, name, build, **params)
+    bind = session.bind
+    key = (name, getattr(bind, "engine", bind), tuple(sorted(params.items())))
+    row = await _lookups.do(
+        name,
+        key,
+        lambda: hot_path_registry.fetch_one(session, name, build, **params),
+    )
+    # Each caller builds its own instance from the row; never share the dict
+    return dict(row) if row is not None else None
+
+
+def _attach(session: AsyncSession, model: Any, row: Optional[dict[str, Any]]) -> Any:
+    """
+    Turn a raw row into a persistent instance in `session`, as if the ORM had
+    loaded it, so later DAL calls that take the instance keep working.
+    """
+    if not row:
+        return None
+    instance = model(**row)
+    make_transient_to_detached(instance)
+    existing = session.identity_map.get(inspect(instance).key)
+    if existing is not None:
+        return existing
+    session.add(instance)
+    return instance
+
+
+def is_deleted(user: Any) -> bool:
+    """Soft-deleted users wait for the purge worker (app/jobs/user_purge.py)."""
+    return bool(getattr(user, "deleted_at", None))
+
+
+def soft_delete_columns(table: Table) -> tuple[Column[Any], Column[Any]]:
+    """
+    The users table's (`deleted_at`, `is_active`) columns. Without them a
+    deleted user would stay live, so their absence is an error rather than
+    something to skip; `python -m app.db.migrations` adds them.
+    """
+    missing = [name for name in ("deleted_at", "is_active") if name not in table.c]
+    if missing:
+        raise RuntimeError(
+            f"{table.name} has no {', '.join(missing)} column(s); soft delete "
+            "needs them (run `python -m app.db.migrations`)"
+        )
+    return table.c.deleted_at, table.c.is_active
+
+
+def now_for(column: Column[Any]) -> Any:
+    """The current time in whatever form `column` stores it (datetime or epoch)."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = int
+    if issubclass(python_type, datetime.datetime):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return (
+            now if getattr(column.type, "timezone", False) else now.replace(tzinfo=None)
+        )
+    return int(time.time())
+
+
+class HotPathUserDAL(UserDAL):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)
+        self.db_session = session
+
+    async def get_by_id(self, id: str) -> Any:
+        table = self.model.__table__
+        row = await _fetch_shared(
+            self.db_session, "user.get_by_id", lambda: _select_by(table, "id"), id=id
+        )
+        user = _attach(self.db_session, self.model, row)
+        return None if is_deleted(user) else user
+
+    async def get_by_idp_uid(self, idp_uid: str) -> Any:
+        table = self.model.__table__
+        row = await hot_path_registry.fetch_one(
+            self.db_session,
+            "user.get_by_idp_uid",
+            lambda: _select_by(table, "idp_uid"),
+            idp_uid=idp_uid,
+        )
+        user = _attach(self.db_session, self.model, row)
+        return None if is_deleted(user) else user
+
+    async def get_list(self, filters: Optional[dict[str, Any]] = None) -> list[Any]:
+        users = await super().get_list(filters=filters)
+        return [user for user in users if not is_deleted(user)]
+
+    async def upsert_from_idp(
+        self, idp_uid: str, email: str, username: str, is_verified: bool
+    ) -> Optional[tuple[Any, bool, bool]]:
+        """
+        Find-or-create by idp_uid in one round trip (app/db/upsert.py),
+        upgrading an existing unverified user when `is_verified`. Returns
+        (user, created, newly_verified), or None for a soft-deleted user.
+        """
+        table, values = insert_values(
+            self.model(
+                idp_uid=idp_uid, email=email, username=username, is_verified=is_verified
+            )
+        )
+        upserted = await upsert_idp_user(self.db_session, table, values)
+        if upserted is None:
+            return None
+        if upserted.created or upserted.newly_verified:
+            note_write(self.db_session)
+        user = _attach(self.db_session, self.model, upserted.row)
+        return user, upserted.created, upserted.newly_verified
+
+    async def soft_delete(self, id: str) -> None:
+        """
+        Mark the user deleted (`deleted_at`, `is_active`); the row itself
+        stays until purged.
+        """
+        table = self.model.__table__
+        deleted_at, is_active = soft_delete_columns(table)
+        await self.db_session.execute(
+            update(table)
+            .where(table.c.id == id)
+            .values({deleted_at: now_for(deleted_at), is_active: False})
+        )
+
+
+class HotPathUserSessionDAL(UserSessionDAL):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)
+        self.db_session = session
+
+    async def get_by_refresh_token(self, refresh_token: str) -> Any:
+        user_session = await self.get_by_refresh_token_including_revoked(refresh_token)
+        # Same contract as the base DAL: revoked sessions are not returned.
+        if user_session is None or is_revoked(user_session):
+            return None
+        return user_session
+
+    async def get_by_refresh_token_including_revoked(self, refresh_token: str) -> Any:
+        """
+        Session holding `refresh_token`, revoked or not; lets the refresh
+        flow tell a replayed (rotated-out) token from an unknown one.
+        """
+        table = self.model.__table__
+        row = await _fetch_shared(
+            self.db_session,
+            "user_session.get_by_refresh_token",
+            lambda: _select_by(table, "refresh_token"),
+            refresh_token=refresh_token,
+        )
+        return _attach(self.db_session, self.model, row)
+
+    async def revoke_if_live(self, session_id: str) -> bool:
+        """
+        Revoke the session unless it already is, in one statement. True for
+        exactly one of any number of concurrent callers.
+        """
+        table = self.model.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == session_id, is_live(table))
+            .values({REVOKED_AT: now_for(table.c[REVOKED_AT])})
+            .returning(table.c.id)
+        )
+        result = await self.db_session.execute(statement)
+        return result.first() is not None
+
+    async def revoke_all_for_user(self, user_id: str) -> int:
+        """Revoke every active session of `user_id` in one statement."""
+        table = self.model.__table__
+        statement = (
+            update(table)
+            .where(table.c.user_id == user_id, is_live(table))
+            .values({REVOKED_AT: now_for(table.c[REVOKED_AT])})
+        )
+        result = await self.db_session.execute(statement)
+        return int(result.rowcount or 0)
+
+    async def create_session(
+        self,
+        user_id: str,
+        refresh_token: str,
+        expires_at: int,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> Any:
+        table, values = insert_values(
+            self.model(
+                user_id=user_id,
+                refresh_token=refresh_token,
+                expires_at=expires_at,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            )
+        )
+
+        def build() -> Any:
+            return (
+                insert(table)
+                .values({name: bindparam(name) for name in values})
+                .returning(*table.columns)
+            )
+
+        row = await hot_path_registry.fetch_one(
+            self.db_session, "user_session.create_session", build, **values
+        )
+        note_write(self.db_session)
+        return _attach(self.db_session, self.model, row)
+
+
+class HotPathOrganizationInviteDAL(OrganizationInviteDAL):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)
+        self.db_session = session
+
+    async def get_by_token_hash(self, token_hash: str) -> Any:
+        table = self.model.__table__
+        row = await hot_path_registry.fetch_one(
+            self.db_session,
+            "organization_invite.get_by_token_hash",
+            lambda: _select_by(table, "token_hash"),
+            token_hash=token_hash,
+        )
+        return _attach(self.db_session, self.model, row)
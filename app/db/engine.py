@@ -0,0 +1,36 @@
+# app/db/engine.py
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.utils.constants import DatabaseConstants
+
+
+def create_engine_for(url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    if url.startswith("sqlite"):
+        # SQLite uses a static/null pool; sizing arguments are not accepted.
+        return create_async_engine(url)
+
+    return create_async_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DatabaseConstants.POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=True,
+    )
+
+
+@lru_cache
+def get_engine() -> AsyncEngine:
+    """
+    Process-wide async engine. Every request-scoped unit of work checks a
+    single connection out of this engine's pool.
+    """
+    if not DatabaseConstants.URL:
+        raise RuntimeError("DATABASE_URL is not set")
+
+    return create_engine_for(
+        DatabaseConstants.URL,
+        DatabaseConstants.POOL_SIZE,
+        DatabaseConstants.MAX_OVERFLOW,
+    )
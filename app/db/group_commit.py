@@ -0,0 +1,201 @@
+# app/db/group_commit.py
+"""
+Group commit for small, independent writes from concurrent requests.
+
+Each caller submits the rows it needs written atomically (a registration's
+invite and its outbox row). Submissions arriving within a short window are
+written in one transaction, one multi-row INSERT per table, so a burst of N
+registrations costs a handful of statements and a single commit instead of
+N transactions. A caller waits at most the window plus the write itself;
+a batch that fills up is written immediately.
+
+Rows for a table with a conflict key (the outbox's idempotency_key) use
+ON CONFLICT DO NOTHING; the caller then gets the row already stored under
+that key. If a batch fails, its submissions are retried one transaction
+each so an error reaches only the caller that caused it.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Table, tuple_
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.db.engine import get_engine
+from app.db.upsert import dialect_insert, insert_values
+from app.metrics.instruments import GROUP_COMMIT_BATCH_ROWS, GROUP_COMMIT_BATCHES
+from app.utils.constants import GroupCommitConstants
+
+
+@dataclass(frozen=True)
+class GroupWrite:
+    table: Table
+    values: dict[str, Any]
+    conflict: tuple[str, ...] = ()
+
+    @classmethod
+    def of(cls, instance: Any, conflict: tuple[str, ...] = ()) -> "GroupWrite":
+        """A write for a model instance (see app.db.upsert.insert_values)."""
+        table, values = insert_values(instance)
+        return cls(table, values, conflict)
+
+    def key(self) -> tuple[Any, ...]:
+        names = self.conflict or tuple(c.name for c in self.table.primary_key)
+        return tuple(self.values[name] for name in names)
+
+
+@dataclass(frozen=True)
+class GroupResult:
+    row: dict[str, Any]
+    # False when the conflict key already existed and nothing was written
+    inserted: bool
+
+
+@dataclass
+class _Submission:
+    writes: list[GroupWrite]
+    future: "asyncio.Future[list[GroupResult]]" = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class GroupCommitter:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        name: str,
+        window: float = GroupCommitConstants.WINDOW_MS / 1000,
+        max_rows: int = GroupCommitConstants.MAX_ROWS,
+    ):
+        self.engine = engine
+        self.name = name
+        self.window = window
+        self.max_rows = max_rows
+        self._pending: list[_Submission] = []
+        self._pending_rows = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set[asyncio.Task[None]] = set()
+
+    async def submit(self, writes: Sequence[GroupWrite]) -> list[GroupResult]:
+        """
+        Write `writes` atomically, batched with other callers'. Returns one
+        result per write, in order. A cancelled caller's rows are still
+        written; callers rely on conflict keys when they retry.
+        """
+        submission = _Submission(list(writes))
+        self._pending.append(submission)
+        self._pending_rows += len(submission.writes)
+        if self._pending_rows >= self.max_rows:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window, self._flush_pending
+            )
+        return await asyncio.shield(submission.future)
+
+    async def close(self) -> None:
+        """Write whatever is pending and wait for in-flight batches."""
+        self._flush_pending()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _flush_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[_Submission]) -> None:
+        GROUP_COMMIT_BATCH_ROWS.observe(
+            sum(len(s.writes) for s in batch), writer=self.name
+        )
+        try:
+            async with self.engine.begin() as connection:
+                results = await self._write(connection, batch)
+        except Exception as e:
+            if len(batch) == 1:
+                GROUP_COMMIT_BATCHES.inc(writer=self.name, outcome="failed")
+                _settle(batch[0].future, error=e)
+                return
+            GROUP_COMMIT_BATCHES.inc(writer=self.name, outcome="split")
+            # One at a time: a rare path, and it shouldn't fan out over the pool
+            for submission in batch:
+                await self._flush([submission])
+            return
+        GROUP_COMMIT_BATCHES.inc(writer=self.name, outcome="committed")
+        for submission, result in zip(batch, results):
+            _settle(submission.future, result=result)
+
+    async def _write(
+        self, connection: AsyncConnection, batch: list[_Submission]
+    ) -> list[list[GroupResult]]:
+        # Tables are written in the order they first appear, so a parent row
+        # (the invite) lands before rows that reference it.
+        groups: dict[tuple[Table, tuple[str, ...]], list[GroupWrite]] = {}
+        for submission in batch:
+            for write in submission.writes:
+                groups.setdefault((write.table, write.conflict), []).append(write)
+
+        stored: dict[tuple[Table, tuple[Any, ...]], dict[str, Any]] = {}
+        inserted: set[int] = set()
+        for (table, conflict), writes in groups.items():
+            statement = dialect_insert(connection.dialect.name, table).values(
+                [write.values for write in writes]
+            )
+            if conflict:
+                statement = statement.on_conflict_do_nothing(index_elements=conflict)
+            result = await connection.execute(statement.returning(*table.columns))
+            names = conflict or tuple(c.name for c in table.primary_key)
+            written = set()
+            for row in result.mappings():
+                key = tuple(row[name] for name in names)
+                stored[(table, key)] = dict(row)
+                written.add(key)
+
+            # The first write per key owns the inserted row; later writes
+            # with that key, and keys that already existed, were skipped.
+            for write in writes:
+                if write.key() in written:
+                    inserted.add(id(write))
+                    written.discard(write.key())
+            missing = {w.key() for w in writes if (table, w.key()) not in stored}
+            if missing:
+                columns = tuple_(*(table.c[name] for name in names))
+                existing = await connection.execute(
+                    table.select().where(columns.in_(list(missing)))
+                )
+                for row in existing.mappings():
+                    stored[(table, tuple(row[name] for name in names))] = dict(row)
+
+        return [
+            [
+                GroupResult(stored[(w.table, w.key())], id(w) in inserted)
+                for w in submission.writes
+            ]
+            for submission in batch
+        ]
+
+
+def _settle(
+    future: "asyncio.Future[list[GroupResult]]",
+    result: Optional[list[GroupResult]] = None,
+    error: Optional[BaseException] = None,
+) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+        # Nobody may be waiting (caller cancelled); don't warn about it.
+        future.exception()
+    else:
+        future.set_result(result or [])
+
+
+@lru_cache
+def get_outbox_writer() -> GroupCommitter:
+    return GroupCommitter(get_engine(), "outbox")
@@ -0,0 +1,71 @@
+# app/db/migrations.py
+"""
+Schema this service needs on top of the tables platform_common creates.
+Each step is idempotent DDL, applied in order in one transaction; run it once
+per deploy, before the new code serves traffic:
+
+    python -m app.db.migrations
+"""
+import asyncio
+from typing import Awaitable, Callable
+
+from sqlalchemy import Table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.db.dal.hot_path import soft_delete_columns
+from app.jobs.user_purge import create_table as create_purge_jobs_table
+
+Migration = Callable[[AsyncConnection], Awaitable[None]]
+
+
+def add_soft_delete_columns(users: Table) -> Migration:
+    """
+    `deleted_at` and `is_active` on the users table, typed as the User model
+    declares them; existing users are live.
+    """
+    deleted_at, is_active = soft_delete_columns(users)
+
+    async def migrate(connection: AsyncConnection) -> None:
+        dialect = connection.dialect
+        await connection.execute(
+            text(
+                f"ALTER TABLE {users.name} ADD COLUMN IF NOT EXISTS deleted_at "
+                f"{deleted_at.type.compile(dialect=dialect)}"
+            )
+        )
+        await connection.execute(
+            text(
+                f"ALTER TABLE {users.name} ADD COLUMN IF NOT EXISTS is_active "
+                f"{is_active.type.compile(dialect=dialect)} NOT NULL DEFAULT true"
+            )
+        )
+
+    return migrate
+
+
+def default_migrations() -> list[Migration]:
+    from platform_common.models.user import User
+
+    return [
+        add_soft_delete_columns(User.__table__),  # type: ignore[attr-defined]
+        create_purge_jobs_table,
+    ]
+
+
+async def migrate(engine: AsyncEngine, migrations: list[Migration]) -> None:
+    async with engine.begin() as connection:
+        for migration in migrations:
+            await migration(connection)
+
+
+def main() -> None:
+    async def run() -> None:
+        from app.db.engine import get_engine
+
+        await migrate(get_engine(), default_migrations())
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# app/db/prepared.py
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Optional, cast
+
+from sqlalchemy.dialects.postgresql import asyncpg as asyncpg_dialect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ClauseElement, Executable
+
+from app.utils.constants import DatabaseConstants
+
+# Key under which prepared statements are cached in the pool's per-DBAPI
+# connection `info` dict; the cache lives exactly as long as the connection.
+_CONNECTION_INFO_KEY = "hot_path_prepared_statements"
+
+
+@dataclass
+class PreparedQuery:
+    """
+    A statement compiled once for the asyncpg dialect, plus its counters.
+    """
+
+    name: str
+    statement: ClauseElement
+    sql: str
+    positional_names: tuple[str, ...]
+    default_params: dict[str, Any]
+    compile_seconds: float
+    hits: int = 0
+    prepares: int = 0
+    prepare_seconds: float = 0.0
+    fallbacks: int = 0
+
+    def positional_args(self, params: Mapping[str, Any]) -> list[Any]:
+        return [
+            params[name] if name in params else self.default_params.get(name)
+            for name in self.positional_names
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        avg_prepare = self.prepare_seconds / self.prepares if self.prepares else 0.0
+        return {
+            "hits": self.hits,
+            "prepares": self.prepares,
+            "fallbacks": self.fallbacks,
+            "compile_ms": round(self.compile_seconds * 1000, 4),
+            # Every hit skips a SQLAlchemy compile and a server parse/plan.
+            "saved_ms": round(
+                self.hits * (self.compile_seconds + avg_prepare) * 1000, 4
+            ),
+        }
+
+
+class PreparedStatementRegistry:
+    """
+    Registry of precompiled, server-side prepared statements for hot-path
+    lookups.
+
+    Statements are compiled to SQL once per process. On asyncpg connections
+    they are prepared once per physical connection and reused for every later
+    call on that connection. On any other driver (e.g. aiosqlite in tests)
+    the SQLAlchemy statement is executed through the session as usual.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._queries: dict[str, PreparedQuery] = {}
+        self._dialect = asyncpg_dialect.dialect()  # type: ignore[no-untyped-call]
+
+    def get(self, name: str, build: Callable[[], ClauseElement]) -> PreparedQuery:
+        query = self._queries.get(name)
+        if query is None:
+            statement = build()
+            started = time.perf_counter()
+            compiled = statement.compile(dialect=self._dialect)
+            compile_seconds = time.perf_counter() - started
+            query = PreparedQuery(
+                name=name,
+                statement=statement,
+                sql=str(compiled),
+                positional_names=tuple(getattr(compiled, "positiontup", None) or ()),
+                default_params=dict(compiled.params),
+                compile_seconds=compile_seconds,
+            )
+            self._queries[name] = query
+        return query
+
+    async def fetch_one(
+        self,
+        session: AsyncSession,
+        name: str,
+        build: Callable[[], ClauseElement],
+        **params: Any,
+    ) -> Optional[dict[str, Any]]:
+        query = self.get(name, build)
+        driver_connection, cache = await self._driver_connection(session)
+        if driver_connection is None or cache is None:
+            query.fallbacks += 1
+            result = await session.execute(cast(Executable, query.statement), params)
+            row = result.mappings().first()
+            return dict(row) if row is not None else None
+
+        # The driver connection bypasses autoflush; make pending ORM writes
+        # visible to the raw statement first.
+        if session.new or session.dirty or session.deleted:
+            await session.flush()
+
+        args = query.positional_args(params)
+        prepared = await self._prepared(query, driver_connection, cache)
+        try:
+            record = await prepared.fetchrow(*args)
+        except Exception as e:
+            if type(e).__name__ != "InvalidCachedStatementError":
+                raise
+            # Schema changed under the cached plan: drop it. The failed
+            # statement has aborted any open transaction, so only a lookup
+            # outside one can retry now; otherwise the next transaction on
+            # this connection prepares afresh.
+            cache.pop(query.name, None)
+            if driver_connection.is_in_transaction():
+                raise
+            prepared = await self._prepared(query, driver_connection, cache)
+            record = await prepared.fetchrow(*args)
+        return dict(record) if record is not None else None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queries": {name: q.stats() for name, q in self._queries.items()},
+        }
+
+    async def _driver_connection(
+        self, session: AsyncSession
+    ) -> tuple[Any, Optional[dict[str, Any]]]:
+        if not self.enabled:
+            return None, None
+        connection = await session.connection()
+        if connection.dialect.driver != "asyncpg":
+            return None, None
+        raw = await connection.get_raw_connection()
+        cache = raw.info.setdefault(_CONNECTION_INFO_KEY, {})
+        return raw.driver_connection, cache
+
+    async def _prepared(
+        self, query: PreparedQuery, driver_connection: Any, cache: dict[str, Any]
+    ) -> Any:
+        prepared = cache.get(query.name)
+        if prepared is not None:
+            query.hits += 1
+            return prepared
+        started = time.perf_counter()
+        prepared = await driver_connection.prepare(query.sql)
+        query.prepare_seconds += time.perf_counter() - started
+        query.prepares += 1
+        cache[query.name] = prepared
+        return prepared
+
+
+hot_path_registry = PreparedStatementRegistry(
+    enabled=DatabaseConstants.PREPARED_STATEMENTS
+)
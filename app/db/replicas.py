@@ -0,0 +1,267 @@
+# app/db/replicas.py
+"""
+Read replicas with read-your-writes routing.
+
+Read-only handlers take their unit of work from `get_read_unit_of_work`
+(app/db/unit_of_work.py), which asks `route_read` for an engine:
+
+- A replica is eligible once the lag monitor (`run_replica_monitor`, run
+  from the lifespan) has seen it healthy and no more than
+  DB_REPLICA_MAX_LAG_SECONDS behind; otherwise reads fall back to the
+  primary.
+- When a request commits on the primary, ReadYourWritesMiddleware hands the
+  client the primary's position after the commit (its WAL LSN) in the
+  `db_read_after` cookie and the X-DB-Read-After header. A later read that
+  carries it only goes to a replica whose last observed replay position
+  has reached it, so clients always see their own writes.
+
+Writes and auth-critical reads (sessions, login, refresh, exchange) keep
+using the primary through `get_unit_of_work`.
+
+Local testing: point DATABASE_REPLICA_URLS at a second database (or at the
+primary itself) and set DB_REPLICA_SIMULATED_LAG_SECONDS. Positions are
+then wall-clock milliseconds and every replica reports itself that far
+behind, which exercises both the lag fallback and read-your-writes routing
+without streaming replication.
+"""
+import asyncio
+import itertools
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.engine import create_engine_for, get_engine
+from app.metrics.instruments import DB_READS_ROUTED
+from app.utils.constants import ReplicaConstants
+
+READ_AFTER_COOKIE = "db_read_after"
+READ_AFTER_HEADER = "x-db-read-after"
+
+# WAL positions as byte offsets, so they compare as integers
+_PRIMARY_POSITION = text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn")
+_REPLICA_STATUS = text(
+    """
+    SELECT
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END AS lag,
+        pg_last_wal_replay_lsn() - '0/0'::pg_lsn AS position
+    """
+)
+
+
+def _uses_clock(connection: AsyncConnection) -> bool:
+    return (
+        ReplicaConstants.SIMULATED_LAG_SECONDS is not None
+        or connection.dialect.name != "postgresql"
+    )
+
+
+async def primary_position(
+    connection: AsyncConnection, clock: Callable[[], float] = time.time
+) -> int:
+    if _uses_clock(connection):
+        return int(clock() * 1000)
+    return int(await connection.scalar(_PRIMARY_POSITION) or 0)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: AsyncEngine
+    healthy: bool = False
+    lag: Optional[float] = None
+    position: int = 0
+
+
+class ReplicaPool:
+    def __init__(
+        self,
+        replicas: list[Replica],
+        max_lag: float = ReplicaConstants.MAX_LAG_SECONDS,
+        simulated_lag: Optional[float] = ReplicaConstants.SIMULATED_LAG_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.simulated_lag = simulated_lag
+        self.clock = clock
+        self._turn = itertools.count()
+
+    async def check(self, replica: Replica) -> None:
+        """Refresh one replica's health, lag and replay position."""
+        try:
+            async with replica.engine.connect() as connection:
+                if (
+                    self.simulated_lag is not None
+                    or connection.dialect.name != "postgresql"
+                ):
+                    await connection.execute(text("SELECT 1"))
+                    lag = self.simulated_lag or 0.0
+                    position = int((self.clock() - lag) * 1000)
+                elif not await connection.scalar(text("SELECT pg_is_in_recovery()")):
+                    # Pointed at a primary (e.g. local testing): never behind
+                    lag, position = 0.0, await primary_position(connection)
+                else:
+                    row = (await connection.execute(_REPLICA_STATUS)).one()
+                    lag, position = float(row.lag or 0), int(row.position or 0)
+        except Exception:
+            replica.healthy = False
+            raise
+        replica.healthy, replica.lag, replica.position = True, lag, position
+
+    def choose(self, read_after: Optional[int] = None) -> tuple[Optional[Replica], str]:
+        """
+        A replica for this read and the routing reason; (None, reason) means
+        the read goes to the primary.
+        """
+        eligible = [
+            replica
+            for replica in self.replicas
+            if replica.healthy
+            and replica.lag is not None
+            and replica.lag <= self.max_lag
+        ]
+        if not eligible:
+            return None, "replicas_unavailable"
+        if read_after is not None:
+            eligible = [r for r in eligible if r.position >= read_after]
+            if not eligible:
+                return None, "read_your_writes"
+        return eligible[next(self._turn) % len(eligible)], "replica"
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+@lru_cache
+def get_replica_pool() -> Optional[ReplicaPool]:
+    if not ReplicaConstants.URLS:
+        return None
+    return ReplicaPool(
+        [
+            Replica(
+                name=f"replica{index}",
+                engine=create_engine_for(
+                    url, ReplicaConstants.POOL_SIZE, ReplicaConstants.MAX_OVERFLOW
+                ),
+            )
+            for index, url in enumerate(ReplicaConstants.URLS)
+        ]
+    )
+
+
+def read_after(request: Request) -> Optional[int]:
+    """The client's read-your-writes position (header wins over cookie)."""
+    raw = request.headers.get(READ_AFTER_HEADER) or request.cookies.get(
+        READ_AFTER_COOKIE
+    )
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def route_read(request: Request, pool: Optional[ReplicaPool] = None) -> AsyncEngine:
+    pool = pool if pool is not None else get_replica_pool()
+    if pool is None:
+        return get_engine()
+    replica, reason = pool.choose(read_after(request))
+    DB_READS_ROUTED.inc(target=replica.name if replica else "primary", reason=reason)
+    return replica.engine if replica is not None else get_engine()
+
+
+# -- read-your-writes tokens ------------------------------------------------
+
+
+class _WriteMarker:
+    """The primary's position after the current request's last commit."""
+
+    def __init__(self) -> None:
+        self.position: Optional[int] = None
+
+
+_write_marker: ContextVar[Optional[_WriteMarker]] = ContextVar(
+    "read_your_writes_marker", default=None
+)
+
+
+async def note_commit(connection: AsyncConnection) -> None:
+    """
+    Called by UnitOfWork.commit on the primary; a no-op outside requests
+    passing through ReadYourWritesMiddleware.
+    """
+    marker = _write_marker.get()
+    if marker is not None:
+        marker.position = await primary_position(connection)
+
+
+class ReadYourWritesMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_age: int = ReplicaConstants.READ_AFTER_MAX_AGE_SECONDS,
+    ):
+        self.app = app
+        self.max_age = max_age
+        self.secure = os.getenv("ENVIRONMENT", "local") != "local"
+
+    def _cookie(self, position: int) -> str:
+        cookie = (
+            f"{READ_AFTER_COOKIE}={position}; Max-Age={self.max_age}; Path=/; "
+            "HttpOnly; SameSite=Lax"
+        )
+        return cookie + "; Secure" if self.secure else cookie
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        marker = _WriteMarker()
+        token = _write_marker.set(marker)
+
+        async def send_with_position(message: Message) -> None:
+            if message["type"] == "http.response.start" and marker.position:
+                headers = MutableHeaders(scope=message)
+                headers.append(READ_AFTER_HEADER, str(marker.position))
+                headers.append("set-cookie", self._cookie(marker.position))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_position)
+        finally:
+            _write_marker.reset(token)
+
+
+async def run_replica_monitor() -> None:
+    from platform_common.logging.logging import get_logger
+
+    logger = get_logger("replica_monitor")
+    pool = get_replica_pool()
+    if pool is None:
+        return
+    while True:
+        for replica in pool.replicas:
+            was_healthy = replica.healthy
+            try:
+                await pool.check(replica)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if was_healthy:
+                    logger.warning(
+                        "Replica unavailable; reads fall back to the primary",
+                        replica=replica.name,
+                        error=str(e),
+                    )
+        await asyncio.sleep(ReplicaConstants.CHECK_INTERVAL_SECONDS)
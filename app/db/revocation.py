@@ -0,0 +1,22 @@
+# app/db/revocation.py
+"""
+The user-session revocation contract, in one place: UserSessionDAL's
+revoke_session stamps `revoked_at`, and a session is live while it is NULL.
+The hot-path DALs, the GraphQL loaders and the refresh flow all go through
+these helpers rather than reading the column themselves.
+"""
+from typing import Any
+
+from sqlalchemy import Table
+from sqlalchemy.sql.elements import ColumnElement
+
+REVOKED_AT = "revoked_at"
+
+
+def is_live(table: Table) -> ColumnElement[bool]:
+    """Filter matching sessions that have not been revoked."""
+    return table.c[REVOKED_AT].is_(None)
+
+
+def is_revoked(user_session: Any) -> bool:
+    return getattr(user_session, REVOKED_AT) is not None
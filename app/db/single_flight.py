@@ -0,0 +1,136 @@
+# app/db/single_flight.py
+"""
+Single-flight coalescing of concurrent identical lookups.
+
+A page load often fires several requests at once carrying the same refresh
+token or user id. With coalescing, the first caller for a key runs the
+query and callers arriving while it is in flight await that same result
+instead of issuing their own. Nothing is cached: once the query finishes,
+the next caller queries again, so results are never older than one query.
+
+Waiters per key are bounded; callers past the bound run their own query.
+An error raised by the shared query is raised to every caller sharing it,
+except when it comes from the leading caller's own limits: if that caller is
+cancelled (client gone, deadline) or runs out of time (its deadline, its
+statement_timeout), the callers waiting on it run the query themselves under
+their own budgets rather than failing.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.metrics.instruments import SINGLE_FLIGHT_LOOKUPS
+from app.resilience.breaker import DependencyTimeoutError
+
+T = TypeVar("T")
+
+_WROTE_KEY = "single_flight_wrote"
+
+# Postgres query_canceled: statement_timeout (or a cancel request) fired
+QUERY_CANCELED = "57014"
+
+
+class _LeaderGaveUp(Exception):
+    pass
+
+
+def _out_of_time(error: BaseException) -> bool:
+    """Whether `error` says the leader's time ran out, not that the query failed."""
+    if isinstance(error, (asyncio.TimeoutError, DependencyTimeoutError)):
+        return True
+    if isinstance(error, DBAPIError):
+        code = getattr(error.orig, "sqlstate", None) or getattr(
+            error.orig, "pgcode", None
+        )
+        return code == QUERY_CANCELED
+    return False
+
+
+class _Call(Generic[T]):
+    def __init__(self) -> None:
+        self.future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting when the query fails; don't warn about it.
+        self.future.add_done_callback(
+            lambda future: future.cancelled() or future.exception()
+        )
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, max_waiters: int = 64):
+        self.max_waiters = max_waiters
+        self._calls: dict[Hashable, _Call[Any]] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, lookup: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is not None:
+            if call.waiters >= self.max_waiters:
+                SINGLE_FLIGHT_LOOKUPS.inc(lookup=lookup, outcome="overflow")
+                return await fn()
+            call.waiters += 1
+            try:
+                # Shielded: a waiter being cancelled must not cancel the
+                # query everyone else is waiting on.
+                result: T = await asyncio.shield(call.future)
+            except _LeaderGaveUp:
+                SINGLE_FLIGHT_LOOKUPS.inc(lookup=lookup, outcome="retried")
+                return await fn()
+            SINGLE_FLIGHT_LOOKUPS.inc(lookup=lookup, outcome="shared")
+            return result
+
+        call = _Call()
+        self._calls[key] = call
+        SINGLE_FLIGHT_LOOKUPS.inc(lookup=lookup, outcome="leader")
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.future.set_exception(_LeaderGaveUp())
+            raise
+        except BaseException as e:
+            call.future.set_exception(_LeaderGaveUp() if _out_of_time(e) else e)
+            raise
+        else:
+            call.future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+
+# -- sessions that must not share reads -------------------------------------
+#
+# A session that has written in its transaction may read its own uncommitted
+# rows; another caller's query cannot see them, so such a session always
+# queries for itself.
+
+
+def note_write(session: AsyncSession) -> None:
+    """For writes that bypass the ORM (e.g. raw prepared statements)."""
+    session.sync_session.info[_WROTE_KEY] = True
+
+
+def has_written(session: AsyncSession) -> bool:
+    return bool(
+        session.new
+        or session.dirty
+        or session.deleted
+        or session.sync_session.info.get(_WROTE_KEY)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context: Any) -> None:
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[_WROTE_KEY] = True
@@ -0,0 +1,146 @@
+# app/db/unit_of_work.py
+from types import TracebackType
+from typing import Any, AsyncIterator, Optional, Type, TypeVar, cast
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    AsyncTransaction,
+)
+
+from app.db.engine import get_engine
+from app.db.replicas import note_commit, route_read
+from app.metrics.dal import InstrumentedDAL
+from app.resilience.budget import mark_committed, statement_timeout_ms
+from app.utils.constants import ResilienceConstants
+
+DalT = TypeVar("DalT")
+
+
+class UnitOfWork:
+    """
+    One connection, one transaction and one session for the lifetime of a
+    request.
+
+    DALs obtained through `get()` all share the same session. The session
+    joins the outer connection transaction in "create_savepoint" mode, so a
+    DAL that calls `session.commit()` internally only releases a savepoint;
+    nothing is durable until `commit()` is called on the unit of work. If the
+    unit of work exits without an explicit commit, everything is rolled back.
+    """
+
+    def __init__(self, engine: AsyncEngine, read_only: bool = False):
+        self._engine = engine
+        self.read_only = read_only
+        self._connection: Optional[AsyncConnection] = None
+        self._transaction: Optional[AsyncTransaction] = None
+        self._session: Optional[AsyncSession] = None
+        self._dals: dict[type, Any] = {}
+        self.committed = False
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            raise RuntimeError("UnitOfWork used outside of its context")
+        return self._session
+
+    def get(self, dal_cls: Type[DalT]) -> DalT:
+        """
+        Return the DAL instance of the given class bound to this unit of work.
+        Instances are created lazily and reused for the rest of the request;
+        each is wrapped so its calls are recorded in the DAL latency metrics.
+        """
+        dal: Any = self._dals.get(dal_cls)
+        if dal is None:
+            dal = InstrumentedDAL(dal_cls(self.session))  # type: ignore[call-arg]
+            self._dals[dal_cls] = dal
+        return cast(DalT, dal)
+
+    async def commit(self) -> None:
+        if self._transaction is None or self.committed:
+            return
+        await self.session.flush()
+        if not self.read_only:
+            # Past this point the request must not be cut short
+            mark_committed()
+        await self._transaction.commit()
+        self.committed = True
+        if not self.read_only and self._connection is not None:
+            # Lets the client read this write back from a replica later
+            await note_commit(self._connection)
+
+    async def rollback(self) -> None:
+        if self._transaction is None or self.committed:
+            return
+        if self._transaction.is_active:
+            await self._transaction.rollback()
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._connection = await self._engine.connect()
+        self._transaction = await self._connection.begin()
+        await self._bound_statements(self._connection)
+        self._session = AsyncSession(
+            bind=self._connection,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+        )
+        return self
+
+    async def _bound_statements(self, connection: AsyncConnection) -> None:
+        """
+        Cap every statement in this transaction by the request's remaining
+        latency budget, so the database stops work nobody will wait for.
+        """
+        if not ResilienceConstants.DB_STATEMENT_TIMEOUTS:
+            return
+        if connection.dialect.name != "postgresql":
+            return
+        timeout = statement_timeout_ms()
+        if timeout is not None:
+            await connection.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {"timeout": str(timeout)},
+            )
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        try:
+            await self.rollback()
+        finally:
+            if self._session is not None:
+                await self._session.close()
+            if self._connection is not None:
+                await self._connection.close()
+            self._session = None
+            self._connection = None
+            self._transaction = None
+            self._dals.clear()
+
+
+async def get_unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """
+    FastAPI dependency yielding the request-scoped unit of work.
+
+    FastAPI caches dependencies per request, so every handler dependency that
+    asks for this gets the same instance.
+    """
+    async with UnitOfWork(get_engine()) as uow:
+        yield uow
+
+
+async def get_read_unit_of_work(request: Request) -> AsyncIterator[UnitOfWork]:
+    """
+    FastAPI dependency for read-only handlers: the unit of work runs on a
+    read replica when one is fresh enough for this client, otherwise on the
+    primary (see app/db/replicas.py). Never use it for handlers that write
+    or make authentication decisions.
+    """
+    async with UnitOfWork(route_read(request), read_only=True) as uow:
+        yield uow
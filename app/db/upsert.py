@@ -0,0 +1,169 @@
+# app/db/upsert.py
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional, Union, cast
+
+from sqlalchemy import Boolean, Table, and_, exists, false, literal_column, select, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import object_mapper
+
+
+def dialect_insert(dialect_name: str, table: Table) -> Any:
+    """
+    An INSERT supporting ON CONFLICT ... DO UPDATE for `dialect_name`
+    (Postgres in production, SQLite in tests).
+    """
+    if dialect_name == "postgresql":
+        return postgresql.insert(table)
+    if dialect_name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(
+        f"ON CONFLICT upserts are not supported on {dialect_name}"
+    )
+
+
+def _python_default(column: Any) -> Any:
+    default = column.default
+    if default is None:
+        return None
+    if default.is_scalar:
+        return default.arg
+    if default.is_callable:
+        return default.arg(None)
+    return None
+
+
+def insert_values(instance: Any) -> tuple[Table, dict[str, Any]]:
+    """
+    The table and INSERT values for a model instance, with the column's
+    Python-side default (id, timestamps) filled in wherever the instance has
+    no value, as a flush would. Columns with a server default, and an unset
+    autoincrement key, are left to the database.
+    """
+    table = cast(Table, object_mapper(instance).local_table)
+    values = {}
+    for c in table.columns:
+        if c.server_default is not None:
+            continue
+        value = getattr(instance, c.name, None)
+        if value is None:
+            value = _python_default(c)
+        if value is None and c is table.autoincrement_column:
+            continue
+        values[c.name] = value
+    return table, values
+
+
+@dataclass(frozen=True)
+class UpsertedUser:
+    row: dict[str, Any]
+    created: bool
+    newly_verified: bool
+
+
+def _conflict_update(table: Table, insert: Any) -> Any:
+    # Only ever upgrade verification, and never touch a soft-deleted user;
+    # when nothing changes the existing row is not rewritten at all.
+    condition = and_(~table.c.is_verified, insert.excluded.is_verified)
+    if "deleted_at" in table.c:
+        condition = and_(condition, table.c.deleted_at.is_(None))
+    return insert.on_conflict_do_update(
+        index_elements=[table.c.idp_uid],
+        set_={"is_verified": true()},
+        where=condition,
+    )
+
+
+def _live(table: Table) -> Any:
+    return table.c.deleted_at.is_(None) if "deleted_at" in table.c else true()
+
+
+def idp_user_upsert(table: Table, values: Mapping[str, Any]) -> Any:
+    """
+    Postgres: find-or-create by idp_uid in one statement.
+
+        WITH upserted AS (
+            INSERT INTO users (...) VALUES (...)
+            ON CONFLICT (idp_uid) DO UPDATE SET is_verified = true
+            WHERE NOT users.is_verified AND excluded.is_verified
+            RETURNING users.*, xmax = 0 AS created, true AS changed)
+        SELECT * FROM upserted
+        UNION ALL
+        SELECT users.*, false, false FROM users
+        WHERE idp_uid = :idp_uid AND NOT EXISTS (SELECT 1 FROM upserted)
+
+    `xmax = 0` is true only for a row this statement inserted. The second
+    branch returns an existing row the conflict clause left alone; it reads
+    the statement's snapshot, so it may miss a row committed concurrently.
+    """
+    insert = _conflict_update(table, postgresql.insert(table).values(**values))
+    upserted = insert.returning(
+        *table.columns,
+        literal_column("(xmax = 0)", Boolean).label("created"),
+        true().label("changed"),
+    ).cte("upserted")
+    existing = select(
+        *table.columns, false().label("created"), false().label("changed")
+    ).where(
+        table.c.idp_uid == values["idp_uid"],
+        _live(table),
+        ~exists(select(upserted.c.idp_uid)),
+    )
+    return select(upserted).union_all(existing)
+
+
+async def upsert_idp_user(
+    db: Union[AsyncSession, AsyncConnection], table: Table, values: Mapping[str, Any]
+) -> Optional[UpsertedUser]:
+    """
+    Find the user with `values["idp_uid"]` or create it from `values`,
+    upgrading is_verified when `values` says verified. Safe against
+    concurrent first logins. Returns None for a soft-deleted user.
+    """
+    connection = await db.connection() if isinstance(db, AsyncSession) else db
+    if connection.dialect.name == "postgresql":
+        result = await db.execute(idp_user_upsert(table, values))
+        row = result.mappings().first()
+        if row is not None:
+            fields = dict(row)
+            created, changed = fields.pop("created"), fields.pop("changed")
+            return UpsertedUser(fields, bool(created), bool(changed and not created))
+        # Lost a race with a concurrent insert the snapshot cannot see yet;
+        # a new statement can.
+        return await _select_live(db, table, values["idp_uid"])
+
+    # Other dialects (SQLite in tests): no DML in CTEs, so look first.
+    prior = (
+        await db.execute(
+            select(table.c.is_verified).where(
+                table.c.idp_uid == values["idp_uid"], _live(table)
+            )
+        )
+    ).first()
+    if prior is None:
+        deleted = await db.scalar(
+            select(table.c.idp_uid).where(table.c.idp_uid == values["idp_uid"])
+        )
+        if deleted is not None:
+            return None
+    insert = _conflict_update(
+        table, dialect_insert(connection.dialect.name, table).values(**values)
+    )
+    row = (await db.execute(insert.returning(*table.columns))).mappings().first()
+    if row is None:
+        return await _select_live(db, table, values["idp_uid"])
+    return UpsertedUser(
+        dict(row),
+        created=prior is None,
+        newly_verified=prior is not None and not prior[0] and bool(row["is_verified"]),
+    )
+
+
+async def _select_live(
+    db: Union[AsyncSession, AsyncConnection], table: Table, idp_uid: str
+) -> Optional[UpsertedUser]:
+    result = await db.execute(
+        select(table).where(table.c.idp_uid == idp_uid, _live(table))
+    )
+    row = result.mappings().first()
+    return UpsertedUser(dict(row), False, False) if row is not None else None
@@ -0,0 +1,42 @@
+# app/graphql/context.py
+from typing import Optional
+
+from fastapi import Depends, Request
+from platform_common.db.dal.organization_member_dal import OrganizationMemberDAL
+from platform_common.db.dal.user_dal import UserDAL
+from platform_common.db.dal.user_session_dal import UserSessionDAL
+from strawberry.fastapi import BaseContext
+
+from app.auth.access_tokens import caller_id
+from app.db.unit_of_work import UnitOfWork, get_read_unit_of_work
+from app.graphql.loaders import BatchLoaders
+from app.utils.constants import GraphQLConstants
+
+
+class GraphQLContext(BaseContext):
+    def __init__(self, loaders: BatchLoaders, viewer_id: Optional[str] = None):
+        super().__init__()
+        self.loaders = loaders
+        # The authenticated caller; scopes sessions and memberships
+        self.viewer_id = viewer_id
+
+
+async def get_graphql_context(
+    request: Request,
+    uow: UnitOfWork = Depends(get_read_unit_of_work),
+) -> GraphQLContext:
+    """
+    Fresh loaders per request, reading through the request's unit of work
+    (so GraphQL reads share its connection and pool accounting). The API is
+    read-only, so it reads from a replica when one is fresh enough.
+    """
+    return GraphQLContext(
+        BatchLoaders(
+            uow.session,
+            users=uow.get(UserDAL).model.__table__,
+            sessions=uow.get(UserSessionDAL).model.__table__,
+            memberships=uow.get(OrganizationMemberDAL).model.__table__,
+            max_batch_size=GraphQLConstants.MAX_LIST_SIZE,
+        ),
+        viewer_id=caller_id(request),
+    )
@@ -0,0 +1,134 @@
+# app/graphql/limits.py
+"""
+Static cost analysis for GraphQL operations.
+
+Each selected field costs 1; the selections under a list field are
+multiplied by its expected length, taken from a literal `limit` argument, the
+length of a literal `ids` list, the argument's declared default, or a fixed
+default otherwise. Variables are not known at validation time, so a `limit`
+or `ids` given as a variable is priced at the largest size the resolvers
+accept. Operations over budget are rejected during validation, before any
+resolver or query runs.
+"""
+from typing import Any, Optional
+
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLNamedType,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    IntValueNode,
+    ListValueNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    ValidationRule,
+    get_named_type,
+    get_nullable_type,
+    is_list_type,
+)
+
+
+def _list_size(
+    node: FieldNode, field: GraphQLField, default_size: int, max_size: int
+) -> int:
+    for argument in node.arguments or ():
+        name, value = argument.name.value, argument.value
+        if name == "limit":
+            if isinstance(value, IntValueNode):
+                return min(max(int(value.value), 0), max_size)
+            return max_size
+        if name == "ids":
+            if isinstance(value, ListValueNode):
+                return len(value.values)
+            return max_size
+    limit = field.args.get("limit")
+    if limit is not None and isinstance(limit.default_value, int):
+        return limit.default_value
+    return default_size
+
+
+def complexity_limit_rule(
+    max_complexity: int, default_list_size: int, max_list_size: int
+) -> type[ValidationRule]:
+    class QueryComplexityRule(ValidationRule):
+        def enter_operation_definition(
+            self, node: OperationDefinitionNode, *_args: Any
+        ) -> None:
+            root = self.context.schema.get_root_type(node.operation)
+            if root is None:
+                return
+            cost = self._selection_cost(node.selection_set, root, frozenset())
+            if cost > max_complexity:
+                self.report_error(
+                    GraphQLError(
+                        f"Query complexity {cost} exceeds the limit of "
+                        f"{max_complexity}",
+                        node,
+                    )
+                )
+
+        def _selection_cost(
+            self,
+            selection_set: Optional[SelectionSetNode],
+            parent: GraphQLNamedType,
+            seen_fragments: frozenset[str],
+        ) -> int:
+            if selection_set is None:
+                return 0
+            cost = 0
+            for selection in selection_set.selections:
+                if isinstance(selection, FieldNode):
+                    cost += self._field_cost(selection, parent, seen_fragments)
+                elif isinstance(selection, InlineFragmentNode):
+                    target = parent
+                    if selection.type_condition is not None:
+                        target = (
+                            self.context.schema.get_type(
+                                selection.type_condition.name.value
+                            )
+                            or parent
+                        )
+                    cost += self._selection_cost(
+                        selection.selection_set, target, seen_fragments
+                    )
+                elif isinstance(selection, FragmentSpreadNode):
+                    name = selection.name.value
+                    fragment = self.context.get_fragment(name)
+                    # Cycles are reported by the standard NoFragmentCycles rule
+                    if fragment is None or name in seen_fragments:
+                        continue
+                    target = (
+                        self.context.schema.get_type(fragment.type_condition.name.value)
+                        or parent
+                    )
+                    cost += self._selection_cost(
+                        fragment.selection_set, target, seen_fragments | {name}
+                    )
+            return cost
+
+        def _field_cost(
+            self,
+            node: FieldNode,
+            parent: GraphQLNamedType,
+            seen_fragments: frozenset[str],
+        ) -> int:
+            # Introspection (`__typename`, `__schema`, ...) is served from the
+            # schema itself and never reaches a loader.
+            if node.name.value.startswith("__"):
+                return 0
+            if not isinstance(parent, GraphQLObjectType):
+                return 1
+            field = parent.fields.get(node.name.value)
+            if field is None:
+                return 1  # unknown fields are reported by FieldsOnCorrectType
+            child_cost = self._selection_cost(
+                node.selection_set, get_named_type(field.type), seen_fragments
+            )
+            if is_list_type(get_nullable_type(field.type)):
+                child_cost *= _list_size(node, field, default_list_size, max_list_size)
+            return 1 + child_cost
+
+    return QueryComplexityRule
@@ -0,0 +1,118 @@
+# app/graphql/loaders.py
+"""
+Request-scoped DataLoaders behind the GraphQL read API.
+
+Every lookup a resolver makes within one tick of the event loop is collected
+by its loader, de-duplicated, and answered with a single
+`SELECT ... WHERE <column> IN (...)` on the request's session, so a query
+touching N users costs one statement per relation instead of N. Loaders also
+cache per key, so a user reachable through several paths is read once.
+"""
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import Table, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+from strawberry.dataloader import DataLoader
+
+from app.db.revocation import is_live
+from app.metrics.instruments import GRAPHQL_LOADER_BATCH_KEYS
+
+Row = Mapping[Any, Any]
+
+
+def one_per_key(rows: Iterable[Row], keys: Sequence[str], column: str) -> list[Any]:
+    by_key = {row[column]: row for row in rows}
+    return [by_key.get(key) for key in keys]
+
+
+def many_per_key(
+    rows: Iterable[Row], keys: Sequence[str], column: str
+) -> list[list[Row]]:
+    by_key: dict[str, list[Row]] = {key: [] for key in keys}
+    for row in rows:
+        bucket = by_key.get(row[column])
+        if bucket is not None:
+            bucket.append(row)
+    return [by_key[key] for key in keys]
+
+
+def _newest_first(rows: list[Row]) -> list[Row]:
+    return sorted(rows, key=lambda row: row.get("created_at") or 0, reverse=True)
+
+
+class BatchLoaders:
+    """
+    The loaders for one request. Never share an instance across requests:
+    the per-key cache would serve one caller's reads to another.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        users: Table,
+        sessions: Table,
+        memberships: Table,
+        max_batch_size: Optional[int] = None,
+    ):
+        self._session = session
+        self._users = users
+        self._sessions = sessions
+        self._memberships = memberships
+
+        self.user_by_id: DataLoader[str, Optional[Row]] = DataLoader(
+            self._load_users, max_batch_size=max_batch_size
+        )
+        self.sessions_by_user: DataLoader[str, list[Row]] = DataLoader(
+            self._load_sessions, max_batch_size=max_batch_size
+        )
+        self.memberships_by_user: DataLoader[str, list[Row]] = DataLoader(
+            self._load_memberships_by_user, max_batch_size=max_batch_size
+        )
+        self.memberships_by_organization: DataLoader[str, list[Row]] = DataLoader(
+            self._load_memberships_by_organization, max_batch_size=max_batch_size
+        )
+
+    async def _fetch(
+        self,
+        loader: str,
+        table: Table,
+        column: str,
+        keys: Sequence[str],
+        *where: ColumnElement[bool],
+    ) -> list[Row]:
+        GRAPHQL_LOADER_BATCH_KEYS.observe(len(keys), loader=loader)
+        statement = select(table).where(table.c[column].in_(keys), *where)
+        result = await self._session.execute(statement)
+        return list(result.mappings().all())
+
+    async def _load_users(self, keys: list[str]) -> list[Optional[Row]]:
+        rows = await self._fetch("user_by_id", self._users, "id", keys)
+        # Soft-deleted users are gone as far as readers are concerned
+        live = [row for row in rows if not row.get("deleted_at")]
+        return one_per_key(live, keys, "id")
+
+    async def _load_sessions(self, keys: list[str]) -> list[list[Row]]:
+        # Same contract as the session DALs: revoked sessions are not returned.
+        rows = await self._fetch(
+            "sessions_by_user",
+            self._sessions,
+            "user_id",
+            keys,
+            is_live(self._sessions),
+        )
+        return [_newest_first(group) for group in many_per_key(rows, keys, "user_id")]
+
+    async def _load_memberships_by_user(self, keys: list[str]) -> list[list[Row]]:
+        rows = await self._fetch(
+            "memberships_by_user", self._memberships, "user_id", keys
+        )
+        return many_per_key(rows, keys, "user_id")
+
+    async def _load_memberships_by_organization(
+        self, keys: list[str]
+    ) -> list[list[Row]]:
+        rows = await self._fetch(
+            "memberships_by_organization", self._memberships, "organization_id", keys
+        )
+        return many_per_key(rows, keys, "organization_id")
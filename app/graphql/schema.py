@@ -0,0 +1,199 @@
+# app/graphql/schema.py
+"""
+Read-only GraphQL schema over users, their sessions and their organization
+memberships. Every relation resolves through the request's BatchLoaders
+(app/graphql/loaders.py), so nested selections never issue per-row queries.
+Refresh tokens are never exposed.
+
+Callers only see their own sessions, and only memberships in organizations
+they belong to themselves; anything else resolves to an empty list.
+"""
+import datetime
+from typing import Any, Optional
+
+import strawberry
+from strawberry.extensions import (
+    AddValidationRules,
+    MaxAliasesLimiter,
+    QueryDepthLimiter,
+)
+
+from app.graphql.limits import complexity_limit_rule
+from app.graphql.loaders import Row
+from app.utils.constants import GraphQLConstants
+
+
+def _epoch(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+def _list_size(limit: int) -> int:
+    return max(0, min(limit, GraphQLConstants.MAX_LIST_SIZE))
+
+
+def _is_viewer(info: strawberry.Info, user_id: str) -> bool:
+    viewer_id = info.context.viewer_id
+    return viewer_id is not None and viewer_id == user_id
+
+
+async def _viewer_organizations(info: strawberry.Info) -> set[str]:
+    viewer_id = info.context.viewer_id
+    if viewer_id is None:
+        return set()
+    rows = await info.context.loaders.memberships_by_user.load(viewer_id)
+    return {str(row["organization_id"]) for row in rows}
+
+
+@strawberry.type
+class Session:
+    id: strawberry.ID
+    user_id: strawberry.ID
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    created_at: Optional[int]
+    last_active_at: Optional[int]
+    expires_at: Optional[int]
+
+    @classmethod
+    def from_row(cls, row: Row) -> "Session":
+        return cls(
+            id=strawberry.ID(row["id"]),
+            user_id=strawberry.ID(row["user_id"]),
+            ip_address=row.get("ip_address"),
+            user_agent=row.get("user_agent"),
+            created_at=_epoch(row.get("created_at")),
+            last_active_at=_epoch(row.get("last_active_at")),
+            expires_at=_epoch(row.get("expires_at")),
+        )
+
+
+@strawberry.type
+class Membership:
+    id: strawberry.ID
+    user_id: strawberry.ID
+    organization_id: strawberry.ID
+    role: Optional[str]
+    status: Optional[str]
+    created_at: Optional[int]
+
+    @classmethod
+    def from_row(cls, row: Row) -> "Membership":
+        role, status = row.get("role"), row.get("status")
+        return cls(
+            id=strawberry.ID(row["id"]),
+            user_id=strawberry.ID(row["user_id"]),
+            organization_id=strawberry.ID(row["organization_id"]),
+            role=str(getattr(role, "value", role)) if role is not None else None,
+            status=(
+                str(getattr(status, "value", status)) if status is not None else None
+            ),
+            created_at=_epoch(row.get("created_at")),
+        )
+
+    @strawberry.field
+    async def user(self, info: strawberry.Info) -> Optional["User"]:
+        row = await info.context.loaders.user_by_id.load(str(self.user_id))
+        return User.from_row(row) if row else None
+
+
+@strawberry.type
+class User:
+    id: strawberry.ID
+    email: str
+    username: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+    organization_id: Optional[strawberry.ID]
+    is_verified: bool
+    is_active: bool
+    created_at: Optional[int]
+    updated_at: Optional[int]
+
+    @classmethod
+    def from_row(cls, row: Row) -> "User":
+        organization_id = row.get("organization_id")
+        return cls(
+            id=strawberry.ID(row["id"]),
+            email=row["email"],
+            username=row.get("username"),
+            first_name=row.get("first_name"),
+            last_name=row.get("last_name"),
+            organization_id=(
+                strawberry.ID(organization_id) if organization_id else None
+            ),
+            is_verified=bool(row.get("is_verified", False)),
+            is_active=bool(row.get("is_active", True)),
+            created_at=_epoch(row.get("created_at")),
+            updated_at=_epoch(row.get("updated_at")),
+        )
+
+    # Active (non-revoked) sessions, newest first; the caller's own only
+    @strawberry.field
+    async def sessions(self, info: strawberry.Info, limit: int = 10) -> list[Session]:
+        if not _is_viewer(info, str(self.id)):
+            return []
+        rows = await info.context.loaders.sessions_by_user.load(str(self.id))
+        return [Session.from_row(row) for row in rows[: _list_size(limit)]]
+
+    @strawberry.field
+    async def memberships(
+        self, info: strawberry.Info, limit: int = 10
+    ) -> list[Membership]:
+        rows = await info.context.loaders.memberships_by_user.load(str(self.id))
+        if not _is_viewer(info, str(self.id)):
+            shared = await _viewer_organizations(info)
+            rows = [row for row in rows if str(row["organization_id"]) in shared]
+        return [Membership.from_row(row) for row in rows[: _list_size(limit)]]
+
+
+@strawberry.type
+class Query:
+    @strawberry.field
+    async def user(self, info: strawberry.Info, id: strawberry.ID) -> Optional[User]:
+        row = await info.context.loaders.user_by_id.load(str(id))
+        return User.from_row(row) if row else None
+
+    # Users by id, in request order; null for ids that do not exist
+    @strawberry.field
+    async def users(
+        self, info: strawberry.Info, ids: list[strawberry.ID]
+    ) -> list[Optional[User]]:
+        if len(ids) > GraphQLConstants.MAX_LIST_SIZE:
+            raise ValueError(
+                f"At most {GraphQLConstants.MAX_LIST_SIZE} ids may be requested"
+            )
+        rows = await info.context.loaders.user_by_id.load_many([str(i) for i in ids])
+        return [User.from_row(row) if row else None for row in rows]
+
+    @strawberry.field
+    async def organization_members(
+        self, info: strawberry.Info, organization_id: strawberry.ID, limit: int = 50
+    ) -> list[Membership]:
+        if str(organization_id) not in await _viewer_organizations(info):
+            return []
+        rows = await info.context.loaders.memberships_by_organization.load(
+            str(organization_id)
+        )
+        return [Membership.from_row(row) for row in rows[: _list_size(limit)]]
+
+
+schema = strawberry.Schema(
+    query=Query,
+    extensions=[
+        QueryDepthLimiter(max_depth=GraphQLConstants.MAX_DEPTH),
+        MaxAliasesLimiter(max_alias_count=GraphQLConstants.MAX_ALIASES),
+        AddValidationRules(
+            [
+                complexity_limit_rule(
+                    GraphQLConstants.MAX_COMPLEXITY,
+                    GraphQLConstants.DEFAULT_LIST_SIZE,
+                    GraphQLConstants.MAX_LIST_SIZE,
+                )
+            ]
+        ),
+    ],
+)
@@ -0,0 +1,214 @@
+# app/idempotency/middleware.py
+import asyncio
+import hashlib
+import json
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.idempotency.store import IdempotencyStore, StoredResponse, default_store
+from app.metrics.instruments import IDEMPOTENCY_REQUESTS
+from app.utils.constants import IdempotencyConstants
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+
+
+def parse_routes(spec: str) -> set[tuple[str, str]]:
+    routes = set()
+    for item in spec.split(","):
+        method, _, path = item.strip().partition(" ")
+        if method and path:
+            routes.add((method.upper(), path.strip()))
+    return routes
+
+
+class IdempotencyMiddleware:
+    """
+    Makes the configured routes safe to retry with an `Idempotency-Key`.
+
+    The first request for a key runs normally and its response (status,
+    headers, body) is stored for IDEMPOTENCY_TTL_SECONDS; repeats within that
+    window get the stored response back with `Idempotent-Replayed: true` and
+    never reach the handler. Duplicates arriving while the first is still
+    running wait for it in this process, or get 409 if another replica holds
+    the key. Reusing a key with a different body/query is a 422. 5xx
+    responses are not stored, so the client may retry them.
+
+    Keys are scoped per method, path and Authorization header, so two callers
+    cannot collide on (or read) each other's keys. They are kept in the
+    database by default (IDEMPOTENCY_BACKEND), so they hold across workers
+    and replicas.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: Optional[IdempotencyStore] = None,
+        routes: Iterable[tuple[str, str]] = parse_routes(IdempotencyConstants.ROUTES),
+        ttl: float = IdempotencyConstants.TTL_SECONDS,
+        lock_ttl: float = IdempotencyConstants.LOCK_TTL_SECONDS,
+    ):
+        self.app = app
+        self.store = store or default_store()
+        self.routes = set(routes)
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._in_flight: dict[str, asyncio.Future[Optional[StoredResponse]]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or (scope["method"], scope["path"]) not in self.routes
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > IdempotencyConstants.MAX_KEY_LENGTH:
+            await self._error(send, 400, "Idempotency-Key is too long", "KEY_TOO_LONG")
+            return
+
+        body = await self._read_body(receive)
+        caller = hashlib.sha256(headers.get("authorization", "").encode()).hexdigest()
+        key = f"{scope['method']}:{scope['path']}:{caller[:32]}:{idempotency_key}"
+        fingerprint = hashlib.sha256(
+            scope.get("query_string", b"") + b"\0" + body
+        ).hexdigest()
+
+        waiting = self._in_flight.get(key)
+        if waiting is not None:
+            IDEMPOTENCY_REQUESTS.inc(outcome="coalesced")
+            await self._replay(send, await asyncio.shield(waiting), fingerprint)
+            return
+
+        stored = await self.store.get(key)
+        if stored is not None:
+            IDEMPOTENCY_REQUESTS.inc(outcome="replayed")
+            await self._replay(send, stored, fingerprint)
+            return
+
+        if not await self.store.reserve(key, self.lock_ttl):
+            IDEMPOTENCY_REQUESTS.inc(outcome="in_progress")
+            await self._error(
+                send,
+                409,
+                "A request with this Idempotency-Key is already in progress",
+                "IDEMPOTENCY_KEY_IN_PROGRESS",
+            )
+            return
+
+        future: asyncio.Future[Optional[StoredResponse]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._in_flight[key] = future
+        try:
+            response = await self._run(scope, body, receive, send, fingerprint)
+        except BaseException:
+            await self.store.release(key)
+            future.set_result(None)
+            raise
+        else:
+            if response.status < 500:
+                await self.store.complete(key, response, self.ttl)
+                IDEMPOTENCY_REQUESTS.inc(outcome="stored")
+            else:
+                await self.store.release(key)
+            future.set_result(response)
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _run(
+        self,
+        scope: Scope,
+        body: bytes,
+        receive: Receive,
+        send: Send,
+        fingerprint: str,
+    ) -> StoredResponse:
+        replayed_body = False
+
+        async def replay_body() -> Message:
+            nonlocal replayed_body
+            if not replayed_body:
+                replayed_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Body already consumed; further reads wait for the disconnect.
+            return await receive()
+
+        status = 500
+        headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+
+        async def capture(message: Message) -> None:
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, replay_body, capture)
+        return StoredResponse(fingerprint, status, headers, b"".join(chunks))
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _replay(
+        self, send: Send, stored: Optional[StoredResponse], fingerprint: str
+    ) -> None:
+        if stored is None:
+            await self._error(
+                send,
+                409,
+                "The original request with this Idempotency-Key failed; retry",
+                "IDEMPOTENCY_KEY_FAILED",
+            )
+            return
+        if stored.fingerprint != fingerprint:
+            IDEMPOTENCY_REQUESTS.inc(outcome="mismatch")
+            await self._error(
+                send,
+                422,
+                "Idempotency-Key was reused with a different request",
+                "IDEMPOTENCY_KEY_MISMATCH",
+            )
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": stored.status,
+                "headers": stored.headers + [REPLAYED_HEADER],
+            }
+        )
+        await send({"type": "http.response.body", "body": stored.body})
+
+    @staticmethod
+    async def _error(send: Send, status: int, message: str, code: str) -> None:
+        body = json.dumps({"message": message, "code": code}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,254 @@
+# app/idempotency/store.py
+"""
+Storage for idempotency keys. A key is first reserved while its request runs,
+then either completed with the response to replay or released so the client
+can retry. Backends only need these four operations; a shared backend (Redis,
+a database table) makes keys hold across replicas.
+"""
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import (
+    Column,
+    Float,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    delete,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.engine import get_engine
+from app.db.upsert import dialect_insert
+from app.utils.constants import IdempotencyConstants
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+class IdempotencyStore(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        """Completed response for `key`, if still within its TTL."""
+
+    @abstractmethod
+    async def reserve(self, key: str, ttl: float) -> bool:
+        """Claim `key` for processing; False if it is already claimed."""
+
+    @abstractmethod
+    async def complete(self, key: str, response: StoredResponse, ttl: float) -> None:
+        """Store the response for replay and drop the claim."""
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Drop the claim without storing anything."""
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """
+    Per-process backend for tests and single-worker, single-instance
+    deployments; keys do not hold across workers.
+    """
+
+    def __init__(
+        self, max_entries: int = 10_000, clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._responses: dict[str, tuple[float, StoredResponse]] = {}
+        self._reserved: dict[str, float] = {}
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        entry = self._responses.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= self._clock():
+            del self._responses[key]
+            return None
+        return response
+
+    async def reserve(self, key: str, ttl: float) -> bool:
+        now = self._clock()
+        if self._reserved.get(key, 0.0) > now:
+            return False
+        self._reserved[key] = now + ttl
+        return True
+
+    async def complete(self, key: str, response: StoredResponse, ttl: float) -> None:
+        self._reserved.pop(key, None)
+        self._responses[key] = (self._clock() + ttl, response)
+        if len(self._responses) > self.max_entries:
+            self._evict()
+
+    async def release(self, key: str) -> None:
+        self._reserved.pop(key, None)
+
+    def _evict(self) -> None:
+        now = self._clock()
+        for key in [k for k, (exp, _) in self._responses.items() if exp <= now]:
+            del self._responses[key]
+        # Still full: drop the oldest insertions (dicts keep insertion order)
+        overflow = len(self._responses) - self.max_entries
+        for key in list(self._responses)[: max(overflow, 0)]:
+            del self._responses[key]
+
+
+metadata = MetaData()
+idempotency_keys = Table(
+    "idempotency_keys",
+    metadata,
+    Column("key", String(512), primary_key=True),
+    # Epoch seconds; a claim past locked_until belongs to a crashed worker
+    Column("locked_until", Float),
+    # Set once the response is stored, together with the columns below
+    Column("expires_at", Float),
+    Column("fingerprint", String(64)),
+    Column("status", Integer),
+    Column("headers", Text),
+    Column("body", LargeBinary),
+)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """
+    Backend shared by every worker and replica through the primary database.
+    A claim is one INSERT ... ON CONFLICT DO UPDATE that only takes over a
+    row whose claim lapsed and whose stored response expired, so exactly one
+    caller wins a key. Expired rows are deleted every `cleanup_every`
+    completions. The table is created on first use.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[AsyncEngine] = None,
+        cleanup_every: int = 1_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        # Resolved on first use, so building the app needs no DATABASE_URL
+        self._engine = engine
+        self.cleanup_every = cleanup_every
+        self._clock = clock
+        self._completed = 0
+        self._ready = False
+        self._ready_lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        await self._ensure_table()
+        table = idempotency_keys
+        async with self.engine().connect() as connection:
+            row = (
+                await connection.execute(
+                    select(table).where(
+                        table.c.key == key, table.c.expires_at > self._clock()
+                    )
+                )
+            ).first()
+        if row is None:
+            return None
+        return StoredResponse(
+            fingerprint=row.fingerprint,
+            status=row.status,
+            headers=[
+                (name.encode("latin-1"), value.encode("latin-1"))
+                for name, value in json.loads(row.headers)
+            ],
+            body=row.body,
+        )
+
+    async def reserve(self, key: str, ttl: float) -> bool:
+        await self._ensure_table()
+        table = idempotency_keys
+        now = self._clock()
+        async with self.engine().begin() as connection:
+            insert = dialect_insert(connection.dialect.name, table).values(
+                key=key, locked_until=now + ttl
+            )
+            statement = insert.on_conflict_do_update(
+                index_elements=[table.c.key],
+                set_={
+                    "locked_until": insert.excluded.locked_until,
+                    "expires_at": None,
+                },
+                where=(
+                    or_(table.c.locked_until.is_(None), table.c.locked_until <= now)
+                    & or_(table.c.expires_at.is_(None), table.c.expires_at <= now)
+                ),
+            ).returning(table.c.key)
+            claimed = (await connection.execute(statement)).first()
+        return claimed is not None
+
+    async def complete(self, key: str, response: StoredResponse, ttl: float) -> None:
+        table = idempotency_keys
+        now = self._clock()
+        headers = [
+            (name.decode("latin-1"), value.decode("latin-1"))
+            for name, value in response.headers
+        ]
+        async with self.engine().begin() as connection:
+            await connection.execute(
+                update(table)
+                .where(table.c.key == key)
+                .values(
+                    locked_until=None,
+                    expires_at=now + ttl,
+                    fingerprint=response.fingerprint,
+                    status=response.status,
+                    headers=json.dumps(headers),
+                    body=response.body,
+                )
+            )
+            self._completed += 1
+            if self._completed % self.cleanup_every == 0:
+                await connection.execute(
+                    delete(table).where(
+                        table.c.expires_at <= now,
+                        or_(
+                            table.c.locked_until.is_(None), table.c.locked_until <= now
+                        ),
+                    )
+                )
+
+    async def release(self, key: str) -> None:
+        table = idempotency_keys
+        async with self.engine().begin() as connection:
+            # Only the claim; a stored response stays replayable
+            await connection.execute(
+                delete(table).where(table.c.key == key, table.c.expires_at.is_(None))
+            )
+
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = get_engine()
+        return self._engine
+
+    async def _ensure_table(self) -> None:
+        if self._ready:
+            return
+        async with self._ready_lock:
+            if not self._ready:
+                async with self.engine().begin() as connection:
+                    await connection.run_sync(metadata.create_all, checkfirst=True)
+                self._ready = True
+
+
+def default_store() -> IdempotencyStore:
+    """The backend selected by IDEMPOTENCY_BACKEND."""
+    if IdempotencyConstants.BACKEND == "memory":
+        return InMemoryIdempotencyStore()
+    return DatabaseIdempotencyStore()
@@ -0,0 +1,27 @@
+# app/invites/org_names.py
+"""
+Organization names shown on the invite pages change rarely; cache them per
+process for a few minutes instead of a lookup per invite check.
+"""
+from typing import Any, Optional
+
+from app.cache.ttl_cache import TTLCache
+from app.utils.constants import InviteCacheConstants
+
+organization_names: TTLCache[str, str] = TTLCache(
+    InviteCacheConstants.ORG_NAME_TTL_SECONDS, max_entries=10_000
+)
+
+
+async def get_organization_name(
+    organization_dal: Any, organization_id: str
+) -> Optional[str]:
+    name = organization_names.get(organization_id)
+    if name is None:
+        organization = await organization_dal.get_by_id(organization_id)
+        if organization is None:
+            return None
+        name = organization.name
+        if name is not None:
+            organization_names.set(organization_id, name)
+    return name
@@ -0,0 +1,47 @@
+# app/invites/registration.py
+"""
+Self-registration rows for the group-commit path (app/db/group_commit.py).
+
+The invite and its verification email are built in memory, with the token
+and column defaults UserInviteDAL.create_invite and
+NotificationOutboxDAL.enqueue would apply, so a registration touches no
+connection of its own: both rows go out in the batched INSERT.
+"""
+import secrets
+from types import SimpleNamespace
+from typing import Any, Callable, Mapping
+
+from app.db.group_commit import GroupCommitter, GroupWrite
+from app.db.upsert import insert_values
+
+INVITE_TOKEN_BYTES = 32
+
+
+def new_invite_token() -> str:
+    return secrets.token_urlsafe(INVITE_TOKEN_BYTES)
+
+
+def build_invite(model: Any, **fields: Any) -> tuple[GroupWrite, SimpleNamespace]:
+    """The invite's write, and the invite as the rest of the flow reads it."""
+    fields.setdefault("token", new_invite_token())
+    table, values = insert_values(model(**fields))
+    return GroupWrite(table, values), SimpleNamespace(**values)
+
+
+async def register(
+    writer: GroupCommitter,
+    invite_model: Any,
+    outbox_model: Any,
+    invite_fields: Mapping[str, Any],
+    notification: Callable[[Any], Mapping[str, Any]],
+) -> SimpleNamespace:
+    """
+    Write the invite and the outbox row `notification(invite)` describes
+    together. Returns the invite as stored.
+    """
+    invite_write, invite = build_invite(invite_model, **invite_fields)
+    outbox_write = GroupWrite.of(
+        outbox_model(**notification(invite)), conflict=("idempotency_key",)
+    )
+    stored, _ = await writer.submit([invite_write, outbox_write])
+    return SimpleNamespace(**stored.row)
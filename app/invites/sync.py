@@ -0,0 +1,126 @@
+# app/invites/sync.py
+"""
+Keeps the invite token filter (app/invites/token_guard.py) current: a full
+rebuild from the organization invites table every FILTER_REBUILD_SECONDS, and
+in between a cheap incremental read of invites created since the last one.
+Each incremental read starts FILTER_OVERLAP_SECONDS behind the newest
+created_at seen, so a row that commits late with an older created_at is
+still picked up. A filter miss in a request also triggers a refresh
+(`catch_up`), so a just-created invite is not rejected while it waits for
+the next tick.
+"""
+import asyncio
+import datetime
+import time
+from typing import Any, Optional
+
+from platform_common.logging.logging import get_logger
+from platform_common.models.organization_invite import OrganizationInvite
+from sqlalchemy import func, select
+
+from app.db.engine import get_engine
+from app.invites.token_guard import InviteTokenGuard, invite_token_guard
+from app.utils.constants import InviteCacheConstants
+
+logger = get_logger("invite_filter_sync")
+
+SCAN_BATCH_SIZE = 5000
+
+
+def _behind(watermark: Any, seconds: float) -> Any:
+    """`watermark` moved back by `seconds`, for datetime or epoch columns."""
+    if isinstance(watermark, datetime.datetime):
+        return watermark - datetime.timedelta(seconds=seconds)
+    return watermark - seconds
+
+
+class InviteFilterRefresher:
+    def __init__(self, guard: InviteTokenGuard = invite_token_guard):
+        self.guard = guard
+        self.table: Any = OrganizationInvite.__table__  # type: ignore[attr-defined]
+        self.created_at = self.table.c.get("created_at")
+        # Highest created_at already in the filter
+        self.watermark: Optional[Any] = None
+        self.rebuilt_at = 0.0
+        self.refreshed_at = 0.0
+        self._catching_up = asyncio.Lock()
+
+    async def rebuild(self) -> None:
+        started = time.perf_counter()
+        token_hash = self.table.c.token_hash
+        hashes: list[str] = []
+        watermark = None
+        async with get_engine().connect() as connection:
+            if self.created_at is not None:
+                watermark = await connection.scalar(select(func.max(self.created_at)))
+            result = await connection.stream(
+                select(token_hash).execution_options(yield_per=SCAN_BATCH_SIZE)
+            )
+            async for rows in result.partitions(SCAN_BATCH_SIZE):
+                hashes.extend(row[0] for row in rows if row[0])
+        self.guard.rebuild(hashes)
+        # Read before the scan, so rows created during it are re-read next time
+        self.watermark = watermark
+        self.rebuilt_at = self.refreshed_at = time.monotonic()
+        logger.info(
+            f"Invite token filter rebuilt: {len(hashes)} invites "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    async def refresh(self) -> None:
+        if self.created_at is None:
+            # Nothing to page on; the filter stays usable until it is stale
+            # and then falls back to the database.
+            return
+        stmt = select(self.table.c.token_hash, self.created_at)
+        if self.watermark is not None:  # None: the table was empty
+            since = _behind(self.watermark, InviteCacheConstants.FILTER_OVERLAP_SECONDS)
+            stmt = stmt.where(self.created_at >= since)
+        async with get_engine().connect() as connection:
+            rows = (await connection.execute(stmt)).all()
+        self.guard.add(row[0] for row in rows if row[0])
+        self.refreshed_at = time.monotonic()
+        if rows:
+            newest = max(row[1] for row in rows)
+            if self.watermark is None or newest > self.watermark:
+                self.watermark = newest
+
+    async def catch_up(self) -> None:
+        """
+        Refresh for a filter miss, at most once per FILTER_CATCH_UP_SECONDS;
+        concurrent misses share one read.
+        """
+        async with self._catching_up:
+            since = time.monotonic() - self.refreshed_at
+            if since < InviteCacheConstants.FILTER_CATCH_UP_SECONDS:
+                return
+            await self.refresh()
+
+    async def tick(self) -> None:
+        rebuild_due = (
+            time.monotonic() - self.rebuilt_at
+            >= InviteCacheConstants.FILTER_REBUILD_SECONDS
+        )
+        if rebuild_due or self.guard.needs_rebuild():
+            await self.rebuild()
+        else:
+            await self.refresh()
+
+
+async def run_invite_filter(guard: InviteTokenGuard = invite_token_guard) -> None:
+    refresher = InviteFilterRefresher(guard)
+    if refresher.created_at is None:
+        logger.warning(
+            "organization_invites has no created_at column; new invites would "
+            "be missed between rebuilds, so only negative caching is used"
+        )
+        return
+    guard.attach(refresher.catch_up)
+    while True:
+        try:
+            await refresher.tick()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Invite token filter refresh failed: {e}")
+        await asyncio.sleep(InviteCacheConstants.FILTER_REFRESH_SECONDS)
@@ -0,0 +1,128 @@
+# app/invites/token_guard.py
+"""
+Rejects unknown organization invite tokens without touching the database.
+
+Two layers sit in front of `get_by_token_hash`:
+  * a short-TTL negative cache of hashes the database recently said don't
+    exist (covers retry loops and filter false positives), and
+  * a Bloom filter over every invite token hash, rebuilt periodically by
+    app/invites/sync.py. A hash the filter has never seen cannot be a real
+    invite.
+Until the filter is built, or once it is older than `max_staleness`, only
+the negative cache is consulted and everything else goes to the database.
+
+A filter miss may also be an invite created since the last refresh, so
+`admits` first has the refresher catch the filter up (see `attach`) and
+only rejects a token that is still missing afterwards.
+"""
+import time
+from typing import Awaitable, Callable, Iterable, Optional
+
+from app.cache.bloom import BloomFilter
+from app.cache.ttl_cache import TTLCache
+from app.metrics.instruments import INVITE_TOKEN_CHECKS
+from app.utils.constants import InviteCacheConstants
+
+# Headroom so invites added between full rebuilds keep the error rate low
+FILTER_HEADROOM = 1.5
+MIN_FILTER_CAPACITY = 1024
+
+
+class InviteTokenGuard:
+    def __init__(
+        self,
+        negative_ttl_seconds: float = InviteCacheConstants.NEGATIVE_TTL_SECONDS,
+        max_staleness_seconds: float = (
+            InviteCacheConstants.FILTER_MAX_STALENESS_SECONDS
+        ),
+        negative_max_entries: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_staleness_seconds = max_staleness_seconds
+        self._clock = clock
+        self._missing: TTLCache[str, bool] = TTLCache(
+            negative_ttl_seconds, negative_max_entries, clock
+        )
+        self._filter: Optional[BloomFilter] = None
+        self._refreshed_at = 0.0
+        self._catch_up: Optional[Callable[[], Awaitable[None]]] = None
+
+    @property
+    def filter_active(self) -> bool:
+        return (
+            self._filter is not None
+            and self._clock() - self._refreshed_at <= self.max_staleness_seconds
+        )
+
+    def attach(self, catch_up: Callable[[], Awaitable[None]]) -> None:
+        """
+        `catch_up` adds invites created since the last refresh to the filter
+        (app/invites/sync.py); `admits` calls it before trusting a miss.
+        """
+        self._catch_up = catch_up
+
+    def _filtered_out(self, token_hash: str) -> bool:
+        bloom = self._filter
+        return bool(
+            self.filter_active and bloom and not bloom.might_contain(token_hash)
+        )
+
+    def might_exist(self, token_hash: str) -> bool:
+        """
+        False means the token is unknown as of the last refresh; True means
+        ask the DB.
+        """
+        if self._missing.get(token_hash):
+            INVITE_TOKEN_CHECKS.inc(result="negative_cached")
+            return False
+        if self._filtered_out(token_hash):
+            INVITE_TOKEN_CHECKS.inc(result="filtered")
+            return False
+        INVITE_TOKEN_CHECKS.inc(result="lookup")
+        return True
+
+    async def admits(self, token_hash: str) -> bool:
+        """
+        False means the token is certainly unknown; True means ask the DB.
+        """
+        if self._missing.get(token_hash):
+            INVITE_TOKEN_CHECKS.inc(result="negative_cached")
+            return False
+        if self._filtered_out(token_hash) and self._catch_up is not None:
+            await self._catch_up()
+        if self._filtered_out(token_hash):
+            INVITE_TOKEN_CHECKS.inc(result="filtered")
+            return False
+        INVITE_TOKEN_CHECKS.inc(result="lookup")
+        return True
+
+    def remember_missing(self, token_hash: str) -> None:
+        self._missing.set(token_hash, True)
+
+    def rebuild(self, token_hashes: Iterable[str], expected: int = 0) -> None:
+        hashes = list(token_hashes)
+        capacity = max(
+            MIN_FILTER_CAPACITY, int(max(expected, len(hashes)) * FILTER_HEADROOM)
+        )
+        bloom = BloomFilter(capacity)
+        for token_hash in hashes:
+            bloom.add(token_hash)
+        self._filter = bloom
+        self._refreshed_at = self._clock()
+
+    def add(self, token_hashes: Iterable[str]) -> None:
+        """
+        Record invites created since the last refresh.
+        """
+        for token_hash in token_hashes:
+            if self._filter is not None:
+                self._filter.add(token_hash)
+            self._missing.pop(token_hash)
+        self._refreshed_at = self._clock()
+
+    def needs_rebuild(self) -> bool:
+        # Past capacity the false-positive rate climbs; rebuild early.
+        return self._filter is None or self._filter.count > self._filter.capacity
+
+
+invite_token_guard = InviteTokenGuard()
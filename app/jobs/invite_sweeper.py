@@ -0,0 +1,197 @@
+# app/jobs/invite_sweeper.py
+"""
+Background sweeper that moves overdue pending invites to expired.
+
+Each run takes a Postgres advisory lock so only one replica sweeps, then
+expires rows in bounded batches, one short transaction per batch:
+
+    UPDATE organization_invites SET status = 'expired'
+    WHERE id IN (SELECT id FROM organization_invites
+                 WHERE status = 'pending' AND expires_at < :now
+                 ORDER BY expires_at LIMIT :batch FOR UPDATE SKIP LOCKED)
+
+The inner select is served by a partial index on the expiry column (see
+`index_ddl`); create it once with
+`python -m app.jobs.invite_sweeper --create-indexes`. Request handlers
+only compare timestamps; the status column catches up on the next run.
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from sqlalchemy import Table, select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.jobs.locks import advisory_lock
+from app.metrics.instruments import INVITES_EXPIRED
+from app.utils.constants import InviteSweeperConstants
+
+
+@dataclass(frozen=True)
+class SweepTarget:
+    kind: str
+    table: Table
+    expires_column: str
+    pending: dict[str, Any]
+    expired: dict[str, Any] = field(default_factory=dict)
+
+    def index_ddl(self) -> str:
+        name = f"ix_{self.table.name}_pending_{self.expires_column}"
+        predicate = " AND ".join(
+            f"{column} = '{getattr(value, 'value', value)}'"
+            for column, value in self.pending.items()
+        )
+        return (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON {self.table.name} ({self.expires_column}) WHERE {predicate}"
+        )
+
+
+def default_targets() -> list[SweepTarget]:
+    from platform_common.models.organization_invite import OrganizationInvite
+    from platform_common.models.user_invite import UserInvite
+
+    targets = [
+        SweepTarget(
+            kind="organization_invite",
+            table=OrganizationInvite.__table__,  # type: ignore[attr-defined]
+            expires_column="expires_at",
+            pending={"status": OrganizationInvite.Status.PENDING},
+            expired={"status": OrganizationInvite.Status.EXPIRED},
+        )
+    ]
+    # User invites only carry a status to sweep on newer schemas; older rows
+    # are judged by `expiration` alone and need no sweeping.
+    user_table = UserInvite.__table__  # type: ignore[attr-defined]
+    user_status: Any = getattr(UserInvite, "Status", None)
+    if (
+        "status" in user_table.c
+        and hasattr(user_status, "PENDING")
+        and hasattr(user_status, "EXPIRED")
+    ):
+        targets.append(
+            SweepTarget(
+                kind="user_invite",
+                table=user_table,
+                expires_column="expiration",
+                pending={"status": user_status.PENDING},
+                expired={"status": user_status.EXPIRED},
+            )
+        )
+    return targets
+
+
+class InviteSweeper:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        targets: list[SweepTarget],
+        batch_size: int = InviteSweeperConstants.BATCH_SIZE,
+        max_batches: int = InviteSweeperConstants.MAX_BATCHES_PER_RUN,
+        batch_pause: float = InviteSweeperConstants.BATCH_PAUSE_SECONDS,
+        lock_key: int = InviteSweeperConstants.LOCK_KEY,
+        clock: Callable[[], int] = lambda: int(time.time()),
+    ):
+        self.engine = engine
+        self.targets = targets
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.batch_pause = batch_pause
+        self.lock_key = lock_key
+        self.clock = clock
+
+    def _expire_batch(self, target: SweepTarget, now: int) -> Any:
+        table = target.table
+        expires = table.c[target.expires_column]
+        overdue = (
+            select(table.c.id)
+            .where(expires < now)
+            .where(*(table.c[k] == v for k, v in target.pending.items()))
+            .order_by(expires)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return update(table).where(table.c.id.in_(overdue)).values(**target.expired)
+
+    async def sweep_target(self, target: SweepTarget, now: int) -> int:
+        total = 0
+        for _ in range(self.max_batches):
+            async with self.engine.begin() as connection:
+                result = await connection.execute(self._expire_batch(target, now))
+            expired = result.rowcount or 0
+            total += expired
+            INVITES_EXPIRED.inc(expired, kind=target.kind)
+            if expired < self.batch_size:
+                break
+            # Give request traffic room between batches
+            await asyncio.sleep(self.batch_pause)
+        return total
+
+    async def run_once(self) -> Optional[dict[str, int]]:
+        """
+        Sweep every target. Returns expired counts per kind, or None when
+        another replica holds the lock.
+        """
+        async with advisory_lock(self.engine, self.lock_key) as acquired:
+            if not acquired:
+                return None
+            now = self.clock()
+            return {
+                target.kind: await self.sweep_target(target, now)
+                for target in self.targets
+            }
+
+
+async def run_invite_sweeper() -> None:
+    from platform_common.logging.logging import get_logger
+
+    from app.db.engine import get_engine
+
+    logger = get_logger("invite_sweeper")
+    sweeper = InviteSweeper(get_engine(), default_targets())
+    while True:
+        try:
+            expired = await sweeper.run_once()
+            if expired and any(expired.values()):
+                logger.info(f"Invite sweeper expired {expired}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Invite sweeper run failed: {e}")
+        await asyncio.sleep(InviteSweeperConstants.INTERVAL_SECONDS)
+
+
+async def _create_indexes(targets: list[SweepTarget]) -> None:
+    from app.db.engine import get_engine
+
+    # CONCURRENTLY cannot run inside a transaction block
+    engine = get_engine().execution_options(isolation_level="AUTOCOMMIT")
+    async with engine.connect() as connection:
+        for target in targets:
+            await connection.execute(text(target.index_ddl()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Expire overdue pending invites")
+    parser.add_argument(
+        "--create-indexes",
+        action="store_true",
+        help="Create the partial expires_at indexes the sweeper relies on",
+    )
+    args = parser.parse_args()
+
+    async def run() -> None:
+        from app.db.engine import get_engine
+
+        targets = default_targets()
+        if args.create_indexes:
+            await _create_indexes(targets)
+        print(await InviteSweeper(get_engine(), targets).run_once())
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
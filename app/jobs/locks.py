@@ -0,0 +1,37 @@
+# app/jobs/locks.py
+"""
+Postgres session-level advisory locks for background jobs, so only one
+replica runs a given job at a time. Other dialects (SQLite in tests) have
+no advisory locks and always acquire.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@asynccontextmanager
+async def advisory_lock(engine: AsyncEngine, key: int) -> AsyncIterator[bool]:
+    """
+    Try to take lock `key` without waiting; yields whether it was acquired.
+    The lock is held on its own connection until the block exits.
+    """
+    async with engine.connect() as connection:
+        if connection.dialect.name != "postgresql":
+            yield True
+            return
+        acquired = bool(
+            await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+            )
+        )
+        await connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": key}
+                )
+                await connection.commit()
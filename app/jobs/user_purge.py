@@ -0,0 +1,327 @@
+# app/jobs/user_purge.py
+"""
+Background purge of soft-deleted users.
+
+DELETE /api/user/{id} only tombstones the user, revokes their sessions and
+enqueues a row in `user_purge_jobs`, all in the request's transaction. This
+worker then removes everything that references the user, one table at a
+time, in bounded batches with a short transaction per batch. Only the
+tables listed in `purge_steps` are touched:
+
+    DELETE FROM user_sessions
+    WHERE id IN (SELECT id FROM user_sessions WHERE user_id = :user_id
+                 LIMIT :batch)
+
+Rows the user owns (non-nullable foreign keys) are deleted; rows that only
+mention the user (nullable foreign keys, e.g. who sent an invite) are
+detached by setting the reference to NULL. The user row goes last, together
+with marking the job done. Each batch updates the job's progress in the
+same transaction, so a restarted worker resumes where it stopped. A job
+that hits an error is marked failed (with the error) and left for an
+operator; `--retry-failed` re-queues them.
+
+The jobs table (unique per user, so a job is queued at most once) is created
+by `python -m app.db.migrations`, which must run before DELETE is served.
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    delete,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.upsert import dialect_insert
+from app.jobs.locks import advisory_lock
+from app.metrics.instruments import USER_PURGE_JOBS, USER_PURGE_ROWS
+from app.utils.constants import UserPurgeConstants
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+DELETE = "delete"
+DETACH = "detach"
+
+metadata = MetaData()
+purge_jobs = Table(
+    "user_purge_jobs",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String(64), nullable=False, unique=True),
+    Column("status", String(16), nullable=False, default=PENDING),
+    Column("requested_at", BigInteger, nullable=False),
+    Column("updated_at", BigInteger, nullable=False),
+    # Table currently being purged and rows removed/detached so far
+    Column("step", String(128)),
+    Column("rows_purged", Integer, nullable=False, default=0),
+    Column("error", Text),
+    Index("ix_user_purge_jobs_status_requested_at", "status", "requested_at"),
+)
+
+
+@dataclass(frozen=True)
+class PurgeStep:
+    table: Table
+    column: str
+    action: str = DELETE
+
+    @property
+    def name(self) -> str:
+        return f"{self.table.name}.{self.column}"
+
+
+def purge_steps(
+    sessions: Table,
+    user_invites: Table,
+    organization_invites: Table,
+    memberships: Table,
+) -> list[PurgeStep]:
+    """
+    The tables this service owns that reference a user, dependents first.
+    Listed explicitly: the models share one MetaData with other services,
+    whose tables are theirs to clean up (on `user_deleted`), not ours.
+    """
+    return [
+        PurgeStep(sessions, "user_id"),
+        PurgeStep(user_invites, "invited_by", DETACH),
+        PurgeStep(organization_invites, "invited_by", DETACH),
+        PurgeStep(memberships, "user_id"),
+    ]
+
+
+def default_plan() -> tuple[Table, list[PurgeStep]]:
+    from platform_common.models.organization_invite import OrganizationInvite
+    from platform_common.models.organization_member import OrganizationMember
+    from platform_common.models.user import User
+    from platform_common.models.user_invite import UserInvite
+    from platform_common.models.user_session import UserSession
+
+    users: Table = User.__table__  # type: ignore[attr-defined]
+    steps = purge_steps(
+        UserSession.__table__,  # type: ignore[attr-defined]
+        UserInvite.__table__,  # type: ignore[attr-defined]
+        OrganizationInvite.__table__,  # type: ignore[attr-defined]
+        OrganizationMember.__table__,  # type: ignore[attr-defined]
+    )
+    return users, steps
+
+
+async def enqueue_purge(
+    session: Union[AsyncSession, AsyncConnection], user_id: str, now: int
+) -> None:
+    """
+    Queue `user_id` for purging as part of the caller's transaction; a
+    repeated or concurrent delete finds the job already queued (unique
+    `user_id`) and leaves it alone.
+    """
+    connection = (
+        session if isinstance(session, AsyncConnection) else await session.connection()
+    )
+    await session.execute(
+        dialect_insert(connection.dialect.name, purge_jobs)
+        .values(
+            user_id=user_id,
+            status=PENDING,
+            requested_at=now,
+            updated_at=now,
+            rows_purged=0,
+        )
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+
+
+async def create_table(connection: AsyncConnection) -> None:
+    """Applied by app/db/migrations.py."""
+    await connection.run_sync(metadata.create_all, checkfirst=True)
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+class UserPurger:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        users: Table,
+        steps: list[PurgeStep],
+        batch_size: int = UserPurgeConstants.BATCH_SIZE,
+        max_batches: int = UserPurgeConstants.MAX_BATCHES_PER_RUN,
+        batch_pause: float = UserPurgeConstants.BATCH_PAUSE_SECONDS,
+        lock_key: int = UserPurgeConstants.LOCK_KEY,
+        clock: Callable[[], int] = lambda: int(time.time()),
+    ):
+        self.engine = engine
+        self.users = users
+        self.steps = steps
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.batch_pause = batch_pause
+        self.lock_key = lock_key
+        self.clock = clock
+        self._batches_left = 0
+        self._rows_purged = 0
+
+    def _purge_batch(self, step: PurgeStep, user_id: str) -> Any:
+        table = step.table
+        column = table.c[step.column]
+        primary_key = list(table.primary_key.columns)
+        where: ColumnElement[bool]
+        if len(primary_key) == 1:
+            chosen = select(primary_key[0]).where(column == user_id)
+            where = primary_key[0].in_(chosen.limit(self.batch_size))
+        else:
+            # No single key to page on; these link tables are small per user
+            where = column == user_id
+        if step.action == DETACH:
+            return update(table).where(where).values({step.column: None})
+        return delete(table).where(where)
+
+    def _progress(self, job_id: int, **values: Any) -> Any:
+        return (
+            update(purge_jobs)
+            .where(purge_jobs.c.id == job_id)
+            .values(updated_at=self.clock(), **values)
+        )
+
+    async def purge_step(self, job_id: int, user_id: str, step: PurgeStep) -> int:
+        total = 0
+        while True:
+            if self._batches_left <= 0:
+                raise _BudgetExhausted
+            self._batches_left -= 1
+            async with self.engine.begin() as connection:
+                result = await connection.execute(self._purge_batch(step, user_id))
+                purged = result.rowcount or 0
+                await connection.execute(
+                    self._progress(
+                        job_id,
+                        step=step.name,
+                        rows_purged=purge_jobs.c.rows_purged + purged,
+                    )
+                )
+            total += purged
+            self._rows_purged += purged
+            USER_PURGE_ROWS.inc(purged, table=step.table.name, action=step.action)
+            if purged < self.batch_size:
+                return total
+            # Give request traffic room between batches
+            await asyncio.sleep(self.batch_pause)
+
+    async def purge_user(self, job_id: int, user_id: str) -> None:
+        for step in self.steps:
+            await self.purge_step(job_id, user_id, step)
+        async with self.engine.begin() as connection:
+            await connection.execute(
+                delete(self.users).where(self.users.c.id == user_id)
+            )
+            await connection.execute(
+                self._progress(job_id, status=DONE, step=None, error=None)
+            )
+
+    async def _pending_jobs(self) -> list[tuple[int, str]]:
+        async with self.engine.connect() as connection:
+            result = await connection.execute(
+                select(purge_jobs.c.id, purge_jobs.c.user_id)
+                .where(purge_jobs.c.status == PENDING)
+                .order_by(purge_jobs.c.requested_at, purge_jobs.c.id)
+                .limit(100)
+            )
+            return [(row.id, row.user_id) for row in result]
+
+    async def run_once(self) -> Optional[dict[str, int]]:
+        """
+        Work through pending jobs, oldest first, until they are done or the
+        run's batch budget is spent. Returns counts, or None when another
+        replica holds the lock.
+        """
+        async with advisory_lock(self.engine, self.lock_key) as acquired:
+            if not acquired:
+                return None
+            counts = {"users_purged": 0, "failed": 0}
+            self._batches_left = self.max_batches
+            self._rows_purged = 0
+            for job_id, user_id in await self._pending_jobs():
+                try:
+                    await self.purge_user(job_id, user_id)
+                except _BudgetExhausted:
+                    break
+                except Exception as e:
+                    async with self.engine.begin() as connection:
+                        await connection.execute(
+                            self._progress(job_id, status=FAILED, error=str(e)[:2000])
+                        )
+                    counts["failed"] += 1
+                    USER_PURGE_JOBS.inc(outcome=FAILED)
+                    continue
+                counts["users_purged"] += 1
+                USER_PURGE_JOBS.inc(outcome=DONE)
+            counts["rows_purged"] = self._rows_purged
+            return counts
+
+
+async def run_user_purge() -> None:
+    from platform_common.logging.logging import get_logger
+
+    from app.db.engine import get_engine
+
+    logger = get_logger("user_purge")
+    purger: Optional[UserPurger] = None
+    while True:
+        try:
+            if purger is None:
+                users, steps = default_plan()
+                purger = UserPurger(get_engine(), users, steps)
+            counts = await purger.run_once()
+            if counts and any(counts.values()):
+                logger.info("User purge run finished", **counts)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"User purge run failed: {e}")
+        await asyncio.sleep(UserPurgeConstants.INTERVAL_SECONDS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Purge soft-deleted users")
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Re-queue failed purge jobs before running",
+    )
+    args = parser.parse_args()
+
+    async def run() -> None:
+        from app.db.engine import get_engine
+
+        engine = get_engine()
+        if args.retry_failed:
+            async with engine.begin() as connection:
+                await connection.execute(
+                    update(purge_jobs)
+                    .where(purge_jobs.c.status == FAILED)
+                    .values(status=PENDING, error=None)
+                )
+        users, steps = default_plan()
+        print(await UserPurger(engine, users, steps).run_once())
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+# app/jobs/user_reconcile.py
+"""
+Reconcile Firebase users into the users table ahead of their first login.
+
+Users that exist in Firebase but not here are otherwise only created on
+their first /api/auth/exchange; after a migration that makes the first wave
+of logins all write at once. This command pages through Firebase with
+`list_users` and, one page at a time (memory stays bounded by the page
+size), diffs each batch against the users table and upserts what is
+missing or stale in a single statement:
+
+    INSERT INTO users (...) VALUES (...), (...)
+    ON CONFLICT (idp_uid) DO UPDATE
+    SET email = excluded.email,
+        is_verified = users.is_verified OR excluded.is_verified
+
+Verification only ever goes up, and only on Firebase's email_verified. The
+exchange flow also trusts an email from a trusted OAuth *sign-in*, but a
+user listing only shows which providers are linked, not which one the user
+signs in with, so those users are left for their first exchange to verify.
+Disabled accounts, accounts without an email and soft-deleted users are
+skipped. A batch that hits a unique-email conflict is retried row by row so
+one bad row does not block the rest.
+
+After each page commits, the next page token is written to a checkpoint
+file, so an interrupted run resumes where it stopped (`--restart` ignores
+it). Users whose event failed to publish are kept in the checkpoint and
+announced again at the start of the next run. Pages are fetched at most
+DB_RECONCILE_PAGES_PER_SECOND times a second to stay inside Firebase's
+quota and leave the database room for traffic.
+
+Created or newly verified users publish `user_verified` (so the datastore
+service provisions them, as on a first login); other email changes
+publish `user_updated`.
+
+    python -m app.jobs.user_reconcile [--dry-run] [--restart] [--max-pages N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Mapping, Optional, Protocol
+
+from sqlalchemy import Table, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.db.upsert import dialect_insert, insert_values
+from app.metrics.instruments import USERS_RECONCILED
+from app.utils.constants import ReconcileConstants
+
+CREATED = "created"
+EMAIL_UPDATED = "email_updated"
+VERIFIED = "verified"
+UNCHANGED = "unchanged"
+SKIPPED = "skipped"
+CONFLICTS = "conflicts"
+EVENTS_FAILED = "events_failed"
+
+STAT_KEYS = (
+    CREATED,
+    EMAIL_UPDATED,
+    VERIFIED,
+    UNCHANGED,
+    SKIPPED,
+    CONFLICTS,
+    EVENTS_FAILED,
+)
+
+
+@dataclass(frozen=True)
+class SourceUser:
+    uid: str
+    email: Optional[str]
+    email_verified: bool = False
+    disabled: bool = False
+
+    @property
+    def verified(self) -> bool:
+        return bool(self.email_verified and self.email)
+
+
+@dataclass(frozen=True)
+class UserPage:
+    users: list[SourceUser]
+    next_page_token: Optional[str]
+
+
+class UserSource(Protocol):
+    async def fetch_page(
+        self, page_token: Optional[str], max_results: int
+    ) -> UserPage: ...
+
+
+class FirebaseUserSource:
+    async def fetch_page(self, page_token: Optional[str], max_results: int) -> UserPage:
+        from firebase_admin import auth as firebase_auth
+
+        from app.resilience.dependencies import firebase_threads
+
+        page = await firebase_threads.run(
+            firebase_auth.list_users, page_token=page_token, max_results=max_results
+        )
+        return UserPage(
+            users=[
+                SourceUser(
+                    uid=record.uid,
+                    email=record.email,
+                    email_verified=bool(record.email_verified),
+                    disabled=bool(record.disabled),
+                )
+                for record in page.users
+            ],
+            # Firebase uses "" for "no more pages"
+            next_page_token=page.next_page_token or None,
+        )
+
+
+class Checkpoint:
+    """Progress of a run, in a JSON file replaced atomically on every save."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                state: dict[str, Any] = json.load(f)
+                return state
+        except FileNotFoundError:
+            return {}
+
+    def save(self, state: Mapping[str, Any]) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class RateLimiter:
+    """At most `per_second` calls to `wait()` complete per second (0 = no limit)."""
+
+    def __init__(
+        self,
+        per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.per_second = per_second
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        if self.per_second <= 0:
+            return
+        now = self.clock()
+        if self._next > now:
+            await self.sleep(self._next - now)
+            now = self._next
+        self._next = now + 1.0 / self.per_second
+
+
+RowFactory = Callable[[SourceUser], dict[str, Any]]
+Publish = Callable[[str, Mapping[Any, Any]], Awaitable[None]]
+
+
+class UserReconciler:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        users: Table,
+        source: UserSource,
+        make_row: RowFactory,
+        checkpoint: Optional[Checkpoint] = None,
+        publish: Optional[Publish] = None,
+        page_size: int = ReconcileConstants.PAGE_SIZE,
+        batch_size: int = ReconcileConstants.BATCH_SIZE,
+        limiter: Optional[RateLimiter] = None,
+        dry_run: bool = False,
+    ):
+        self.engine = engine
+        self.users = users
+        self.source = source
+        self.make_row = make_row
+        self.checkpoint = checkpoint
+        self.publish = publish
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.limiter = limiter or RateLimiter(ReconcileConstants.PAGES_PER_SECOND)
+        self.dry_run = dry_run
+        # idp_uid -> event for users whose announcement failed
+        self.unannounced: dict[str, str] = {}
+
+    async def diff(
+        self, connection: AsyncConnection, batch: list[SourceUser]
+    ) -> list[tuple[SourceUser, str]]:
+        """What each user in `batch` needs: created / email_updated / ..."""
+        table = self.users
+        columns = [table.c.idp_uid, table.c.email, table.c.is_verified]
+        if "deleted_at" in table.c:
+            columns.append(table.c.deleted_at)
+        result = await connection.execute(
+            select(*columns).where(table.c.idp_uid.in_([u.uid for u in batch]))
+        )
+        existing = {row["idp_uid"]: row for row in result.mappings()}
+
+        changes = []
+        for user in batch:
+            row = existing.get(user.uid)
+            if user.disabled or not user.email:
+                outcome = SKIPPED
+            elif row is None:
+                outcome = CREATED
+            elif row.get("deleted_at"):
+                outcome = SKIPPED  # being purged; never resurrect
+            elif user.verified and not row["is_verified"]:
+                outcome = VERIFIED
+            elif user.email != row["email"]:
+                outcome = EMAIL_UPDATED
+            else:
+                outcome = UNCHANGED
+            changes.append((user, outcome))
+        return changes
+
+    def _upsert(self, connection: AsyncConnection, users: list[SourceUser]) -> Any:
+        table = self.users
+        insert = dialect_insert(connection.dialect.name, table)
+        statement = insert.values([self.make_row(user) for user in users])
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.idp_uid],
+            set_={
+                "email": statement.excluded.email,
+                "is_verified": or_(table.c.is_verified, statement.excluded.is_verified),
+            },
+        ).returning(*table.columns)
+
+    async def _write(
+        self, changed: list[SourceUser], stats: dict[str, int]
+    ) -> dict[str, Mapping[Any, Any]]:
+        async with self.engine.begin() as connection:
+            try:
+                async with connection.begin_nested():
+                    result = await connection.execute(self._upsert(connection, changed))
+                    return {row["idp_uid"]: row for row in result.mappings()}
+            except IntegrityError:
+                pass
+            # Some row conflicts on another unique column (e.g. an email now
+            # used by a different account); keep the rest.
+            written: dict[str, Mapping[Any, Any]] = {}
+            for user in changed:
+                try:
+                    async with connection.begin_nested():
+                        result = await connection.execute(
+                            self._upsert(connection, [user])
+                        )
+                        row = result.mappings().one()
+                        written[row["idp_uid"]] = row
+                except IntegrityError:
+                    stats[CONFLICTS] += 1
+            return written
+
+    async def _publish(
+        self, event: str, row: Mapping[Any, Any], stats: dict[str, int]
+    ) -> None:
+        if self.publish is None:
+            return
+        try:
+            await self.publish(event, row)
+        except Exception:
+            stats[EVENTS_FAILED] += 1
+            self.unannounced[row["idp_uid"]] = event
+        else:
+            self.unannounced.pop(row["idp_uid"], None)
+
+    async def _announce(
+        self,
+        changes: list[tuple[SourceUser, str]],
+        written: Mapping[str, Mapping[Any, Any]],
+        stats: dict[str, int],
+    ) -> None:
+        if self.publish is None:
+            return
+        for user, outcome in changes:
+            row = written.get(user.uid)
+            if row is None:
+                continue
+            event = (
+                "user_verified"
+                if row["is_verified"] and outcome in (CREATED, VERIFIED)
+                else "user_updated"
+            )
+            await self._publish(event, row, stats)
+
+    async def announce_pending(self, stats: dict[str, int]) -> None:
+        """Retry the announcements that failed in earlier runs."""
+        if self.publish is None or not self.unannounced or self.dry_run:
+            return
+        table = self.users
+        async with self.engine.connect() as connection:
+            result = await connection.execute(
+                select(*table.columns).where(
+                    table.c.idp_uid.in_(list(self.unannounced))
+                )
+            )
+            rows = {row["idp_uid"]: row for row in result.mappings()}
+        for uid, event in list(self.unannounced.items()):
+            row = rows.get(uid)
+            if row is None or row.get("deleted_at"):
+                del self.unannounced[uid]  # gone since; nothing to announce
+                continue
+            await self._publish(event, row, stats)
+
+    async def reconcile_batch(
+        self, batch: list[SourceUser], stats: dict[str, int]
+    ) -> None:
+        async with self.engine.connect() as connection:
+            changes = await self.diff(connection, batch)
+        changed = [c for c in changes if c[1] not in (UNCHANGED, SKIPPED)]
+        for _, outcome in changes:
+            stats[outcome] += 1
+            USERS_RECONCILED.inc(outcome=outcome)
+        if not changed or self.dry_run:
+            return
+        written = await self._write([user for user, _ in changed], stats)
+        await self._announce(changed, written, stats)
+
+    async def run(
+        self,
+        max_pages: Optional[int] = None,
+        on_page: Optional[Callable[[int, dict[str, int]], None]] = None,
+    ) -> dict[str, int]:
+        """
+        Reconcile page by page from the checkpoint (or the start). Returns
+        the counts for the whole pass, including earlier resumed runs.
+        """
+        state = self.checkpoint.load() if self.checkpoint else {}
+        self.unannounced = dict(state.get("unannounced", {}))
+        if state.get("done"):
+            state = {}  # last pass finished; start a new one
+        page_token: Optional[str] = state.get("page_token")
+        pages: int = state.get("pages", 0)
+        stats = {key: 0 for key in STAT_KEYS}
+        stats.update(state.get("stats", {}))
+        await self.announce_pending(stats)
+
+        fetched = 0
+        while max_pages is None or fetched < max_pages:
+            await self.limiter.wait()
+            page = await self.source.fetch_page(page_token, self.page_size)
+            for start in range(0, len(page.users), self.batch_size):
+                await self.reconcile_batch(
+                    page.users[start : start + self.batch_size], stats
+                )
+            fetched += 1
+            pages += 1
+            page_token = page.next_page_token
+            done = page_token is None
+            if self.checkpoint is not None and not self.dry_run:
+                self.checkpoint.save(
+                    {
+                        "page_token": page_token,
+                        "pages": pages,
+                        "done": done,
+                        "stats": stats,
+                        "unannounced": self.unannounced,
+                        "updated_at": int(time.time()),
+                    }
+                )
+            if on_page is not None:
+                on_page(pages, stats)
+            if done:
+                break
+        return stats
+
+
+def default_row_factory() -> tuple[Table, RowFactory]:
+    from platform_common.models.user import User
+
+    table: Table = User.__table__  # type: ignore[attr-defined]
+
+    def make_row(user: SourceUser) -> dict[str, Any]:
+        email = user.email or ""
+        _, values = insert_values(
+            User(
+                idp_uid=user.uid,
+                email=email,
+                username=email.split("@")[0],
+                is_verified=user.verified,
+            )
+        )
+        return values
+
+    return table, make_row
+
+
+async def publish_change(event: str, row: Mapping[str, Any]) -> None:
+    from app.pubsub.events.user_events import (
+        publish_user_updated_event,
+        publish_user_verified_event,
+    )
+
+    if event == "user_verified":
+        await publish_user_verified_event(
+            user_id=row["id"],
+            organization_id=row.get("organization_id"),
+            email=row.get("email"),
+            username=row.get("username"),
+        )
+    else:
+        await publish_user_updated_event(
+            user_id=row["id"], email=row.get("email"), username=row.get("username")
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile Firebase users")
+    parser.add_argument("--dry-run", action="store_true", help="Diff only")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint")
+    parser.add_argument("--max-pages", type=int, default=None)
+    parser.add_argument("--checkpoint", default=ReconcileConstants.CHECKPOINT_PATH)
+    parser.add_argument(
+        "--pages-per-second",
+        type=float,
+        default=ReconcileConstants.PAGES_PER_SECOND,
+    )
+    args = parser.parse_args()
+
+    async def run() -> None:
+        from platform_common.logging.logging import get_logger
+
+        from app.auth.firebase_init import init_firebase
+        from app.db.engine import get_engine
+
+        logger = get_logger("user_reconcile")
+        init_firebase()  # type: ignore[no-untyped-call]
+        checkpoint = Checkpoint(args.checkpoint)
+        if args.restart:
+            checkpoint.clear()
+        users, make_row = default_row_factory()
+        reconciler = UserReconciler(
+            get_engine(),
+            users,
+            FirebaseUserSource(),
+            make_row,
+            checkpoint=checkpoint,
+            publish=publish_change,
+            limiter=RateLimiter(args.pages_per_second),
+            dry_run=args.dry_run,
+        )
+        stats = await reconciler.run(
+            max_pages=args.max_pages,
+            on_page=lambda pages, stats: logger.info(
+                "Reconciled page", pages=pages, **stats
+            ),
+        )
+        print(json.dumps(stats))
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# app/lifespan.py
+"""
+Application startup/shutdown. Startup warms pools and caches (app/warmup.py)
+before uvicorn accepts connections; background tasks started here are
+cancelled and shared resources closed when the app shuts down.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from platform_common.logging.logging import get_logger
+from platform_common.models.user import User
+
+from app.db.dal.hot_path import soft_delete_columns
+from app.db.replicas import run_replica_monitor
+from app.invites.sync import run_invite_filter
+from app.jobs.invite_sweeper import run_invite_sweeper
+from app.jobs.user_purge import run_user_purge
+from app.metrics.instruments import run_event_loop_lag_monitor
+from app.metrics.multiprocess import run_snapshot_writer
+from app.search.sync import run_user_index
+from app.utils.constants import (
+    InviteCacheConstants,
+    InviteSweeperConstants,
+    ReplicaConstants,
+    SearchConstants,
+    MetricsConstants,
+    UserPurgeConstants,
+    WarmupConstants,
+)
+from app.warmup import close_resources, warm_up
+
+logger = get_logger("lifespan")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.ready = False
+    # DELETE /api/user relies on them; refuse to start without them
+    soft_delete_columns(User.__table__)  # type: ignore[attr-defined]
+    if WarmupConstants.ENABLED:
+        try:
+            await asyncio.wait_for(warm_up(), WarmupConstants.TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Warm-up exceeded {WarmupConstants.TIMEOUT_SECONDS}s; starting anyway"
+            )
+
+    tasks: list[asyncio.Task[None]] = [
+        asyncio.create_task(run_event_loop_lag_monitor())
+    ]
+    if MetricsConstants.MULTIPROC_DIR:
+        tasks.append(asyncio.create_task(run_snapshot_writer()))
+    if ReplicaConstants.URLS:
+        # Until a replica has been checked, reads go to the primary
+        tasks.append(asyncio.create_task(run_replica_monitor()))
+
+    if SearchConstants.INDEX_ENABLED:
+        # Built in the background so startup is not blocked by the scan;
+        # /api/user/search reports index_ready until it finishes.
+        tasks.append(asyncio.create_task(run_user_index()))
+
+    if InviteCacheConstants.FILTER_ENABLED:
+        tasks.append(asyncio.create_task(run_invite_filter()))
+
+    if InviteSweeperConstants.ENABLED:
+        tasks.append(asyncio.create_task(run_invite_sweeper()))
+
+    if UserPurgeConstants.ENABLED:
+        tasks.append(asyncio.create_task(run_user_purge()))
+
+    app.state.ready = True
+    yield
+    app.state.ready = False
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await close_resources()
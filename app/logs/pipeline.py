@@ -0,0 +1,215 @@
+# app/logs/pipeline.py
+"""
+Non-blocking structlog pipeline.
+
+On the calling (event loop) thread a log call only captures what cannot be
+captured later (context variables, timestamp, call site, active exception),
+applies the level check and per-event sampling, and puts the event dict on a
+bounded queue. A background thread runs the rest of the configured processor
+chain (formatting, rendering) and writes to the configured logger. When the
+queue is full the event is dropped rather than blocking the loop, and
+drops are counted (log_messages_dropped_total) and periodically reported.
+
+`install()` rewrites structlog's default processor list in place, so loggers
+that were already bound before it ran (e.g. module-level loggers) go through
+the pipeline too.
+"""
+import sys
+from typing import Any, MutableMapping, Optional
+
+import structlog
+from structlog.contextvars import merge_contextvars
+from structlog.processors import (
+    CallsiteParameterAdder,
+    StackInfoRenderer,
+    TimeStamper,
+    add_log_level,
+)
+from structlog.stdlib import add_logger_name
+
+from app.metrics.instruments import LOG_MESSAGES_DROPPED
+from app.utils.background_writer import BackgroundWriter
+from app.utils.constants import LoggingConstants
+
+LEVELS = {
+    "debug": 10,
+    "info": 20,
+    "msg": 20,
+    "warning": 30,
+    "warn": 30,
+    "error": 40,
+    "exception": 40,
+    "critical": 50,
+    "fatal": 50,
+}
+
+_EAGER_FUNCTIONS = (merge_contextvars, add_log_level, add_logger_name)
+_EAGER_TYPES = (TimeStamper, CallsiteParameterAdder, StackInfoRenderer)
+
+
+def is_eager(processor: Any) -> bool:
+    """True for processors reading state only valid on the calling thread."""
+    return processor in _EAGER_FUNCTIONS or isinstance(processor, _EAGER_TYPES)
+
+
+def parse_sample_rates(spec: str) -> dict[str, float]:
+    """'Health check=0.01,Session valid=0.1' -> {event: fraction kept}."""
+    rates = {}
+    for item in spec.split(","):
+        event, _, rate = item.strip().rpartition("=")
+        if event and rate:
+            rates[event.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class EventSampler:
+    """
+    Keeps exactly `rate` of each sampled event (deterministically: the first,
+    then one every 1/rate calls) so sampled events still show up at a steady
+    cadence.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        self.rates = rates
+        self._credit: dict[str, float] = {}
+
+    def keep(self, event: Any) -> bool:
+        rate = self.rates.get(event) if isinstance(event, str) else None
+        if rate is None or rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        credit = self._credit.get(event, 1.0) + rate
+        if credit >= 1.0:
+            self._credit[event] = credit - 1.0
+            return True
+        self._credit[event] = credit
+        return False
+
+
+EventDict = MutableMapping[str, Any]
+
+
+class LogPipeline(BackgroundWriter[tuple[Any, str, EventDict]]):
+    thread_name = "log-writer"
+
+    def __init__(
+        self,
+        level: str = "info",
+        sample_rates: Optional[dict[str, float]] = None,
+        queue_size: int = 10_000,
+        drop_report_seconds: float = 10.0,
+    ):
+        super().__init__(queue_size)
+        self.level = LEVELS.get(level.lower(), 20)
+        self.sampler = EventSampler(sample_rates or {})
+        self.tick_seconds = drop_report_seconds
+        self.dropped = {"queue_full": 0, "sampled": 0}
+        self._reported_queue_full = 0
+        self._eager: list[Any] = []
+        self._deferred: list[Any] = []
+        self._last_logger: Any = None
+
+    # -- caller side -------------------------------------------------------
+
+    def split(self, processors: list[Any]) -> None:
+        """
+        Call-time processors stay on the caller side wherever they sit in the
+        chain; the rest (formatting, rendering) moves to the writer, in order.
+        """
+        self._eager = [p for p in processors if is_eager(p)]
+        self._deferred = [p for p in processors if not is_eager(p)]
+
+    def __call__(self, logger: Any, method_name: str, event_dict: EventDict) -> Any:
+        level = LEVELS.get(method_name, 20)
+        if level < self.level:
+            raise structlog.DropEvent
+        if level <= 20 and not self.sampler.keep(event_dict.get("event")):
+            self._drop("sampled")
+            raise structlog.DropEvent
+
+        for processor in self._eager:
+            event_dict = processor(logger, method_name, event_dict)
+        # The writer thread has no active exception; capture it now.
+        if event_dict.get("exc_info") is True or method_name == "exception":
+            event_dict["exc_info"] = sys.exc_info()
+
+        if not self.offer((logger, method_name, event_dict)):
+            self._drop("queue_full")
+        raise structlog.DropEvent
+
+    def _drop(self, reason: str) -> None:
+        self.dropped[reason] += 1
+        LOG_MESSAGES_DROPPED.inc(reason=reason)
+
+    # -- writer side -------------------------------------------------------
+
+    def handle(self, item: tuple[Any, str, EventDict]) -> None:
+        logger, method_name, event_dict = item
+        self._last_logger = logger
+        self.write(logger, method_name, event_dict)
+
+    def write(self, logger: Any, method_name: str, event_dict: EventDict) -> None:
+        result: Any = event_dict
+        args: tuple[Any, ...]
+        kwargs: dict[str, Any]
+        try:
+            for processor in self._deferred:
+                result = processor(logger, method_name, result)
+        except structlog.DropEvent:
+            return
+        # Same dispatch structlog uses for the final processor's return value
+        if isinstance(result, (str, bytes, bytearray)):
+            args, kwargs = (result,), {}
+        elif isinstance(result, tuple):
+            args, kwargs = result
+        else:
+            args, kwargs = (), dict(result)
+        write_method = "error" if method_name == "exception" else method_name
+        getattr(logger, write_method)(*args, **kwargs)
+
+    def tick(self) -> None:
+        # Sampling is intended; only report what backpressure cost us.
+        dropped = self.dropped["queue_full"] - self._reported_queue_full
+        if not dropped or self._last_logger is None:
+            return
+        self._reported_queue_full = self.dropped["queue_full"]
+        self.write(
+            self._last_logger,
+            "warning",
+            {"event": "Log messages dropped (queue full)", "dropped": dropped},
+        )
+
+
+_pipeline: Optional[LogPipeline] = None
+
+
+def install(pipeline: LogPipeline) -> LogPipeline:
+    """
+    Route every structlog logger through `pipeline` (idempotent).
+    """
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+    processors = structlog.get_config()["processors"]
+    pipeline.split(processors)
+    # In place: bound loggers hold a reference to this very list.
+    processors[:] = [pipeline]
+    pipeline.start()
+    _pipeline = pipeline
+    return pipeline
+
+
+def installed_pipeline() -> Optional[LogPipeline]:
+    return _pipeline
+
+
+def install_log_pipeline() -> LogPipeline:
+    return install(
+        LogPipeline(
+            level=LoggingConstants.LEVEL,
+            sample_rates=parse_sample_rates(LoggingConstants.SAMPLE_RATES),
+            queue_size=LoggingConstants.QUEUE_SIZE,
+            drop_report_seconds=LoggingConstants.DROP_REPORT_SECONDS,
+        )
+    )
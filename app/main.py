@@ -8,9 +8,32 @@ from app.api.router.auth_router import router as auth_router
 from app.api.router.health_check import router as health_router
 from app.api.router.user_router import router as user_router
 from app.api.router.idp_router import router as idp_router
+from app.api.router.metrics_router import router as metrics_router
+from app.api.router.graphql_router import router as graphql_router
 from app.auth.firebase_init import init_firebase
+from app.capture.middleware import TrafficCaptureMiddleware
+from app.db.replicas import ReadYourWritesMiddleware
+from app.idempotency.middleware import IdempotencyMiddleware
+from app.lifespan import lifespan
+from app.logs.pipeline import install_log_pipeline
+from app.metrics.middleware import MetricsMiddleware
+from app.profiling.middleware import ProfilingMiddleware, profiling_enabled
+from app.resilience.budget import LatencyBudgetMiddleware
+from app.resilience.handlers import add_dependency_error_handler
+from app.utils.constants import (
+    CaptureConstants,
+    GraphQLConstants,
+    IdempotencyConstants,
+    LoggingConstants,
+    ReplicaConstants,
+)
+
+# Before anything logs per request; loggers created at import time are
+# rerouted too (see app/logs/pipeline.py).
+if LoggingConstants.PIPELINE_ENABLED:
+    install_log_pipeline()
 
-app = FastAPI(title="User Management API", version="1.0.0")
+app = FastAPI(title="User Management API", version="1.0.0", lifespan=lifespan)
 init_firebase()
 
 origins = [
@@ -19,6 +42,10 @@ origins = [
     # "https://my-production-domain.com",
 ]
 
+# Innermost, so it samples the task that runs the route handler
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,  # <-- your list here
@@ -27,9 +54,27 @@ app.add_middleware(
     allow_headers=["*"],  # <-- allow all headers (Authorization, Content-Type…)
 )
 
+# Inside request-id/auth/metrics, so replayed responses are still logged and
+# counted; short-circuits before routing, so replays never build a handler.
+if IdempotencyConstants.ENABLED:
+    app.add_middleware(IdempotencyMiddleware)
+
+# Hands out read-your-writes positions after commits on the primary
+if ReplicaConstants.URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Starts each request's latency budget; external calls are capped by it
+app.add_middleware(LatencyBudgetMiddleware)
+
 app.add_middleware(RequestIDMiddleware)
 app.add_middleware(AuthMiddleware)
+# Records sanitised request metadata for replay (benchmarks/load/replay.py)
+if CaptureConstants.ENABLED:
+    app.add_middleware(TrafficCaptureMiddleware)
+# Added last so it is outermost and times the full middleware stack
+app.add_middleware(MetricsMiddleware)
 add_exception_handlers(app)
+add_dependency_error_handler(app)
 
 
 app.include_router(health_router, prefix="/api/health", tags=["Health"])
@@ -37,3 +82,6 @@ app.include_router(user_router, prefix="/api/user", tags=["User Management"])
 app.include_router(user_action_router, prefix="/api/user/action", tags=["User Actions"])
 app.include_router(idp_router, prefix="/api/idp", tags=["Identity Provider"])
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
+app.include_router(metrics_router, tags=["Metrics"])
+if GraphQLConstants.ENABLED:
+    app.include_router(graphql_router, prefix="/api/graphql", tags=["GraphQL"])
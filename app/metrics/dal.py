@@ -0,0 +1,49 @@
+# app/metrics/dal.py
+import inspect
+import time
+from typing import Any, Callable
+
+from app.metrics.instruments import DAL_CALL_SECONDS
+
+
+class InstrumentedDAL:
+    """
+    Transparent proxy timing every coroutine method a handler calls on a DAL.
+
+    Non-coroutine attributes (e.g. `model`) pass straight through. Wrapped
+    methods are cached on the proxy, so the per-call cost is one attribute
+    lookup plus two clock reads.
+    """
+
+    def __init__(self, dal: Any):
+        self._dal = dal
+        self._dal_name = type(dal).__name__
+        self._wrapped: dict[str, Callable[..., Any]] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        wrapped = self._wrapped.get(name)
+        if wrapped is not None:
+            return wrapped
+        attr = getattr(self._dal, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        dal_name = self._dal_name
+
+        async def timed_call(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await attr(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                DAL_CALL_SECONDS.observe(
+                    time.perf_counter() - started,
+                    dal=dal_name,
+                    method=name,
+                    outcome=outcome,
+                )
+
+        self._wrapped[name] = timed_call
+        return timed_call
@@ -0,0 +1,263 @@
+# app/metrics/instruments.py
+"""
+The service's metric definitions and the helpers used to feed them.
+"""
+import asyncio
+import time
+from types import TracebackType
+from typing import Iterable, Optional, Type
+
+from app.metrics.registry import Histogram, registry
+from app.utils.constants import MetricsConstants
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+
+DAL_CALL_SECONDS = registry.histogram(
+    "dal_call_duration_seconds",
+    "DAL method latency as seen by handlers",
+    ("dal", "method", "outcome"),
+)
+
+EXTERNAL_CALL_SECONDS = registry.histogram(
+    "external_call_duration_seconds",
+    "Latency of calls to Firebase, GitHub and the pub/sub broker",
+    ("dependency", "operation", "outcome"),
+)
+
+INVITE_TOKEN_CHECKS = registry.counter(
+    "invite_token_checks_total",
+    "Invite token lookups by how they were answered",
+    ("result",),
+)
+
+INVITES_EXPIRED = registry.counter(
+    "invites_expired_total",
+    "Invites moved to expired by the background sweeper",
+    ("kind",),
+)
+
+USERS_RECONCILED = registry.counter(
+    "users_reconciled_total",
+    "Firebase users seen by the reconciliation job, by what they needed",
+    ("outcome",),
+)
+
+USER_PURGE_ROWS = registry.counter(
+    "user_purge_rows_total",
+    "Rows of deleted users removed (delete) or unlinked (detach) by the purge worker",
+    ("table", "action"),
+)
+
+USER_PURGE_JOBS = registry.counter(
+    "user_purge_jobs_total",
+    "User purge jobs finished, by outcome",
+    ("outcome",),
+)
+
+IDEMPOTENCY_REQUESTS = registry.counter(
+    "idempotency_requests_total",
+    "Requests carrying an Idempotency-Key by outcome",
+    ("outcome",),
+)
+
+TOKEN_REFRESHES = registry.counter(
+    "token_refreshes_total",
+    "POST /api/auth/refresh calls by outcome",
+    ("outcome",),
+)
+
+HTTP_REQUESTS_CANCELLED = registry.counter(
+    "http_requests_cancelled_total",
+    "Handlers cancelled before finishing: budget ran out or client went away",
+    ("reason",),
+)
+
+CIRCUIT_BREAKER_REJECTIONS = registry.counter(
+    "circuit_breaker_rejections_total",
+    "Calls failed fast because the dependency's breaker was open",
+    ("dependency",),
+)
+
+CIRCUIT_BREAKER_TRANSITIONS = registry.counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes by the state entered",
+    ("dependency", "state"),
+)
+
+LOG_MESSAGES_DROPPED = registry.counter(
+    "log_messages_dropped_total",
+    "Log events not written: sampled out, or dropped because the queue was full",
+    ("reason",),
+)
+
+TRAFFIC_CAPTURE_RECORDS = registry.counter(
+    "traffic_capture_records_total",
+    "Requests seen by the traffic capture, by whether they were written",
+    ("outcome",),
+)
+
+GROUP_COMMIT_BATCH_ROWS = registry.histogram(
+    "group_commit_batch_rows",
+    "Rows written per group-commit transaction",
+    ("writer",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+
+GROUP_COMMIT_BATCHES = registry.counter(
+    "group_commit_batches_total",
+    "Group-commit batches by outcome; `split` batches were retried per caller",
+    ("writer", "outcome"),
+)
+
+SINGLE_FLIGHT_LOOKUPS = registry.counter(
+    "single_flight_lookups_total",
+    "Hot-path lookups by outcome; each `shared` lookup is one query saved",
+    ("lookup", "outcome"),
+)
+
+DB_READS_ROUTED = registry.counter(
+    "db_reads_routed_total",
+    "Read-only units of work by database used and why",
+    ("target", "reason"),
+)
+
+GRAPHQL_LOADER_BATCH_KEYS = registry.histogram(
+    "graphql_loader_batch_keys",
+    "Distinct keys resolved per GraphQL DataLoader query",
+    ("loader",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+
+
+def _db_pool_stats() -> Iterable[tuple[dict[str, str], float]]:
+    # Imported lazily so that scraping never creates the engine itself.
+    from app.db.engine import get_engine
+
+    if not get_engine.cache_info().currsize:
+        return []
+    pool = get_engine().pool
+    stats = []
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, state, None)
+        if callable(reader):
+            stats.append(({"state": state}, float(reader())))
+    return stats
+
+
+def _replica_lag() -> Iterable[tuple[dict[str, str], float]]:
+    from app.db.replicas import get_replica_pool
+
+    if not get_replica_pool.cache_info().currsize:
+        return []
+    pool = get_replica_pool()
+    if pool is None:
+        return []
+    return [
+        ({"replica": replica.name}, replica.lag)
+        for replica in pool.replicas
+        if replica.lag is not None
+    ]
+
+
+def _circuit_breaker_states() -> Iterable[tuple[dict[str, str], float]]:
+    from app.resilience.breaker import STATE_VALUES, all_breakers
+
+    return [
+        ({"dependency": breaker.name}, STATE_VALUES[breaker.state])
+        for breaker in all_breakers()
+    ]
+
+
+def _log_queue_depth() -> Iterable[tuple[dict[str, str], float]]:
+    from app.logs.pipeline import installed_pipeline
+
+    pipeline = installed_pipeline()
+    return [({}, float(pipeline.depth()))] if pipeline is not None else []
+
+
+registry.gauge(
+    "db_pool_connections",
+    "Database pool connections by state",
+    ("state",),
+    collect=_db_pool_stats,
+)
+
+registry.gauge(
+    "db_replica_lag_seconds",
+    "Replication lag per read replica, as last observed by the lag monitor",
+    ("replica",),
+    collect=_replica_lag,
+)
+
+registry.gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)",
+    ("dependency",),
+    collect=_circuit_breaker_states,
+)
+
+registry.gauge(
+    "log_queue_depth",
+    "Log events waiting for the background writer",
+    collect=_log_queue_depth,
+)
+
+EVENT_LOOP_LAG = registry.gauge(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer that was due, at the last sample",
+)
+
+
+async def run_event_loop_lag_monitor(
+    interval: float = MetricsConstants.LOOP_LAG_INTERVAL_SECONDS,
+) -> None:
+    """
+    Samples loop lag with a timer, which works on any loop (uvloop has no
+    run queue to inspect): a busy loop runs the timer late.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(loop.time() - started - interval, 0.0))
+
+
+class timed:
+    """
+    Context manager observing the elapsed time into `histogram`, with an
+    `outcome` label of "ok" or "error".
+
+        with timed(EXTERNAL_CALL_SECONDS, dependency="github", operation="x"):
+            ...
+    """
+
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: Histogram, **labels: str):
+        self._histogram = histogram
+        self._labels = labels
+        self._started = 0.0
+
+    def __enter__(self) -> "timed":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self._histogram.observe(
+            time.perf_counter() - self._started,
+            outcome="error" if exc_type else "ok",
+            **self._labels,
+        )
+
+
+def track_external(dependency: str, operation: str) -> timed:
+    return timed(EXTERNAL_CALL_SECONDS, dependency=dependency, operation=operation)
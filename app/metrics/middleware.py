@@ -0,0 +1,71 @@
+# app/metrics/middleware.py
+import time
+from typing import Any, Callable, Optional
+
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics.instruments import HTTP_REQUEST_SECONDS
+
+
+class RouteTemplates:
+    """
+    Maps a finished request's scope to its route's path template
+    (`/api/user/{user_id}`), or "unmatched" when no route matched.
+    """
+
+    def __init__(self) -> None:
+        self._templates: Optional[dict[Callable[..., Any], str]] = None
+
+    def __call__(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._templates is None:
+            # The router updates the shared scope with the matched endpoint;
+            # map endpoints back to their templates once, on first use.
+            routes: list[BaseRoute] = list(scope["app"].router.routes)
+            self._templates = {
+                getattr(r, "endpoint"): getattr(r, "path")
+                for r in routes
+                if hasattr(r, "endpoint") and hasattr(r, "path")
+            }
+        return self._templates.get(endpoint, "unmatched")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency per route template.
+
+    Labels use the route's path template (`/api/user/{user_id}`), never the
+    raw path, so cardinality stays bounded. Requests that match no route are
+    recorded as "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_template = RouteTemplates()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=self._route_template(scope),
+                status=str(status),
+            )
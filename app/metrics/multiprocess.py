@@ -0,0 +1,131 @@
+# app/metrics/multiprocess.py
+"""
+Metrics across the launcher's worker processes.
+
+Each uvicorn worker has its own registry, so with several workers a scrape
+would only see whichever worker answered it. When METRICS_MULTIPROC_DIR is
+set (app/server.py sets it whenever it starts more than one worker), every
+worker writes a snapshot of its registry to `<dir>/<pid>.json` every
+FLUSH_SECONDS and on shutdown, and /metrics merges all snapshots:
+
+- counters and histograms are summed over every worker, including ones that
+  have exited, so totals never go backwards when a worker is replaced;
+- gauges are per process (pool sizes, breaker state, loop lag) and are
+  reported for live workers only, with a `pid` label.
+
+The worker answering the scrape writes its own snapshot first; the others'
+are at most FLUSH_SECONDS old.
+"""
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.metrics.registry import Counter, Gauge, Histogram, MetricsRegistry, registry
+from app.utils.constants import MetricsConstants
+
+SNAPSHOT_SUFFIX = ".json"
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clear_snapshots(directory: str) -> None:
+    """Start a launch with an empty directory (called before workers start)."""
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for snapshot in path.glob(f"*{SNAPSHOT_SUFFIX}"):
+        snapshot.unlink(missing_ok=True)
+
+
+def write_snapshot(
+    directory: str,
+    source: MetricsRegistry = registry,
+    pid: Optional[int] = None,
+) -> None:
+    pid = os.getpid() if pid is None else pid
+    path = Path(directory) / f"{pid}{SNAPSHOT_SUFFIX}"
+    partial = path.with_name(f".{path.name}.tmp")
+    partial.write_text(json.dumps(source.snapshot()))
+    # Readers never see a half-written file
+    os.replace(partial, path)
+
+
+def read_snapshots(directory: str) -> dict[int, dict[str, list[Any]]]:
+    snapshots = {}
+    for path in Path(directory).glob(f"*{SNAPSHOT_SUFFIX}"):
+        try:
+            snapshots[int(path.stem)] = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def merge(
+    source: MetricsRegistry,
+    snapshots: dict[int, dict[str, list[Any]]],
+    alive: Callable[[int], bool] = process_alive,
+) -> MetricsRegistry:
+    """One registry holding every worker's samples, shaped like `source`."""
+    merged = MetricsRegistry()
+    live = {pid for pid in snapshots if alive(pid)}
+    for metric in source.metrics():
+        target: Any
+        if isinstance(metric, Histogram):
+            target = merged.histogram(
+                metric.name, metric.documentation, metric.labelnames, metric.buckets
+            )
+        elif isinstance(metric, Counter):
+            target = merged.counter(
+                metric.name, metric.documentation, metric.labelnames
+            )
+        elif isinstance(metric, Gauge):
+            target = merged.gauge(
+                metric.name, metric.documentation, metric.labelnames + ("pid",)
+            )
+        else:
+            continue
+        for pid, snapshot in snapshots.items():
+            samples = snapshot.get(metric.name)
+            if not samples:
+                continue
+            if isinstance(metric, Gauge):
+                if pid not in live:
+                    continue
+                samples = [[key + [str(pid)], value] for key, value in samples]
+            target.load(samples)
+    return merged
+
+
+def render(
+    source: MetricsRegistry = registry,
+    directory: Optional[str] = MetricsConstants.MULTIPROC_DIR,
+) -> str:
+    """The /metrics body: this process alone, or every worker when configured."""
+    if not directory:
+        return source.render()
+    write_snapshot(directory, source)
+    return merge(source, read_snapshots(directory)).render()
+
+
+async def run_snapshot_writer(
+    directory: Optional[str] = MetricsConstants.MULTIPROC_DIR,
+    interval: float = MetricsConstants.FLUSH_SECONDS,
+) -> None:
+    if not directory:
+        return
+    try:
+        while True:
+            write_snapshot(directory)
+            await asyncio.sleep(interval)
+    finally:
+        # Final counts survive the worker (graceful shutdown or cancel)
+        write_snapshot(directory)
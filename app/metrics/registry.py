@@ -0,0 +1,295 @@
+# app/metrics/registry.py
+"""
+Minimal Prometheus-compatible metrics.
+
+Everything runs on the event loop thread, so counters are plain integer/float
+increments with no locks. Label children are created once and cached, so the
+hot path is a dict lookup plus a bisect.
+
+Each metric can export its samples as JSON-friendly lists (`snapshot`) and
+add such samples back in (`load`); app/metrics/multiprocess.py uses this to
+merge the registries of several worker processes.
+"""
+import math
+from bisect import bisect_left
+from typing import Any, Callable, Iterable, Optional, Sequence, TypeVar
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = tuple[str, ...]
+Collector = Callable[[], Iterable[tuple[dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+    def snapshot(self) -> list[Any]:
+        raise NotImplementedError
+
+    def load(self, samples: list[Any]) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def snapshot(self) -> list[Any]:
+        return [[list(key), value] for key, value in self._values.items()]
+
+    def load(self, samples: list[Any]) -> None:
+        for key, value in samples:
+            key = tuple(key)
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for key, value in self._values.items():
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, key)} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    A gauge whose value is either set explicitly or read from a callback at
+    scrape time (for pool sizes, queue depths, ...).
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Collector] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _current(self) -> dict[LabelValues, float]:
+        values = dict(self._values)
+        if self._collect is not None:
+            try:
+                for labels, value in self._collect():
+                    values[self._key(labels)] = value
+            except Exception:
+                # A broken collector must never break the scrape.
+                pass
+        return values
+
+    def snapshot(self) -> list[Any]:
+        return [[list(key), value] for key, value in self._current().items()]
+
+    def load(self, samples: list[Any]) -> None:
+        for key, value in samples:
+            self._values[tuple(key)] = value
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for key, value in self._current().items():
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, key)} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: dict[LabelValues, _HistogramChild] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = _HistogramChild(len(self.buckets) + 1)
+        # Counts are stored per bucket and made cumulative at render time.
+        child.counts[bisect_left(self.buckets, value)] += 1
+        child.sum += value
+        child.count += 1
+
+    def count(self, **labels: str) -> int:
+        child = self._children.get(self._key(labels))
+        return child.count if child else 0
+
+    def snapshot(self) -> list[Any]:
+        return [
+            [list(key), child.counts, child.sum, child.count]
+            for key, child in self._children.items()
+        ]
+
+    def load(self, samples: list[Any]) -> None:
+        size = len(self.buckets) + 1
+        for key, counts, total, count in samples:
+            if len(counts) != size:
+                continue
+            child = self._children.get(tuple(key))
+            if child is None:
+                child = self._children[tuple(key)] = _HistogramChild(size)
+            child.counts = [a + b for a, b in zip(child.counts, counts)]
+            child.sum += total
+            child.count += count
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        names = self.labelnames + ("le",)
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(names, key + (_format_value(bound),))} "
+                    f"{cumulative}"
+                )
+            label_str = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{label_str} {child.count}")
+        return lines
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: MetricT) -> MetricT:
+        existing = self._metrics.get(metric.name)
+        if isinstance(existing, type(metric)):
+            return existing
+        if existing is not None:
+            raise ValueError(
+                f"Metric {metric.name} already registered as {existing.kind}"
+            )
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Collector] = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def metrics(self) -> list[_Metric]:
+        return list(self._metrics.values())
+
+    def snapshot(self) -> dict[str, list[Any]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
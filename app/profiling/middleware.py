@@ -0,0 +1,101 @@
+# app/profiling/middleware.py
+import asyncio
+import hmac
+import os
+import random
+import re
+import uuid
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.profiling.sampler import TaskSampler
+from app.utils.constants import ProfilingConstants
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def profiling_enabled() -> bool:
+    return ProfilingConstants.SAMPLE_RATE > 0 or bool(ProfilingConstants.TOKEN)
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiler.
+
+    A request is profiled when it carries `X-Profile: <PROFILING_TOKEN>` or
+    falls into the random PROFILING_SAMPLE_RATE fraction. The profile is
+    written as `<request id>.folded` (collapsed stacks, loadable by
+    speedscope/flamegraph.pl) and its name returned in `X-Profile-Id`.
+
+    Install it innermost (added before the other middleware) so it runs in
+    the task that executes the route handler. At most one request is profiled
+    at a time; main.py only installs it when profiling is configured, so the
+    disabled cost is zero.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = ProfilingConstants.SAMPLE_RATE,
+        token: Optional[str] = ProfilingConstants.TOKEN,
+        interval: float = ProfilingConstants.INTERVAL_SECONDS,
+        output_dir: str = ProfilingConstants.OUTPUT_DIR,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.token = token
+        self.interval = interval
+        self.output_dir = output_dir
+        self._active = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._active or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        if task is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self._profile_id(scope)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self._active = True
+        sampler = TaskSampler(task, asyncio.get_running_loop(), self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._active = False
+            sampler.stop(on_stop=lambda s: self._write(profile_id, s))
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.token:
+            supplied = Headers(scope=scope).get(PROFILE_HEADER)
+            if supplied and hmac.compare_digest(supplied, self.token):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _profile_id(self, scope: Scope) -> str:
+        request_id = scope.get("state", {}).get("request_id") or Headers(
+            scope=scope
+        ).get("x-request-id")
+        return _SAFE_ID.sub("_", str(request_id or uuid.uuid4().hex))[:128]
+
+    def _write(self, profile_id: str, sampler: TaskSampler) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{profile_id}.folded")
+        with open(path, "w") as f:
+            f.write(sampler.collapsed())
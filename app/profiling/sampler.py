@@ -0,0 +1,116 @@
+# app/profiling/sampler.py
+"""
+Wall-clock stack sampler for a single asyncio task.
+
+A background thread wakes every `interval` seconds and records where the task
+is: if the task is running on the loop thread, the live thread stack is taken;
+if it is suspended, its coroutine await chain is walked instead (so time spent
+waiting on the database, Firebase, ... shows up under the awaiting frame).
+Samples are aggregated into the "collapsed stack" format understood by
+flamegraph.pl, speedscope and inferno.
+"""
+import asyncio
+import os
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Any, Optional
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # Keep labels short and stable: package-relative path plus def line.
+    for marker in ("site-packages" + os.sep, os.sep + "app" + os.sep):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+def _await_chain(coro: Any) -> list[str]:
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            # A Future, Task or other awaitable terminates the chain. A done
+            # future means the task is ready but another task holds the loop.
+            done = getattr(coro, "done", None)
+            if callable(done) and done():
+                labels.append("<ready, waiting for loop>")
+            else:
+                labels.append(f"<await {type(coro).__name__}>")
+            break
+        labels.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return labels
+
+
+class TaskSampler:
+    """
+    Must be created on the event loop thread that runs `task`.
+    """
+
+    def __init__(
+        self,
+        task: "asyncio.Task[Any]",
+        loop: asyncio.AbstractEventLoop,
+        interval: float,
+    ):
+        self.task = task
+        self.loop = loop
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._on_stop: Optional[Any] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, on_stop: Optional[Any] = None) -> None:
+        """
+        Signal the sampler to stop. `on_stop(sampler)` runs on the sampler
+        thread afterwards, so writing the artifact never blocks the loop.
+        """
+        self._on_stop = on_stop
+        self._stop.set()
+
+    def sample_once(self) -> None:
+        stack = self._stack()
+        if stack:
+            self.samples[";".join(stack)] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception:
+                # Racing the loop thread can occasionally see a half-updated
+                # coroutine chain; drop that sample.
+                continue
+        if self._on_stop is not None:
+            self._on_stop(self)
+
+    def _stack(self) -> list[str]:
+        coro = self.task.get_coro()
+        root = getattr(coro, "cr_frame", None)
+        if asyncio.current_task(self.loop) is self.task:
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                if frame is root:
+                    break
+                frame = frame.f_back
+            stack.reverse()
+            return stack
+        return _await_chain(coro)
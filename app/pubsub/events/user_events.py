@@ -5,6 +5,8 @@ from typing import Optional
 from platform_common.pubsub.factory import get_publisher
 from platform_common.pubsub.event import PubSubEvent
 
+from app.resilience.dependencies import pubsub
+
 CHANNEL_USER_CHANGES = "user:changes"
 
 
@@ -32,4 +34,35 @@ async def publish_user_verified_event(
         },
     )
 
-    await publisher.publish(CHANNEL_USER_CHANGES, event)
+    await pubsub.call("publish", lambda: publisher.publish(CHANNEL_USER_CHANGES, event))
+
+
+async def publish_user_updated_event(
+    user_id: str,
+    email: Optional[str] = None,
+    username: Optional[str] = None,
+) -> None:
+    """
+    Publish a 'user_updated' event (created or changed) to user:changes.
+
+    Other replicas apply it to their in-memory user search index.
+    """
+    event = PubSubEvent(
+        event_type="user_updated",
+        payload={"user_id": user_id, "email": email, "username": username},
+    )
+
+    await pubsub.call(
+        "publish", lambda: get_publisher().publish(CHANNEL_USER_CHANGES, event)
+    )
+
+
+async def publish_user_deleted_event(user_id: str) -> None:
+    """
+    Publish a 'user_deleted' event to the user:changes channel.
+    """
+    event = PubSubEvent(event_type="user_deleted", payload={"user_id": user_id})
+
+    await pubsub.call(
+        "publish", lambda: get_publisher().publish(CHANNEL_USER_CHANGES, event)
+    )
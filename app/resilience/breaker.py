@@ -0,0 +1,144 @@
+# app/resilience/breaker.py
+"""
+Per-dependency circuit breakers.
+
+closed    calls go through; FAILURE_THRESHOLD consecutive failures open it.
+open      calls fail immediately with CircuitOpenError for RECOVERY_SECONDS.
+half_open up to HALF_OPEN_MAX_CALLS probe calls go through; a successful
+          probe closes the breaker, a failed one re-opens it.
+"""
+import time
+from typing import Callable
+
+from app.metrics.instruments import (
+    CIRCUIT_BREAKER_REJECTIONS,
+    CIRCUIT_BREAKER_TRANSITIONS,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values for circuit_breaker_state
+STATE_VALUES = {CLOSED: 0.0, HALF_OPEN: 1.0, OPEN: 2.0}
+
+
+class DependencyUnavailableError(Exception):
+    """
+    An external dependency could not be used for this call (breaker open or
+    call timed out). Routes surface it as 503 with a Retry-After hint.
+    """
+
+    def __init__(self, dependency: str, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(DependencyUnavailableError):
+    pass
+
+
+class DependencyTimeoutError(DependencyUnavailableError):
+    pass
+
+
+class DependencySaturatedError(DependencyUnavailableError):
+    """Every thread reserved for the dependency is still busy."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == OPEN
+            and self._clock() - self._opened_at >= self.recovery_seconds
+        ):
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Admit a call or raise CircuitOpenError. Every admitted call must be
+        followed by exactly one of on_success / on_failure / on_abandon.
+        """
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return
+        CIRCUIT_BREAKER_REJECTIONS.inc(dependency=self.name)
+        raise CircuitOpenError(
+            self.name,
+            f"{self.name} is unavailable (circuit {state})",
+            retry_after=self.retry_after(),
+        )
+
+    def on_success(self) -> None:
+        self._failures = 0
+        if self._state == HALF_OPEN:
+            self._probes = max(self._probes - 1, 0)
+            self._transition(CLOSED)
+
+    def on_failure(self) -> None:
+        if self._state == HALF_OPEN:
+            self._probes = max(self._probes - 1, 0)
+            self._open()
+            return
+        self._failures += 1
+        if self._state == CLOSED and self._failures >= self.failure_threshold:
+            self._open()
+
+    def on_abandon(self) -> None:
+        """The caller went away (cancelled) before the call finished."""
+        if self._state == HALF_OPEN:
+            self._probes = max(self._probes - 1, 0)
+
+    def retry_after(self) -> float:
+        if self._state != OPEN:
+            return 1.0
+        return max(self.recovery_seconds - (self._clock() - self._opened_at), 1.0)
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._failures = 0
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        self._state = state
+        if state != HALF_OPEN:
+            self._probes = 0
+        CIRCUIT_BREAKER_TRANSITIONS.inc(dependency=self.name, state=state)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def register_breaker(breaker: CircuitBreaker) -> CircuitBreaker:
+    _breakers[breaker.name] = breaker
+    return breaker
+
+
+def all_breakers() -> list[CircuitBreaker]:
+    return list(_breakers.values())
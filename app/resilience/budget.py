@@ -0,0 +1,287 @@
+# app/resilience/budget.py
+"""
+Per-request latency budgets (deadlines).
+
+LatencyBudgetMiddleware records when the current request must be answered
+by (from the longest matching route prefix in RESILIENCE_ROUTE_BUDGETS, or
+the default budget), shortened by the client's DEADLINE_HEADER if it sent
+one. External calls then wait at most the smaller of their own timeout and
+what is left of that budget, and DB statements are bounded by it too
+(UnitOfWork), so a slow dependency cannot hold a request past the point
+where its response is still useful.
+
+With DEADLINE_CANCEL the handler runs in its own task and is cancelled when
+the budget runs out (answered with 504 if nothing was sent yet) or the
+client disconnects, so abandoned requests stop holding connections and
+workers. Cancellation lands at the handler's next await. Work after the
+response is complete (background tasks) is never cancelled.
+
+Once the request's UnitOfWork commits, the budget no longer applies: cutting
+off the tail of a committed write (events, search indexing, the response)
+would answer it with a 504 and lose that work, so the handler is not
+cancelled and its remaining calls get their own timeouts.
+"""
+import asyncio
+import json
+import math
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics.instruments import HTTP_REQUESTS_CANCELLED
+from app.utils.constants import ResilienceConstants
+
+_deadline: ContextVar[Optional[float]] = ContextVar(
+    "latency_budget_deadline", default=None
+)
+_supervisor: ContextVar[Optional["_Supervisor"]] = ContextVar(
+    "latency_budget_supervisor", default=None
+)
+
+
+def parse_budgets(spec: str) -> list[tuple[str, float]]:
+    """
+    "/api/auth/=3,/api/idp/=8" -> [("/api/idp/", 8.0), ("/api/auth/", 3.0)],
+    longest prefix first.
+    """
+    budgets = []
+    for item in spec.split(","):
+        prefix, _, seconds = item.strip().partition("=")
+        if prefix and seconds:
+            budgets.append((prefix.strip(), float(seconds)))
+    return sorted(budgets, key=lambda budget: len(budget[0]), reverse=True)
+
+
+def budget_for(path: str, budgets: list[tuple[str, float]], default: float) -> float:
+    for prefix, seconds in budgets:
+        if path.startswith(prefix):
+            return seconds
+    return default
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget; None outside a request."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def mark_committed() -> None:
+    """
+    Called by UnitOfWork.commit: from here on the current request's handler
+    runs to completion, whatever its deadline or client does.
+    """
+    _deadline.set(None)
+    supervisor = _supervisor.get()
+    if supervisor is not None:
+        supervisor.committed = True
+
+
+def requested_seconds(headers: Headers, header: str) -> Optional[float]:
+    """The client's own deadline in seconds, if it sent a usable one."""
+    value = headers.get(header)
+    if not value:
+        return None
+    try:
+        milliseconds = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(milliseconds):
+        return None
+    return max(milliseconds, 0.0) / 1000
+
+
+def statement_timeout_ms(
+    grace_ms: int = ResilienceConstants.DB_STATEMENT_GRACE_MS,
+) -> Optional[int]:
+    """
+    A DB statement_timeout for the current request; None outside a request.
+    """
+    left = remaining()
+    if left is None:
+        return None
+    return max(int(left * 1000), 0) + max(grace_ms, 1)
+
+
+def call_timeout(max_timeout: float) -> float:
+    """
+    Timeout for one external call: its own limit, capped by the remaining
+    request budget (never negative).
+    """
+    left = remaining()
+    if left is None:
+        return max_timeout
+    return max(min(max_timeout, left), 0.0)
+
+
+class LatencyBudgetMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        budgets: Optional[list[tuple[str, float]]] = None,
+        default_seconds: float = ResilienceConstants.DEFAULT_BUDGET_SECONDS,
+        header: str = ResilienceConstants.DEADLINE_HEADER,
+        cancel: bool = ResilienceConstants.CANCEL_ON_DEADLINE,
+    ):
+        self.app = app
+        self.budgets = (
+            budgets
+            if budgets is not None
+            else parse_budgets(ResilienceConstants.ROUTE_BUDGETS)
+        )
+        self.default_seconds = default_seconds
+        self.header = header
+        self.cancel = cancel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        seconds = budget_for(scope["path"], self.budgets, self.default_seconds)
+        requested = requested_seconds(Headers(scope=scope), self.header)
+        if requested is not None:
+            seconds = min(seconds, requested)
+        token = _deadline.set(time.monotonic() + seconds)
+        try:
+            if self.cancel:
+                await _Supervisor(self.app, scope, receive, send).run(seconds)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+
+DEADLINE_EXCEEDED_BODY = json.dumps(
+    {"success": False, "message": "Request deadline exceeded", "status_code": 504}
+).encode()
+
+
+class _Supervisor:
+    """
+    Runs one request's handler in its own task and cancels it when its
+    deadline passes or the client disconnects.
+
+    Disconnects arrive on `receive`, which the handler may also be reading
+    for the body. Until the body is read the two share the channel under a
+    lock; a request without a body has its (empty) body read here and
+    handed to the handler later. After that only the watcher reads, and the
+    handler's `receive` just reports the disconnect when it happens.
+    """
+
+    def __init__(self, app: ASGIApp, scope: Scope, receive: Receive, send: Send):
+        self.app = app
+        self.scope = scope
+        self._receive = receive
+        self._send = send
+        headers = Headers(scope=scope)
+        self._has_body = bool(
+            headers.get("transfer-encoding")
+            or headers.get("content-length", "0") not in ("", "0")
+        )
+        self._lock = asyncio.Lock()
+        self._buffered: Optional[Message] = None
+        self._body_read = asyncio.Event()
+        self.disconnected = asyncio.Event()
+        self.response_started = False
+        self.response_done = False
+        self.committed = False
+
+    async def _handle(self) -> None:
+        await self.app(self.scope, self.receive, self.send)
+
+    async def run(self, seconds: float) -> None:
+        # The handler's task copies this context, so mark_committed finds us
+        token = _supervisor.set(self)
+        try:
+            handler = asyncio.create_task(self._handle())
+        finally:
+            _supervisor.reset(token)
+        watcher = asyncio.create_task(self._watch())
+        disconnect = asyncio.create_task(self.disconnected.wait())
+        try:
+            await asyncio.wait(
+                {handler, disconnect},
+                timeout=max(seconds, 0.0),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not handler.done():
+                if (
+                    self.response_done
+                    or self.committed
+                    or (self.response_started and not self.disconnected.is_set())
+                ):
+                    # Committed or answered: let it finish its tail work
+                    await handler
+                else:
+                    reason = "disconnect" if self.disconnected.is_set() else "deadline"
+                    await self._cancel(handler, reason)
+                    return
+            handler.result()
+        except BaseException:
+            # The server cancelled us (shutdown); take the handler with us
+            if not handler.done():
+                handler.cancel()
+            raise
+        finally:
+            watcher.cancel()
+            disconnect.cancel()
+
+    async def _cancel(self, handler: "asyncio.Task[Any]", reason: str) -> None:
+        HTTP_REQUESTS_CANCELLED.inc(reason=reason)
+        handler.cancel()
+        # Its cleanup (rollback, connection release) runs before we answer
+        await asyncio.gather(handler, return_exceptions=True)
+        if reason == "deadline" and not self.response_started:
+            await self._send(
+                {
+                    "type": "http.response.start",
+                    "status": 504,
+                    "headers": [(b"content-type", b"application/json")],
+                }
+            )
+            await self._send(
+                {"type": "http.response.body", "body": DEADLINE_EXCEEDED_BODY}
+            )
+
+    def _note(self, message: Message) -> None:
+        if message["type"] == "http.disconnect":
+            self.disconnected.set()
+            self._body_read.set()
+        elif message["type"] == "http.request" and not message.get("more_body"):
+            self._body_read.set()
+
+    async def receive(self) -> Message:
+        async with self._lock:
+            if self._buffered is not None:
+                message, self._buffered = self._buffered, None
+                return message
+            if not self._body_read.is_set():
+                message = await self._receive()
+                self._note(message)
+                return message
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.response_started = True
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            self.response_done = True
+        await self._send(message)
+
+    async def _watch(self) -> None:
+        if not self._has_body:
+            async with self._lock:
+                if not self._body_read.is_set():
+                    message = await self._receive()
+                    self._note(message)
+                    if message["type"] == "http.request":
+                        self._buffered = message
+        # With a body, start listening once the handler has read it
+        await self._body_read.wait()
+        while not self.disconnected.is_set():
+            self._note(await self._receive())
@@ -0,0 +1,138 @@
+# app/resilience/dependencies.py
+"""
+The external dependencies the service calls, each behind its own circuit
+breaker and timeout. Call sites go through `ExternalDependency.call`, which
+also records the call in external_call_duration_seconds. Blocking Firebase
+Admin calls run on `firebase_threads` (app/resilience/threads.py).
+"""
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from firebase_admin import auth as firebase_auth
+from firebase_admin import exceptions as firebase_exceptions
+
+from app.metrics.instruments import track_external
+from app.resilience.breaker import (
+    CircuitBreaker,
+    DependencySaturatedError,
+    DependencyTimeoutError,
+    register_breaker,
+)
+from app.resilience.budget import call_timeout
+from app.resilience.threads import BoundedExecutor
+from app.utils.constants import ResilienceConstants
+
+T = TypeVar("T")
+
+
+def _always(exc: BaseException) -> bool:
+    return True
+
+
+class ExternalDependency:
+    """
+    `is_failure` decides which exceptions count against the breaker: errors
+    that mean the dependency answered (a bad token, a 4xx) must not trip it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        breaker: CircuitBreaker,
+        is_failure: Callable[[BaseException], bool] = _always,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.breaker = breaker
+        self.is_failure = is_failure
+
+    async def call(self, operation: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self.breaker.before_call()
+        timeout = call_timeout(self.timeout)
+        if timeout <= 0:
+            # The request's budget ran out before the call; not the
+            # dependency's fault, so it does not count against the breaker.
+            self.breaker.on_abandon()
+            raise DependencyTimeoutError(
+                self.name, f"No latency budget left to call {self.name} {operation}"
+            )
+        try:
+            with track_external(self.name, operation):
+                result = await asyncio.wait_for(fn(), timeout)
+        except asyncio.TimeoutError as e:
+            self.breaker.on_failure()
+            raise DependencyTimeoutError(
+                self.name, f"{self.name} {operation} timed out after {timeout:.2f}s"
+            ) from e
+        except DependencySaturatedError:
+            # Never reached the dependency; the calls holding the threads
+            # count for or against it when they finish.
+            self.breaker.on_abandon()
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self.breaker.on_failure()
+            else:
+                self.breaker.on_success()
+            raise
+        except BaseException:
+            self.breaker.on_abandon()
+            raise
+        self.breaker.on_success()
+        return result
+
+
+def _breaker(name: str) -> CircuitBreaker:
+    return register_breaker(
+        CircuitBreaker(
+            name,
+            failure_threshold=ResilienceConstants.FAILURE_THRESHOLD,
+            recovery_seconds=ResilienceConstants.RECOVERY_SECONDS,
+            half_open_max_calls=ResilienceConstants.HALF_OPEN_MAX_CALLS,
+        )
+    )
+
+
+def firebase_failure(exc: BaseException) -> bool:
+    # Invalid/expired/revoked tokens are answers, not outages.
+    return isinstance(
+        exc,
+        (
+            firebase_auth.CertificateFetchError,
+            firebase_exceptions.UnavailableError,
+            firebase_exceptions.DeadlineExceededError,
+            firebase_exceptions.InternalError,
+            firebase_exceptions.UnknownError,
+            OSError,
+        ),
+    )
+
+
+def github_failure(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, httpx.TransportError)
+
+
+firebase_threads = BoundedExecutor(
+    "firebase", ResilienceConstants.FIREBASE_MAX_THREADS
+)
+firebase = ExternalDependency(
+    "firebase",
+    ResilienceConstants.FIREBASE_TIMEOUT_SECONDS,
+    _breaker("firebase"),
+    firebase_failure,
+)
+github = ExternalDependency(
+    "github",
+    ResilienceConstants.GITHUB_TIMEOUT_SECONDS,
+    _breaker("github"),
+    github_failure,
+)
+pubsub = ExternalDependency(
+    "pubsub",
+    ResilienceConstants.PUBSUB_TIMEOUT_SECONDS,
+    _breaker("pubsub"),
+)
@@ -0,0 +1,34 @@
+# app/resilience/handlers.py
+import math
+
+from fastapi import FastAPI, Request
+from platform_common.logging.logging import get_logger
+from platform_common.utils.service_response import ServiceResponse
+
+from app.resilience.breaker import DependencyUnavailableError
+
+logger = get_logger("resilience")
+
+
+async def dependency_unavailable_handler(
+    request: Request, exc: Exception
+) -> ServiceResponse:
+    assert isinstance(exc, DependencyUnavailableError)
+    logger.warning(f"{request.method} {request.url.path} failed fast: {exc}")
+    response: ServiceResponse = ServiceResponse(
+        message=str(exc),
+        status_code=503,
+        success=False,
+    )
+    response.headers["Retry-After"] = str(math.ceil(exc.retry_after))
+    return response
+
+
+def add_dependency_error_handler(app: FastAPI) -> None:
+    """
+    Map DependencyUnavailableError (open breaker, exhausted budget) to 503
+    with Retry-After instead of a generic 500.
+    """
+    app.add_exception_handler(
+        DependencyUnavailableError, dependency_unavailable_handler
+    )
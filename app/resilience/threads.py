@@ -0,0 +1,56 @@
+# app/resilience/threads.py
+"""
+Bounded thread pools for dependencies whose client libraries block.
+
+A blocking call abandoned by its timeout keeps its thread until the call
+returns. Run through `asyncio.to_thread`, such calls pile up in the loop's
+default executor while the dependency hangs and starve everything else that
+uses it. A `BoundedExecutor` gives the dependency a few threads of its own;
+when all of them are busy, further calls fail at once with
+DependencySaturatedError (a 503 with Retry-After) instead of queueing.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.resilience.breaker import DependencySaturatedError
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix=f"{name}-call"
+        )
+        # Held from submission until the call returns, abandoned or not
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            raise DependencySaturatedError(
+                self.name, f"All {self.max_workers} {self.name} threads are busy"
+            )
+        # Same context propagation as asyncio.to_thread
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, fn, *args, **kwargs)
+
+        def run_and_release() -> T:
+            try:
+                return call()
+            finally:
+                self._slots.release()
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, run_and_release
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        return await future
@@ -0,0 +1,111 @@
+# app/search/sync.py
+"""
+Keeps the user search index current: a streaming scan of the users table at
+startup, then `user:changes` events for writes made by other replicas (local
+writes are applied directly by the handlers via `index_user`/`unindex_user`).
+"""
+import asyncio
+import time
+from typing import Any, Mapping
+
+from platform_common.logging.logging import get_logger
+from platform_common.models.user import User
+from sqlalchemy import select
+
+from app.db.dal.hot_path import soft_delete_columns
+from app.db.engine import get_engine
+from app.pubsub.events.user_events import CHANNEL_USER_CHANGES
+from app.search.user_index import UserSearchIndex, user_search_index
+from app.utils.constants import SearchConstants
+
+logger = get_logger("user_search_sync")
+
+RESUBSCRIBE_DELAY_SECONDS = 5.0
+
+
+def index_user(user: Any) -> None:
+    user_search_index.upsert(user.id, user.email, getattr(user, "username", None))
+
+
+def unindex_user(user_id: str) -> None:
+    user_search_index.remove(user_id)
+
+
+def apply_user_change(
+    index: UserSearchIndex, event_type: str, payload: Mapping[str, Any]
+) -> None:
+    user_id = payload.get("user_id")
+    if not user_id:
+        return
+    if event_type == "user_deleted":
+        index.remove(user_id)
+    elif event_type in ("user_updated", "user_verified"):
+        index.upsert(user_id, payload.get("email"), payload.get("username"))
+
+
+async def build_index(
+    index: UserSearchIndex = user_search_index,
+    batch_size: int = SearchConstants.SCAN_BATCH_SIZE,
+) -> int:
+    """
+    Stream (id, email, username) of live users into the index in
+    server-side-cursor batches, yielding to the loop between batches.
+    Soft-deleted users stay out, as they are removed on delete.
+    """
+    started = time.perf_counter()
+    table = User.__table__  # type: ignore[attr-defined]
+    deleted_at, _ = soft_delete_columns(table)
+    stmt = (
+        select(table.c.id, table.c.email, table.c.username)
+        .where(deleted_at.is_(None))
+        .execution_options(yield_per=batch_size)
+    )
+    async with get_engine().connect() as connection:
+        result = await connection.stream(stmt)
+        async for rows in result.partitions(batch_size):
+            index.bulk_load(tuple(row) for row in rows)
+            await asyncio.sleep(0)
+    index.mark_ready()
+    logger.info(
+        f"User search index built: {len(index)} users "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return len(index)
+
+
+async def follow_user_changes(index: UserSearchIndex = user_search_index) -> None:
+    try:
+        from platform_common.pubsub.factory import get_subscriber
+    except ImportError:
+        logger.warning(
+            "No pub/sub subscriber available; user search index follows "
+            "this replica's writes only"
+        )
+        return
+
+    while True:
+        try:
+            subscriber = get_subscriber()
+            async for event in subscriber.subscribe(CHANNEL_USER_CHANGES):
+                apply_user_change(index, event.event_type, event.payload or {})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"user:changes subscription failed, retrying: {e}")
+        await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+
+
+async def run_user_index(index: UserSearchIndex = user_search_index) -> None:
+    """
+    Background task for the app lifespan. The subscription starts before the
+    scan so no change made while scanning is missed.
+    """
+    follower = asyncio.create_task(follow_user_changes(index))
+    try:
+        try:
+            await build_index(index)
+        except Exception as e:
+            logger.error(f"User search index build failed: {e}")
+        await follower
+    finally:
+        follower.cancel()
@@ -0,0 +1,145 @@
+# app/search/user_index.py
+"""
+In-process typeahead index over user emails and usernames.
+
+Queries of three or more characters are answered from a trigram index
+(candidates = intersection of the query's trigram postings, then verified by
+substring match); shorter queries use a prefix index. Results are ranked
+exact > prefix > substring, then by shorter term, and bounded by `limit`.
+"""
+import heapq
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+MAX_SHORT_PREFIX = 2
+
+
+@dataclass(frozen=True)
+class IndexedUser:
+    id: str
+    email: str
+    username: str
+
+    def terms(self) -> tuple[str, ...]:
+        email = self.email.lower()
+        local, _, domain = email.partition("@")
+        terms = {email, local, self.username.lower()}
+        if domain:
+            terms.add(domain)
+        return tuple(t for t in terms if t)
+
+
+def _trigrams(term: str) -> set[str]:
+    return {term[i : i + 3] for i in range(len(term) - 2)}
+
+
+class UserSearchIndex:
+    def __init__(self) -> None:
+        self._users: dict[str, IndexedUser] = {}
+        self._trigrams: dict[str, set[str]] = {}
+        self._prefixes: dict[str, set[str]] = {}
+        # Ids written live while the startup scan runs; the scan must not
+        # overwrite them with the (possibly older) row it read.
+        self._changed_during_build: set[str] = set()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def upsert(
+        self, user_id: str, email: Optional[str], username: Optional[str]
+    ) -> None:
+        if not self.ready:
+            self._changed_during_build.add(user_id)
+        self._remove(user_id)
+        self._add(IndexedUser(user_id, email or "", username or ""))
+
+    def remove(self, user_id: str) -> None:
+        if not self.ready:
+            self._changed_during_build.add(user_id)
+        self._remove(user_id)
+
+    def bulk_load(
+        self, users: Iterable[tuple[str, Optional[str], Optional[str]]]
+    ) -> int:
+        """
+        Load rows from the startup scan, skipping users already written live.
+        """
+        count = 0
+        for user_id, email, username in users:
+            if user_id in self._changed_during_build:
+                continue
+            self._remove(user_id)
+            self._add(IndexedUser(user_id, email or "", username or ""))
+            count += 1
+        return count
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self._changed_during_build.clear()
+
+    def _add(self, user: IndexedUser) -> None:
+        user_id = user.id
+        self._users[user_id] = user
+        for term in user.terms():
+            for gram in _trigrams(term):
+                self._trigrams.setdefault(gram, set()).add(user_id)
+            for n in range(1, min(MAX_SHORT_PREFIX, len(term)) + 1):
+                self._prefixes.setdefault(term[:n], set()).add(user_id)
+
+    def _remove(self, user_id: str) -> None:
+        user = self._users.pop(user_id, None)
+        if user is None:
+            return
+        for term in user.terms():
+            for gram in _trigrams(term):
+                self._discard(self._trigrams, gram, user_id)
+            for n in range(1, min(MAX_SHORT_PREFIX, len(term)) + 1):
+                self._discard(self._prefixes, term[:n], user_id)
+
+    def search(self, query: str, limit: int = 10) -> list[IndexedUser]:
+        q = query.strip().lower()
+        if not q or limit <= 0:
+            return []
+
+        candidates: Iterable[str]
+        if len(q) <= MAX_SHORT_PREFIX:
+            candidates = self._prefixes.get(q, ())
+        else:
+            postings = [self._trigrams.get(g, set()) for g in _trigrams(q)]
+            # Walk the rarest trigram's postings; the rest are membership checks.
+            postings.sort(key=len)
+            smallest, *rest = postings
+            candidates = (uid for uid in smallest if all(uid in p for p in rest))
+
+        ranked: list[tuple[tuple[int, int], str, str]] = []
+        for uid in candidates:
+            user = self._users[uid]
+            best: Optional[tuple[int, int]] = None
+            for term in user.terms():
+                if term == q:
+                    rank = (0, len(term))
+                elif term.startswith(q):
+                    rank = (1, len(term))
+                elif q in term:
+                    rank = (2, len(term))
+                else:
+                    continue
+                if best is None or rank < best:
+                    best = rank
+            if best is not None:
+                ranked.append((best, user.email, uid))
+
+        return [self._users[uid] for _, _, uid in heapq.nsmallest(limit, ranked)]
+
+    @staticmethod
+    def _discard(index: dict[str, set[str]], key: str, user_id: str) -> None:
+        ids = index.get(key)
+        if ids is None:
+            return
+        ids.discard(user_id)
+        if not ids:
+            del index[key]
+
+
+user_search_index = UserSearchIndex()
@@ -0,0 +1,137 @@
+# app/server.py
+"""
+Production launcher.
+
+    python -m app.server [--app app.main:app] [--port 5003] [--workers N]
+
+Runs uvicorn with one worker per CPU the container may use (cgroup quota,
+then CPU affinity), the uvloop event loop and httptools parser when
+installed, keep-alive and listen backlog tuned for running behind a load
+balancer, and a bounded graceful drain: on SIGTERM each worker stops
+accepting connections and gives in-flight requests up to
+GRACEFUL_SHUTDOWN_SECONDS to finish before the app lifespan shuts down.
+
+With more than one worker, the workers share a METRICS_MULTIPROC_DIR (a
+fresh temporary directory unless one is configured) so /metrics reports all
+of them, not just the worker that answered the scrape.
+"""
+import argparse
+import importlib.util
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+import uvicorn
+
+from app.utils.constants import ServerConstants
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def cgroup_cpu_quota(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    CPUs allowed by the container's cgroup quota, or None when unlimited.
+    """
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = root / "cpu.max"
+    if cpu_max.exists():
+        quota, _, period = cpu_max.read_text().strip().partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    # cgroup v1
+    quota_file = root / "cpu" / "cpu.cfs_quota_us"
+    period_file = root / "cpu" / "cpu.cfs_period_us"
+    if quota_file.exists() and period_file.exists():
+        quota_us = int(quota_file.read_text())
+        if quota_us > 0:
+            return quota_us / int(period_file.read_text())
+    return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def worker_count() -> int:
+    if ServerConstants.WORKERS:
+        return max(1, int(ServerConstants.WORKERS))
+    return min(available_cpus(), ServerConstants.MAX_WORKERS)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def uvicorn_options(workers: int) -> dict[str, Any]:
+    return {
+        "host": ServerConstants.HOST,
+        "port": ServerConstants.PORT,
+        "workers": workers,
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "backlog": ServerConstants.BACKLOG,
+        "timeout_keep_alive": ServerConstants.KEEP_ALIVE_SECONDS,
+        "timeout_graceful_shutdown": ServerConstants.GRACEFUL_SHUTDOWN_SECONDS,
+        "access_log": ServerConstants.ACCESS_LOG,
+        # X-Forwarded-For ends up in user_sessions.ip_address; only trust it
+        # from the load balancer's addresses
+        "proxy_headers": True,
+        "forwarded_allow_ips": ServerConstants.FORWARDED_ALLOW_IPS,
+        "server_header": False,
+    }
+
+
+def share_metrics(workers: int) -> None:
+    """
+    Point the workers (which inherit this environment) at one metrics
+    directory, emptied of a previous launch's snapshots.
+    """
+    if workers <= 1:
+        return
+    from app.metrics.multiprocess import clear_snapshots
+
+    directory = os.environ.get("METRICS_MULTIPROC_DIR") or tempfile.mkdtemp(
+        prefix="metrics-"
+    )
+    clear_snapshots(directory)
+    os.environ["METRICS_MULTIPROC_DIR"] = directory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the service in production")
+    parser.add_argument("--app", default="app.main:app", help="ASGI app import path")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    options = uvicorn_options(args.workers or worker_count())
+    if args.host:
+        options["host"] = args.host
+    if args.port:
+        options["port"] = args.port
+    share_metrics(options["workers"])
+    from platform_common.logging.logging import get_logger
+
+    get_logger("server").info(
+        "Starting server",
+        app=args.app,
+        workers=options["workers"],
+        loop=options["loop"],
+        http=options["http"],
+    )
+    uvicorn.run(args.app, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# app/utils/background_writer.py
+"""
+A bounded queue drained by a daemon thread, so code on the event loop only
+pays for a queue put. Used by the log pipeline (app/logs/pipeline.py) and
+traffic capture (app/capture/recorder.py).
+"""
+import atexit
+import queue
+import sys
+import threading
+import time
+from typing import Generic, Optional, TypeVar
+
+ItemT = TypeVar("ItemT")
+
+
+class BackgroundWriter(Generic[ItemT]):
+    """
+    Subclasses implement `handle`, and optionally `opened`/`closed` (run on
+    the writer thread around the loop) and `tick` (every `tick_seconds`,
+    also while idle). `offer` never blocks; it returns False when the queue
+    is full and leaves accounting for the drop to the caller.
+    """
+
+    thread_name = "background-writer"
+    tick_seconds: Optional[float] = None
+
+    def __init__(self, queue_size: int):
+        self._queue: queue.Queue[Optional[ItemT]] = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def offer(self, item: ItemT) -> bool:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            return False
+        return True
+
+    def handle(self, item: ItemT) -> None:
+        raise NotImplementedError
+
+    def opened(self) -> None:
+        pass
+
+    def closed(self) -> None:
+        pass
+
+    def tick(self) -> None:
+        pass
+
+    def _run(self) -> None:
+        self.opened()
+        try:
+            next_tick = time.monotonic() + (self.tick_seconds or 0.0)
+            while True:
+                timeout = None
+                if self.tick_seconds is not None:
+                    timeout = max(next_tick - time.monotonic(), 0.001)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    pass
+                else:
+                    if item is None:
+                        return
+                    try:
+                        self.handle(item)
+                    except Exception as e:  # a bad item must not kill the writer
+                        # Not logged: the log pipeline itself runs on this class
+                        print(f"{self.thread_name}: write failed: {e}", file=sys.stderr)
+                if self.tick_seconds is not None and time.monotonic() >= next_tick:
+                    self.tick()
+                    next_tick = time.monotonic() + self.tick_seconds
+        finally:
+            self.closed()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=self.thread_name, daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Flush what is queued and stop the writer."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def depth(self) -> int:
+        return self._queue.qsize()
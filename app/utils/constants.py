@@ -9,3 +9,257 @@ class GithubConstants:
         "GITHUB_REDIRECT_URI"
     )  # e.g., http://localhost:8000/github/callback
     SCOPE = "read:user user:email"
+
+
+class DatabaseConstants:
+    URL = os.getenv("DATABASE_URL")
+    POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    # Server-side prepared statements for the hot auth queries. Disable when
+    # running behind a transaction-pooling proxy (e.g. pgbouncer).
+    PREPARED_STATEMENTS = os.getenv("DB_PREPARED_STATEMENTS", "true").lower() == "true"
+
+
+class ReplicaConstants:
+    # Read replicas for read-only handlers (app/db/replicas.py); empty = off
+    URLS = [
+        url.strip()
+        for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    POOL_SIZE = int(os.getenv("DB_REPLICA_POOL_SIZE", "10"))
+    MAX_OVERFLOW = int(os.getenv("DB_REPLICA_MAX_OVERFLOW", "10"))
+    # Replicas further behind than this are skipped (reads go to the primary)
+    MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+    CHECK_INTERVAL_SECONDS = float(os.getenv("DB_REPLICA_CHECK_INTERVAL_SECONDS", "1"))
+    # Lifetime of the read-your-writes cookie set after a write
+    READ_AFTER_MAX_AGE_SECONDS = int(os.getenv("DB_READ_AFTER_MAX_AGE_SECONDS", "60"))
+    # Local testing without streaming replication: every replica reports
+    # itself this far behind the primary (unset = real replication status)
+    SIMULATED_LAG_SECONDS = (
+        float(os.environ["DB_REPLICA_SIMULATED_LAG_SECONDS"])
+        if os.getenv("DB_REPLICA_SIMULATED_LAG_SECONDS")
+        else None
+    )
+
+
+class SingleFlightConstants:
+    # Coalescing of concurrent identical hot-path lookups (app/db/single_flight.py)
+    ENABLED = os.getenv("DB_SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    # Callers that may share one in-flight query; later ones query themselves
+    MAX_WAITERS = int(os.getenv("DB_SINGLE_FLIGHT_MAX_WAITERS", "64"))
+
+
+class ProfilingConstants:
+    # Fraction of requests profiled at random (0 disables sampling)
+    SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    # Requests carrying `X-Profile: <token>` are always profiled
+    TOKEN = os.getenv("PROFILING_TOKEN")
+    INTERVAL_SECONDS = float(os.getenv("PROFILING_INTERVAL_SECONDS", "0.005"))
+    OUTPUT_DIR = os.getenv("PROFILING_OUTPUT_DIR", "/tmp/profiles")
+
+
+class CaptureConstants:
+    # Sanitised traffic capture for replay (app/capture, benchmarks/load/replay.py)
+    ENABLED = os.getenv("TRAFFIC_CAPTURE_ENABLED", "false").lower() == "true"
+    # Fraction of requests recorded
+    SAMPLE_RATE = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE_RATE", "1"))
+    # Each worker writes <path> with its pid inserted (traffic.<pid>.jsonl)
+    PATH = os.getenv("TRAFFIC_CAPTURE_PATH", "/tmp/capture/traffic.jsonl")
+    # Rotate at this size, keeping this many older files (traffic.<pid>.jsonl.1, ...)
+    MAX_BYTES = int(os.getenv("TRAFFIC_CAPTURE_MAX_BYTES", str(16 * 1024 * 1024)))
+    BACKUP_COUNT = int(os.getenv("TRAFFIC_CAPTURE_BACKUP_COUNT", "5"))
+    # Records waiting for the writer thread; more are dropped, not queued
+    QUEUE_SIZE = int(os.getenv("TRAFFIC_CAPTURE_QUEUE_SIZE", "10000"))
+
+
+class SearchConstants:
+    # In-memory typeahead index over users (app/search)
+    INDEX_ENABLED = os.getenv("USER_SEARCH_INDEX", "true").lower() == "true"
+    SCAN_BATCH_SIZE = int(os.getenv("USER_SEARCH_SCAN_BATCH_SIZE", "2000"))
+    MAX_LIMIT = int(os.getenv("USER_SEARCH_MAX_LIMIT", "50"))
+
+
+class InviteCacheConstants:
+    # Membership filter over all organization invite token hashes, so unknown
+    # tokens are rejected without a query. Invites created since the last
+    # refresh are picked up incrementally (by created_at) every REFRESH
+    # seconds; the full rebuild drops deleted rows.
+    FILTER_ENABLED = os.getenv("INVITE_FILTER_ENABLED", "true").lower() == "true"
+    FILTER_REFRESH_SECONDS = float(os.getenv("INVITE_FILTER_REFRESH_SECONDS", "2"))
+    FILTER_REBUILD_SECONDS = float(os.getenv("INVITE_FILTER_REBUILD_SECONDS", "300"))
+    # Stop trusting the filter if it could not be refreshed for this long
+    FILTER_MAX_STALENESS_SECONDS = float(
+        os.getenv("INVITE_FILTER_MAX_STALENESS_SECONDS", "30")
+    )
+    # Each incremental refresh re-reads this far behind its watermark, for
+    # rows that committed after a later created_at was already seen
+    FILTER_OVERLAP_SECONDS = float(os.getenv("INVITE_FILTER_OVERLAP_SECONDS", "60"))
+    # A filter miss refreshes first, at most this often; a token created and
+    # used within this window of the previous refresh is checked next time
+    FILTER_CATCH_UP_SECONDS = float(os.getenv("INVITE_FILTER_CATCH_UP_SECONDS", "1"))
+    NEGATIVE_TTL_SECONDS = float(os.getenv("INVITE_NEGATIVE_TTL_SECONDS", "60"))
+    ORG_NAME_TTL_SECONDS = float(os.getenv("ORG_NAME_TTL_SECONDS", "300"))
+
+
+class InviteSweeperConstants:
+    # Background job expiring overdue pending invites (app/jobs/invite_sweeper.py)
+    ENABLED = os.getenv("INVITE_SWEEPER_ENABLED", "true").lower() == "true"
+    INTERVAL_SECONDS = float(os.getenv("INVITE_SWEEPER_INTERVAL_SECONDS", "60"))
+    BATCH_SIZE = int(os.getenv("INVITE_SWEEPER_BATCH_SIZE", "500"))
+    MAX_BATCHES_PER_RUN = int(os.getenv("INVITE_SWEEPER_MAX_BATCHES", "200"))
+    BATCH_PAUSE_SECONDS = float(os.getenv("INVITE_SWEEPER_BATCH_PAUSE_SECONDS", "0.05"))
+    # Postgres advisory lock key; one replica sweeps at a time
+    LOCK_KEY = int(os.getenv("INVITE_SWEEPER_LOCK_KEY", "7301450321"))
+
+
+class UserPurgeConstants:
+    # Background removal of soft-deleted users' rows (app/jobs/user_purge.py)
+    ENABLED = os.getenv("USER_PURGE_ENABLED", "true").lower() == "true"
+    INTERVAL_SECONDS = float(os.getenv("USER_PURGE_INTERVAL_SECONDS", "30"))
+    BATCH_SIZE = int(os.getenv("USER_PURGE_BATCH_SIZE", "200"))
+    MAX_BATCHES_PER_RUN = int(os.getenv("USER_PURGE_MAX_BATCHES", "100"))
+    BATCH_PAUSE_SECONDS = float(os.getenv("USER_PURGE_BATCH_PAUSE_SECONDS", "0.1"))
+    LOCK_KEY = int(os.getenv("USER_PURGE_LOCK_KEY", "7301450322"))
+
+
+class ReconcileConstants:
+    # Firebase -> users table reconciliation (app/jobs/user_reconcile.py)
+    PAGE_SIZE = int(os.getenv("DB_RECONCILE_PAGE_SIZE", "1000"))  # Firebase max
+    BATCH_SIZE = int(os.getenv("DB_RECONCILE_BATCH_SIZE", "500"))
+    PAGES_PER_SECOND = float(os.getenv("DB_RECONCILE_PAGES_PER_SECOND", "2"))
+    CHECKPOINT_PATH = os.getenv(
+        "DB_RECONCILE_CHECKPOINT_PATH", "/tmp/user_reconcile_checkpoint.json"
+    )
+
+
+class GroupCommitConstants:
+    # Batched registration writes: invite + outbox row (app/db/group_commit.py)
+    ENABLED = os.getenv("DB_GROUP_COMMIT_ENABLED", "true").lower() == "true"
+    # Longest a write waits for others to join its batch
+    WINDOW_MS = float(os.getenv("DB_GROUP_COMMIT_WINDOW_MS", "5"))
+    # Rows per batch; a full batch is written immediately. Keep rows x columns
+    # under the driver's bind-parameter limit (32767 for asyncpg).
+    MAX_ROWS = int(os.getenv("DB_GROUP_COMMIT_MAX_ROWS", "500"))
+
+
+class IdempotencyConstants:
+    # Idempotency-Key handling for mutating routes (app/idempotency)
+    ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+    # "database" (shared by all workers and replicas) or "memory" (per process)
+    BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "database").lower()
+    # "METHOD /path" pairs, comma separated
+    ROUTES = os.getenv(
+        "IDEMPOTENCY_ROUTES", "GET /api/user/action/register,POST /api/user/"
+    )
+    # How long a completed response is replayed for
+    TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    # How long a claim on an in-progress key survives a crashed worker
+    LOCK_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_TTL_SECONDS", "60"))
+    MAX_KEY_LENGTH = 255
+
+
+class ServerConstants:
+    # Production launcher (python -m app.server)
+    HOST = os.getenv("HOST", "0.0.0.0")
+    PORT = int(os.getenv("PORT", "5003"))
+    # Explicit worker count; derived from the container CPU quota when unset
+    WORKERS = os.getenv("WEB_CONCURRENCY")
+    MAX_WORKERS = int(os.getenv("MAX_WORKERS", "16"))
+    # Longer than the load balancer's idle timeout, so the LB closes first
+    KEEP_ALIVE_SECONDS = int(os.getenv("KEEP_ALIVE_SECONDS", "75"))
+    BACKLOG = int(os.getenv("BACKLOG", "2048"))
+    # Time allowed for in-flight requests to finish after SIGTERM
+    GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "25"))
+    ACCESS_LOG = os.getenv("ACCESS_LOG", "false").lower() == "true"
+    # Proxies whose X-Forwarded-For/-Proto are trusted, comma separated
+    FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+class MetricsConstants:
+    # Directory the launcher's workers share: each writes <pid>.json snapshots
+    # and /metrics merges them. Set by app/server.py when it starts more than
+    # one worker; unset means this process's metrics only.
+    MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+    FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+    # How often event_loop_lag_seconds is sampled
+    LOOP_LAG_INTERVAL_SECONDS = float(
+        os.getenv("METRICS_LOOP_LAG_INTERVAL_SECONDS", "0.5")
+    )
+
+
+class WarmupConstants:
+    # Startup warm-up run by the app lifespan before the server accepts traffic
+    ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "30"))
+    # Connections opened up front; defaults to the pool size
+    POOL_PREFILL = int(
+        os.getenv("WARMUP_POOL_PREFILL", os.getenv("DB_POOL_SIZE", "10"))
+    )
+
+
+class GraphQLConstants:
+    ENABLED = os.getenv("GRAPHQL_ENABLED", "true").lower() == "true"
+    GRAPHIQL = os.getenv("GRAPHQL_GRAPHIQL", "false").lower() == "true"
+    # Cost bounds checked during validation, before any resolver runs
+    MAX_DEPTH = int(os.getenv("GRAPHQL_MAX_DEPTH", "6"))
+    MAX_COMPLEXITY = int(os.getenv("GRAPHQL_MAX_COMPLEXITY", "5000"))
+    MAX_ALIASES = int(os.getenv("GRAPHQL_MAX_ALIASES", "15"))
+    # Assumed length of a list field whose size the query does not state
+    DEFAULT_LIST_SIZE = int(os.getenv("GRAPHQL_DEFAULT_LIST_SIZE", "10"))
+    MAX_LIST_SIZE = int(os.getenv("GRAPHQL_MAX_LIST_SIZE", "100"))
+
+
+class TokenRefreshConstants:
+    # Key/algorithm the access tokens are signed with (see create_jwt); the
+    # platform settings' jwt_secret is used when JWT_SECRET is unset
+    JWT_SECRET = os.getenv("JWT_SECRET")
+    JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+    # Access tokens with at least this much lifetime left are returned as-is
+    MIN_REMAINING_SECONDS = int(os.getenv("TOKEN_REFRESH_MIN_REMAINING_SECONDS", "120"))
+    # A rotated-out refresh token presented this soon after rotation is treated
+    # as a concurrent-tab race rather than token theft
+    REUSE_GRACE_SECONDS = int(os.getenv("TOKEN_REFRESH_REUSE_GRACE_SECONDS", "10"))
+
+
+class ResilienceConstants:
+    # Consecutive failures that open a dependency's circuit breaker
+    FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    # How long an open breaker fails fast before letting a probe through
+    RECOVERY_SECONDS = float(os.getenv("BREAKER_RECOVERY_SECONDS", "30"))
+    HALF_OPEN_MAX_CALLS = int(os.getenv("BREAKER_HALF_OPEN_MAX_CALLS", "1"))
+    # Upper bound per call; the request's remaining budget may lower it
+    FIREBASE_TIMEOUT_SECONDS = float(os.getenv("FIREBASE_TIMEOUT_SECONDS", "3"))
+    GITHUB_TIMEOUT_SECONDS = float(os.getenv("GITHUB_TIMEOUT_SECONDS", "5"))
+    PUBSUB_TIMEOUT_SECONDS = float(os.getenv("PUBSUB_TIMEOUT_SECONDS", "2"))
+    # Threads for blocking Firebase Admin calls; calls beyond this fail fast
+    FIREBASE_MAX_THREADS = int(os.getenv("FIREBASE_MAX_THREADS", "4"))
+    # Per-route latency budgets, "<path prefix>=<seconds>", longest prefix wins
+    DEFAULT_BUDGET_SECONDS = float(os.getenv("LATENCY_BUDGET_SECONDS", "10"))
+    ROUTE_BUDGETS = os.getenv(
+        "LATENCY_BUDGETS", "/api/auth/=5,/api/user/action/=5,/api/idp/=10"
+    )
+    # Clients may shorten (never extend) the budget: "<header>: <milliseconds>"
+    DEADLINE_HEADER = os.getenv("DEADLINE_HEADER", "x-request-timeout-ms")
+    # Cancel the handler when the budget runs out (504) or the client goes away
+    CANCEL_ON_DEADLINE = os.getenv("DEADLINE_CANCEL", "true").lower() == "true"
+    # Bound DB statements by the remaining budget (Postgres statement_timeout),
+    # plus a grace period so the request's own cancellation normally wins
+    DB_STATEMENT_TIMEOUTS = (
+        os.getenv("DEADLINE_DB_STATEMENT_TIMEOUT", "true").lower() == "true"
+    )
+    DB_STATEMENT_GRACE_MS = int(os.getenv("DEADLINE_DB_STATEMENT_GRACE_MS", "100"))
+
+
+class LoggingConstants:
+    # Queue + background writer for structlog (app/logs/pipeline.py)
+    PIPELINE_ENABLED = os.getenv("LOG_PIPELINE_ENABLED", "true").lower() == "true"
+    LEVEL = os.getenv("LOG_LEVEL", "info")
+    QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # "<event>=<fraction kept>" for high-frequency info/debug events
+    SAMPLE_RATES = os.getenv(
+        "LOG_SAMPLE_RATES",
+        "Health check=0.01,Getting user session from cookies=0.1",
+    )
+    DROP_REPORT_SECONDS = float(os.getenv("LOG_DROP_REPORT_SECONDS", "10"))
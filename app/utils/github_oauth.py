@@ -2,7 +2,15 @@
 import secrets
 import httpx
 from fastapi import Request
-from app.utils.constants import GithubConstants
+from app.resilience.budget import call_timeout
+from app.resilience.dependencies import github
+from app.utils.constants import GithubConstants, ResilienceConstants
+
+
+def _timeout() -> httpx.Timeout:
+    # httpx gives up on its own within the request's remaining budget, not
+    # just when github.call's wait_for fires
+    return httpx.Timeout(call_timeout(ResilienceConstants.GITHUB_TIMEOUT_SECONDS))
 
 
 class GithubOAuth:
@@ -32,7 +40,14 @@ class GithubOAuth:
 
     @staticmethod
     async def exchange_code_for_token(code: str) -> str:
-        async with httpx.AsyncClient() as client:
+        return await github.call(
+            "exchange_code_for_token",
+            lambda: GithubOAuth._exchange_code_for_token(code),
+        )
+
+    @staticmethod
+    async def _exchange_code_for_token(code: str) -> str:
+        async with httpx.AsyncClient(timeout=_timeout()) as client:
             response = await client.post(
                 "https://github.com/login/oauth/access_token",
                 headers={"Accept": "application/json"},
@@ -48,7 +63,14 @@ class GithubOAuth:
 
     @staticmethod
     async def fetch_primary_email(access_token: str) -> str | None:
-        async with httpx.AsyncClient() as client:
+        return await github.call(
+            "fetch_primary_email",
+            lambda: GithubOAuth._fetch_primary_email(access_token),
+        )
+
+    @staticmethod
+    async def _fetch_primary_email(access_token: str) -> str | None:
+        async with httpx.AsyncClient(timeout=_timeout()) as client:
             response = await client.get(
                 "https://api.github.com/user/emails",
                 headers={"Authorization": f"Bearer {access_token}"},
@@ -0,0 +1,118 @@
+# app/warmup.py
+"""
+Startup warm-up, run from the app lifespan before uvicorn starts accepting
+connections. Each step is timed and logged; a failing step is logged and
+skipped so a slow dependency delays, but never prevents, startup.
+"""
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable
+
+from platform_common.config.settings import get_settings
+from platform_common.logging.logging import get_logger
+from platform_common.pubsub.factory import get_publisher
+from sqlalchemy import text
+
+from app.db.dal.hot_path import (
+    HotPathOrganizationInviteDAL,
+    HotPathUserDAL,
+    HotPathUserSessionDAL,
+)
+from app.db.engine import get_engine
+from app.db.group_commit import get_outbox_writer
+from app.db.replicas import get_replica_pool
+from app.db.unit_of_work import UnitOfWork
+from app.utils.constants import WarmupConstants
+
+logger = get_logger("warmup")
+
+
+async def _maybe_await(value: Any) -> None:
+    if inspect.isawaitable(value):
+        await value
+
+
+async def prefill_pool(connections: int = WarmupConstants.POOL_PREFILL) -> None:
+    engine = get_engine()
+
+    async def open_one() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    # Opened concurrently so they are all checked out at once and the pool
+    # keeps that many; sequential connects would reuse a single one.
+    await asyncio.gather(*(open_one() for _ in range(connections)))
+
+
+async def connect_publisher() -> None:
+    publisher = get_publisher()
+    for method in ("connect", "ping"):
+        call = getattr(publisher, method, None)
+        if callable(call):
+            await _maybe_await(call())
+            return
+
+
+async def warm_hot_lookups(connections: int = WarmupConstants.POOL_PREFILL) -> None:
+    """
+    Run the hot-path lookups once on each pooled connection, so their
+    statements are compiled and prepared (app/db/prepared.py) before the first
+    request needs them. The DALs are called directly: nothing passes through
+    authentication, the metrics middleware or traffic capture, and the units
+    of work roll back.
+    """
+    engine = get_engine()
+
+    async def on_one_connection(i: int) -> None:
+        # Distinct keys, so single-flight doesn't fold them into one query
+        key = f"warmup-{i}"
+        async with UnitOfWork(engine) as uow:
+            users = HotPathUserDAL(uow.session)
+            await users.get_by_id(key)
+            await users.get_by_idp_uid(key)
+            await HotPathUserSessionDAL(uow.session).get_by_refresh_token(key)
+            await HotPathOrganizationInviteDAL(uow.session).get_by_token_hash(key)
+
+    # Concurrently, like prefill_pool, so each lands on its own connection
+    await asyncio.gather(*(on_one_connection(i) for i in range(connections)))
+
+
+async def warm_up() -> dict[str, float]:
+    steps: list[tuple[str, Callable[[], Awaitable[Any]]]] = [
+        ("settings", lambda: asyncio.to_thread(get_settings)),
+        ("db_pool", prefill_pool),
+        ("publisher", connect_publisher),
+        ("hot_lookups", warm_hot_lookups),
+    ]
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    for name, step in steps:
+        step_started = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+        timings[name] = round((time.perf_counter() - step_started) * 1000, 1)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Warm-up finished in {timings['total']}ms: {timings}")
+    return timings
+
+
+async def close_resources() -> None:
+    publisher = get_publisher()
+    for method in ("aclose", "close"):
+        call = getattr(publisher, method, None)
+        if callable(call):
+            try:
+                await _maybe_await(call())
+            except Exception as e:
+                logger.warning(f"Closing publisher failed: {e}")
+            break
+    if get_outbox_writer.cache_info().currsize:
+        await get_outbox_writer().close()
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+    replicas = get_replica_pool() if get_replica_pool.cache_info().currsize else None
+    if replicas is not None:
+        await replicas.dispose()
@@ -0,0 +1,123 @@
+# benchmarks/bench_logging.py
+"""
+Per-request logging cost on the request's thread: the old pattern (eager
+f-strings, every line rendered and written synchronously) versus the queued
+pipeline (app/logs/pipeline.py) with structured kwargs, level filtering and
+health-check sampling.
+
+    python -m benchmarks.bench_logging --requests 20000
+
+Both sides use the same processors and renderer. The "slow" sink sleeps on
+every write, like a stdout pipe whose reader (log driver) is falling behind.
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Any, Callable
+
+import structlog
+from structlog.contextvars import merge_contextvars
+
+from app.logs.pipeline import LogPipeline
+
+
+class SlowSink:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, data: str) -> None:
+        time.sleep(self.delay)
+
+    def flush(self) -> None:
+        pass
+
+
+def make_logger(sink: Any, pipeline: LogPipeline | None) -> Any:
+    processors: list[Any] = [
+        merge_contextvars,
+        structlog.processors.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.JSONRenderer(),
+    ]
+    logger = structlog.wrap_logger(
+        structlog.PrintLogger(sink),
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(20),
+    )
+    if pipeline is not None:
+        pipeline.split(processors)
+        processors[:] = [pipeline]
+    return logger
+
+
+class Session:
+    id = "SES00000000000000000001"
+
+
+class User:
+    id = "USR00000000000000000001"
+    email = "ada@example.com"
+
+
+def before(logger: Any) -> None:
+    # Login + health check as the handlers logged them before this change
+    session, user, is_local = Session(), User(), False
+    logger.info("[C: LoginUserHandler -- F: do_process] ==== START ====")
+    logger.debug(f"[{User}] Firebase token decoded")
+    logger.info(f"Session created: {session.id} for user {user.id}")
+    logger.info(f"is_local: {is_local}")
+    logger.info(f"Access token created for user {user.id}")
+    logger.info("Health check yuh mama!", path="/api/health/")
+
+
+def after(logger: Any) -> None:
+    session, user, is_local = Session(), User(), False
+    logger.debug("Login started")
+    logger.debug("Firebase token decoded")
+    logger.info("Session created", session_id=session.id, user_id=user.id)
+    logger.debug("Cookie mode", is_local=is_local)
+    logger.info("Access token created", user_id=user.id)
+    logger.info("Health check", path="/api/health/")
+
+
+def per_request_us(call: Callable[[], None], requests: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return statistics.median(samples) * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--slow-write-us", type=float, default=200)
+    args = parser.parse_args()
+
+    print(f"{'sink':<8} {'mode':<9} {'p50_us':>8} {'p99_us':>8} {'dropped':>8}")
+    with open(os.devnull, "w") as devnull:
+        sinks = {"devnull": devnull, "slow": SlowSink(args.slow_write_us / 1e6)}
+        for sink_name, sink in sinks.items():
+            requests = args.requests if sink_name == "devnull" else 500
+            for mode in ("before", "after"):
+                pipeline = None
+                if mode == "after":
+                    pipeline = LogPipeline(
+                        sample_rates={"Health check": 0.01}, queue_size=10_000
+                    )
+                    pipeline.start()
+                logger = make_logger(sink, pipeline)
+                pattern = before if mode == "before" else after
+                p50, p99 = per_request_us(lambda: pattern(logger), requests)
+                dropped = 0
+                if pipeline is not None:
+                    pipeline.stop(timeout=0)
+                    dropped = pipeline.dropped["queue_full"]
+                print(f"{sink_name:<8} {mode:<9} {p50:>8.1f} {p99:>8.1f} {dropped:>8}")
+
+
+if __name__ == "__main__":
+    main()
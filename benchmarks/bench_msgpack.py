@@ -0,0 +1,113 @@
+# benchmarks/bench_msgpack.py
+"""
+Encode/decode CPU and payload size of user pages as JSON (the ServiceResponse
+path: `.dict()` per model, then a JSON render) versus MessagePack (cached
+per-model encoder, app/api/msgpack_codec.py).
+
+    python -m benchmarks.bench_msgpack --pages 1,50,500 --iterations 200
+
+Runs offline; the users are synthetic but shaped like the users table.
+"""
+import argparse
+import json
+import statistics
+import time
+import warnings
+from typing import Any, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Field, SQLModel
+
+from app.api.msgpack_codec import packb, unpackb
+
+
+class BenchUser(SQLModel):
+    id: str = Field(primary_key=True)
+    idp_uid: str
+    email: str
+    username: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    organization_id: Optional[str] = None
+    is_verified: bool = False
+    is_active: bool = True
+    created_at: int = 0
+    updated_at: int = 0
+
+
+def make_users(count: int) -> list[BenchUser]:
+    now = int(time.time())
+    return [
+        BenchUser(
+            id=f"USR{i:020d}",
+            idp_uid=f"firebase-uid-{i:012d}",
+            email=f"user{i}@example.com",
+            username=f"user{i}",
+            first_name="Ada",
+            last_name="Lovelace",
+            organization_id="ORG00000000000000000001",
+            is_verified=i % 3 != 0,
+            created_at=now - i,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def envelope(data: Any) -> dict[str, Any]:
+    return {"success": True, "message": "User list retrieved", "data": data}
+
+
+def json_encode(users: list[BenchUser]) -> bytes:
+    with warnings.catch_warnings():
+        # `.dict()` is what the handlers call; pydantic 2 flags it deprecated
+        warnings.simplefilter("ignore", DeprecationWarning)
+        data = [user.dict() for user in users]
+    return json.dumps(
+        jsonable_encoder(envelope(data)),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def msgpack_encode(users: list[BenchUser]) -> bytes:
+    return packb(envelope(users))
+
+
+def per_call_us(call: Callable[[], Any], iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", default="1,50,500", help="users per page")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(
+        f"{'users':>6} {'format':<8} {'encode_us':>10} {'decode_us':>10} "
+        f"{'bytes':>9}"
+    )
+    for size in (int(p) for p in args.pages.split(",")):
+        users = make_users(size)
+        for name, encode, decode in (
+            ("json", json_encode, json.loads),
+            ("msgpack", msgpack_encode, unpackb),
+        ):
+            payload = encode(users)
+            encode_us = per_call_us(lambda: encode(users), args.iterations)
+            decode_us = per_call_us(lambda: decode(payload), args.iterations)
+            print(
+                f"{size:>6} {name:<8} {encode_us:>10.1f} {decode_us:>10.1f} "
+                f"{len(payload):>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
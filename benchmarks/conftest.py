@@ -0,0 +1,31 @@
+# benchmarks/conftest.py
+import asyncio
+from typing import Any, Iterator
+
+import httpx
+import pytest
+
+from benchmarks import fakes
+
+
+@pytest.fixture(scope="session")
+def bench_env() -> Iterator[tuple[Any, fakes.FakeBackend]]:
+    fakes.prevent_firebase_init()
+    from app.main import app
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        backend = fakes.install(app, monkeypatch)
+        yield app, backend
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a fresh loop (no plugin needed)."""
+    return asyncio.run
+
+
+def client_for(app: Any) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    )
@@ -0,0 +1,374 @@
+# benchmarks/fakes.py
+"""
+In-memory stand-ins for the DALs, the Firebase verifier and the pub/sub
+publisher, so handlers can be driven through the ASGI app fully offline.
+
+`install(app, monkeypatch)` wires them in with FastAPI dependency overrides
+and returns the `FakeBackend` holding the data; everything else in app/ runs
+unchanged.
+"""
+import secrets
+import time
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import firebase_admin
+from firebase_admin import auth as firebase_auth
+
+
+def now_epoch() -> int:
+    return int(time.time())
+
+
+class FakeUserDAL:
+    def __init__(self, backend: "FakeBackend"):
+        from platform_common.models.user import User
+
+        self.backend = backend
+        self.model = User
+
+    async def get_by_id(self, id: str) -> Any:
+        return self.backend.users.get(id)
+
+    async def get_by_idp_uid(self, idp_uid: str) -> Any:
+        user_id = self.backend.users_by_idp_uid.get(idp_uid)
+        return self.backend.users.get(user_id) if user_id else None
+
+    async def get_by_email(self, email: str) -> Any:
+        for user in self.backend.users.values():
+            if user.email == email:
+                return user
+        return None
+
+    async def get_list(self, filters: Optional[dict[str, Any]] = None) -> list[Any]:
+        filters = filters or {}
+        return [
+            u
+            for u in self.backend.users.values()
+            if all(str(getattr(u, k, None)) == str(v) for k, v in filters.items())
+        ]
+
+    async def create(self, user: Any) -> Any:
+        if not getattr(user, "id", None):
+            user.id = f"USR{secrets.token_hex(8).upper()}"
+        self.backend.users[user.id] = user
+        self.backend.users_by_idp_uid[user.idp_uid] = user.id
+        return user
+
+    async def update(self, user_id: str, data: dict[str, Any]) -> Any:
+        user = self.backend.users.get(user_id)
+        if user is None:
+            return None
+        for key, value in data.items():
+            setattr(user, key, value)
+        return user
+
+    async def upsert_from_idp(
+        self, idp_uid: str, email: str, username: str, is_verified: bool
+    ) -> Any:
+        user = await self.get_by_idp_uid(idp_uid)
+        if user is None:
+            user = self.model(
+                idp_uid=idp_uid, email=email, username=username, is_verified=is_verified
+            )
+            return await self.create(user), True, False
+        if is_verified and not user.is_verified:
+            user.is_verified = True
+            return user, False, True
+        return user, False, False
+
+    async def soft_delete(self, id: str) -> None:
+        await self.delete(id)
+
+    async def delete(self, user_id: str) -> bool:
+        user = self.backend.users.pop(user_id, None)
+        if user is None:
+            return False
+        self.backend.users_by_idp_uid.pop(user.idp_uid, None)
+        return True
+
+
+class FakeUserSessionDAL:
+    def __init__(self, backend: "FakeBackend"):
+        self.backend = backend
+
+    async def create_session(
+        self,
+        user_id: str,
+        refresh_token: str,
+        expires_at: int,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> Any:
+        session = SimpleNamespace(
+            id=f"SES{secrets.token_hex(8).upper()}",
+            user_id=user_id,
+            refresh_token=refresh_token,
+            expires_at=expires_at,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            revoked_at=None,
+            last_active_at=now_epoch(),
+        )
+        self.backend.sessions[refresh_token] = session
+        return session
+
+    async def get_by_refresh_token(self, refresh_token: str) -> Any:
+        session = self.backend.sessions.get(refresh_token)
+        if session is None or session.revoked_at:
+            return None
+        return session
+
+    async def get_by_refresh_token_including_revoked(self, refresh_token: str) -> Any:
+        return self.backend.sessions.get(refresh_token)
+
+    async def revoke_session(self, session_id: str) -> None:
+        for session in self.backend.sessions.values():
+            if session.id == session_id:
+                session.revoked_at = now_epoch()
+
+    async def revoke_if_live(self, session_id: str) -> bool:
+        for session in self.backend.sessions.values():
+            if session.id == session_id and not session.revoked_at:
+                session.revoked_at = now_epoch()
+                return True
+        return False
+
+    async def revoke_all_for_user(self, user_id: str) -> int:
+        revoked = 0
+        for session in self.backend.sessions.values():
+            if session.user_id == user_id and not session.revoked_at:
+                session.revoked_at = now_epoch()
+                revoked += 1
+        return revoked
+
+    async def update_last_active(self, session_id: str) -> None:
+        for session in self.backend.sessions.values():
+            if session.id == session_id:
+                session.last_active_at = now_epoch()
+
+
+class FakeOrganizationInviteDAL:
+    def __init__(self, backend: "FakeBackend"):
+        self.backend = backend
+
+    async def get_by_token_hash(self, token_hash: str) -> Any:
+        return self.backend.org_invites.get(token_hash)
+
+    async def mark_expired(self, invite: Any) -> None:
+        invite.status = "expired"
+
+    async def accept_with_membership(self, invite: Any, accepted_user_id: str) -> None:
+        invite.status = "accepted"
+        self.backend.memberships.add((accepted_user_id, invite.organization_id))
+
+    async def mark_accepted(self, invite_id: str, accepted_user_id: str) -> None:
+        for invite in self.backend.org_invites.values():
+            if invite.id == invite_id:
+                invite.status = "accepted"
+
+
+class FakeOrganizationMemberDAL:
+    def __init__(self, backend: "FakeBackend"):
+        self.backend = backend
+
+    async def get_active_by_user_and_org(
+        self, user_id: str, organization_id: str
+    ) -> Any:
+        if (user_id, organization_id) in self.backend.memberships:
+            return SimpleNamespace(user_id=user_id, organization_id=organization_id)
+        return None
+
+
+class FakeOrganizationDAL:
+    def __init__(self, backend: "FakeBackend"):
+        self.backend = backend
+
+    async def get_by_id(self, id: str) -> Any:
+        return SimpleNamespace(id=id, name=f"Org {id}")
+
+
+class FakeUserInviteDAL:
+    def __init__(self, backend: "FakeBackend"):
+        self.backend = backend
+
+    async def create_invite(
+        self,
+        email: str,
+        roles: list[str],
+        expiration: int,
+        invited_by: str,
+        idp_uid: Optional[str] = None,
+    ) -> Any:
+        invite = SimpleNamespace(
+            id=f"INV{secrets.token_hex(8).upper()}",
+            token=secrets.token_urlsafe(24),
+            email=email,
+            roles=roles,
+            expiration=expiration,
+            invited_by=invited_by,
+            idp_uid=idp_uid,
+            redeemed=False,
+        )
+        self.backend.user_invites[invite.token] = invite
+        return invite
+
+    async def get_by_token(self, token: str) -> Any:
+        return self.backend.user_invites.get(token)
+
+    async def expire_if_needed(self, invite: Any, now: int) -> Any:
+        return invite if invite.expiration < now else None
+
+    async def redeem(self, invite: Any) -> None:
+        invite.redeemed = True
+
+
+class FakeNotificationOutboxDAL:
+    def __init__(self, backend: "FakeBackend"):
+        self.backend = backend
+
+    async def enqueue(self, **kwargs: Any) -> Any:
+        row = SimpleNamespace(id=f"OBX{len(self.backend.outbox)}", **kwargs)
+        self.backend.outbox.append(row)
+        return row
+
+
+# DAL class name (as declared in platform_common) -> fake implementation
+FAKE_DALS = {
+    "UserDAL": FakeUserDAL,
+    "UserSessionDAL": FakeUserSessionDAL,
+    "OrganizationInviteDAL": FakeOrganizationInviteDAL,
+    "OrganizationMemberDAL": FakeOrganizationMemberDAL,
+    "OrganizationDAL": FakeOrganizationDAL,
+    "UserInviteDAL": FakeUserInviteDAL,
+    "NotificationOutboxDAL": FakeNotificationOutboxDAL,
+}
+
+
+class FakeSession:
+    """Takes the statements handlers run directly on `uow.session`."""
+
+    def __init__(self, backend: "FakeBackend"):
+        self.backend = backend
+
+    async def scalar(self, statement: Any) -> Any:
+        return None
+
+    async def execute(self, statement: Any) -> None:
+        self.backend.statements.append(statement)
+
+
+class FakeUnitOfWork:
+    def __init__(self, backend: "FakeBackend"):
+        self.backend = backend
+        self._dals: dict[type, Any] = {}
+        self.session = FakeSession(backend)
+        self.committed = False
+
+    def get(self, dal_cls: type) -> Any:
+        dal = self._dals.get(dal_cls)
+        if dal is None:
+            # Hot-path subclasses resolve to the fake of their platform DAL.
+            for klass in dal_cls.__mro__:
+                fake = FAKE_DALS.get(klass.__name__)
+                if fake is not None:
+                    dal = self._dals[dal_cls] = fake(self.backend)
+                    break
+            else:
+                raise KeyError(f"No fake DAL for {dal_cls.__name__}")
+        return dal
+
+    async def commit(self) -> None:
+        self.committed = True
+
+    async def rollback(self) -> None:
+        pass
+
+
+class FakePublisher:
+    def __init__(self) -> None:
+        self.published: list[tuple[str, Any]] = []
+
+    async def publish(self, channel: str, event: Any) -> None:
+        self.published.append((channel, event))
+
+
+class FakeBackend:
+    """
+    All fake state in one place. Firebase ID tokens are "fake:<uid>:<email>".
+    """
+
+    def __init__(self) -> None:
+        self.users: dict[str, Any] = {}
+        self.users_by_idp_uid: dict[str, str] = {}
+        self.sessions: dict[str, Any] = {}
+        self.org_invites: dict[str, Any] = {}
+        self.memberships: set[tuple[str, str]] = set()
+        self.user_invites: dict[str, Any] = {}
+        self.outbox: list[Any] = []
+        # Raw statements run on the session, e.g. purge job inserts
+        self.statements: list[Any] = []
+        self.publisher = FakePublisher()
+
+    @staticmethod
+    def id_token(uid: str, email: str) -> str:
+        return f"fake:{uid}:{email}"
+
+    def verify_id_token(self, id_token: str, *args: Any, **kwargs: Any) -> dict:
+        try:
+            _, uid, email = id_token.split(":", 2)
+        except ValueError:
+            raise firebase_auth.InvalidIdTokenError("bad fake token")
+        return {
+            "uid": uid,
+            "email": email,
+            "email_verified": True,
+            "firebase": {"sign_in_provider": "password"},
+        }
+
+    def add_org_invite(self, token: str, email: str, organization_id: str) -> Any:
+        from platform_common.models.organization_invite import OrganizationInvite
+        from platform_common.utils.invite_tokens import hash_invite_token
+
+        invite = SimpleNamespace(
+            id=f"OIN{len(self.org_invites)}",
+            organization_id=organization_id,
+            email=email,
+            role="member",
+            status=OrganizationInvite.Status.PENDING,
+            expires_at=now_epoch() + 3600,
+            token_hash=hash_invite_token(token),
+        )
+        self.org_invites[invite.token_hash] = invite
+        return invite
+
+
+def install(app: Any, monkeypatch: Any) -> FakeBackend:
+    """
+    Wire the fakes into `app`. `monkeypatch` is pytest's fixture (or any
+    object with a compatible `setattr`).
+    """
+    from app.db.unit_of_work import get_read_unit_of_work, get_unit_of_work
+    from app.pubsub.events import user_events
+    from app.utils.constants import GroupCommitConstants
+
+    backend = FakeBackend()
+
+    async def fake_unit_of_work() -> Any:
+        yield FakeUnitOfWork(backend)
+
+    app.dependency_overrides[get_unit_of_work] = fake_unit_of_work
+    app.dependency_overrides[get_read_unit_of_work] = fake_unit_of_work
+    # Registration writes through the DALs rather than the shared batch writer
+    monkeypatch.setattr(GroupCommitConstants, "ENABLED", False)
+    monkeypatch.setattr(firebase_auth, "verify_id_token", backend.verify_id_token)
+    monkeypatch.setattr(user_events, "get_publisher", lambda: backend.publisher)
+    return backend
+
+
+def prevent_firebase_init() -> None:
+    """
+    app.main initialises Firebase at import time; mark the default app as
+    present so no credentials file is needed offline.
+    """
+    firebase_admin._apps.setdefault(firebase_admin._DEFAULT_APP_NAME, object())
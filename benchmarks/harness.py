@@ -0,0 +1,88 @@
+# benchmarks/harness.py
+"""
+Timing and baseline helpers for the handler benchmark suite.
+"""
+import json
+import os
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Allowed slowdown before a run counts as a regression (0.25 = 25%).
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.25"))
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "500"))
+UPDATE_BASELINE = os.getenv("BENCH_UPDATE_BASELINE") == "1"
+
+
+@dataclass
+class BenchResult:
+    ops_per_sec: float
+    p50_ms: float
+    p99_ms: float
+
+    def summary(self, name: str) -> str:
+        return (
+            f"{name:<24} {self.ops_per_sec:>9.0f} ops/s "
+            f"p50={self.p50_ms:>7.3f}ms p99={self.p99_ms:>7.3f}ms"
+        )
+
+
+async def measure(
+    call: Callable[[int], Awaitable[Any]],
+    iterations: int = ITERATIONS,
+    warmup: int = 20,
+) -> BenchResult:
+    for i in range(warmup):
+        await call(i)
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        await call(warmup + i)
+        samples.append(time.perf_counter() - started)
+    ordered = sorted(samples)
+    return BenchResult(
+        ops_per_sec=len(samples) / sum(samples),
+        p50_ms=statistics.median(samples) * 1000,
+        p99_ms=ordered[max(0, int(len(ordered) * 0.99) - 1)] * 1000,
+    )
+
+
+def load_baseline() -> dict[str, dict[str, float]]:
+    if not BASELINE_PATH.exists():
+        return {}
+    data: dict[str, dict[str, float]] = json.loads(BASELINE_PATH.read_text())
+    return data
+
+
+def save_baseline_entry(name: str, result: BenchResult) -> None:
+    baseline = load_baseline()
+    baseline[name] = {k: round(v, 4) for k, v in asdict(result).items()}
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def regression(name: str, result: BenchResult) -> Optional[str]:
+    """
+    Compare against the stored baseline. Returns a description of the
+    regression, or None when within tolerance. A benchmark without a
+    baseline entry fails too: an empty baseline would pass everything.
+    """
+    expected = load_baseline().get(name)
+    if not expected:
+        return (
+            f"no baseline recorded in {BASELINE_PATH.name}; "
+            "run BENCH_UPDATE_BASELINE=1 make bench on the reference machine"
+        )
+    problems = []
+    if result.ops_per_sec < expected["ops_per_sec"] * (1 - TOLERANCE):
+        problems.append(
+            f"ops/s {result.ops_per_sec:.0f} < baseline {expected['ops_per_sec']:.0f}"
+        )
+    if result.p99_ms > expected["p99_ms"] * (1 + TOLERANCE):
+        problems.append(
+            f"p99 {result.p99_ms:.3f}ms > baseline {expected['p99_ms']:.3f}ms"
+        )
+    return "; ".join(problems) or None
@@ -0,0 +1,64 @@
+# benchmarks/load/compare_launchers.py
+"""
+Throughput of the production launcher (python -m app.server) against the
+previous container command (a single `uvicorn app.main:app` process), both
+serving the stubbed app from stub_app.py under the same open-loop load.
+
+    python -m benchmarks.load.compare_launchers --rate 400 --duration 20
+
+Pick a rate above what one process can sustain, otherwise both runs just
+match the offered load. The database is the one in DATABASE_URL.
+"""
+import argparse
+import asyncio
+import signal
+
+from benchmarks.load.run import drive, parse_mix, start_server, wait_ready
+
+
+def run_one(launcher: str, args: argparse.Namespace) -> float:
+    url = f"http://127.0.0.1:{args.port}"
+    server = start_server(None, args.port, launcher)
+    try:
+        wait_ready(url)
+        stats, elapsed = asyncio.run(
+            drive(
+                url,
+                parse_mix(args.mix),
+                args.rate,
+                args.duration,
+                args.users,
+                args.max_in_flight,
+            )
+        )
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    print(f"--- {launcher} ---")
+    print(stats.report(elapsed))
+    completed = sum(len(samples) for samples in stats.latencies.values())
+    return completed / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--rate", type=float, default=400, help="journeys/s")
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--max-in-flight", type=int, default=512)
+    parser.add_argument("--mix", default="login=6,poll=3,register=1")
+    args = parser.parse_args()
+
+    baseline = run_one("uvicorn", args)
+    launcher = run_one("server", args)
+    print(
+        f"requests/s: uvicorn={baseline:.1f} app.server={launcher:.1f} "
+        f"({launcher / baseline if baseline else float('inf'):.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
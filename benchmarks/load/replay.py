@@ -0,0 +1,319 @@
+# benchmarks/load/replay.py
+"""
+Deterministic replay of captured production traffic (app/capture).
+
+Reads a capture (every worker's file plus its rotated predecessors), rebuilds
+each recorded request and sends it at its original offset, or scaled with
+--speed, then reports latency percentiles per route. Requests are rebuilt
+from metadata only: path parameters and query values are synthetic, bodies
+are padded to the recorded size, and bearer/cookie auth uses users created
+up front. The same capture and --seed always produce the same request stream.
+
+By default the app runs in-process with Firebase, GitHub, pub/sub and the
+DALs stubbed (benchmarks.load.stub_app with LOAD_FAKE_DB=1); --url targets a
+running instance instead, normally stub_app under uvicorn.
+
+    python -m benchmarks.load.replay /tmp/capture/traffic.jsonl --speed 2 \\
+        --save after.json
+    python -m benchmarks.load.replay --compare before.json after.json
+
+--compare exits non-zero when a route's p50 or p99 regressed by more than
+BENCH_TOLERANCE (benchmarks/harness.py).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from benchmarks.harness import TOLERANCE
+from benchmarks.load.run import LoadStats
+
+Record = dict[str, Any]
+
+_PARAM = re.compile(r"\{(\w+)(?::\w+)?\}")
+
+
+def _with_rotated(current: Path) -> list[Path]:
+    """Oldest first: traffic.jsonl.N ... traffic.jsonl.1, traffic.jsonl."""
+    rotated = sorted(
+        (p for p in current.parent.glob(f"{current.name}.*") if p.suffix[1:].isdigit()),
+        key=lambda p: int(p.suffix[1:]),
+        reverse=True,
+    )
+    return rotated + ([current] if current.exists() else [])
+
+
+def capture_files(path: str) -> list[Path]:
+    """
+    The files of every worker (traffic.<pid>.jsonl, see app/capture/recorder.py)
+    for the capture at `path`, each with its rotated predecessors.
+    """
+    base = Path(path)
+    workers = sorted(
+        p
+        for p in base.parent.glob(f"{base.stem}.*{base.suffix}")
+        if p.name[len(base.stem) + 1 : -len(base.suffix) or None].isdigit()
+    )
+    files = []
+    for current in [base, *workers]:
+        files.extend(_with_rotated(current))
+    return files
+
+
+def load_records(path: str) -> list[Record]:
+    records = []
+    for file in capture_files(path):
+        with open(file) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if record.get("r", "unmatched") != "unmatched":
+                    records.append(record)
+    records.sort(key=lambda r: r["t"])
+    return records
+
+
+def schedule(records: list[Record], speed: float = 1.0) -> list[tuple[float, Record]]:
+    """Offsets (seconds from the first request) at the replay speed."""
+    if not records:
+        return []
+    start = records[0]["t"]
+    return [((r["t"] - start) / speed, r) for r in records]
+
+
+@dataclass
+class Identity:
+    uid: str
+    email: str
+    user_id: Optional[str] = None
+    cookie: str = ""
+
+    @property
+    def bearer(self) -> str:
+        # Token format understood by the stubbed verifier (benchmarks/fakes.py)
+        return f"Bearer fake:{self.uid}:{self.email}"
+
+
+class RequestBuilder:
+    """Rebuilds requests from records; a fixed seed gives a fixed stream."""
+
+    def __init__(self, identities: list[Identity], seed: int = 0):
+        self.identities = identities
+        self.random = random.Random(seed)
+
+    def build(self, record: Record) -> tuple[str, str, dict[str, Any]]:
+        identity = self.random.choice(self.identities)
+        url = _PARAM.sub(lambda m: self._value(m.group(1), identity), record["r"])
+        kwargs: dict[str, Any] = {
+            "params": {key: self._value(key, identity) for key in record.get("q", [])}
+        }
+        headers = {}
+        if record.get("a") == "bearer":
+            headers["authorization"] = identity.bearer
+        elif record.get("a") == "cookie" and identity.cookie:
+            headers["cookie"] = identity.cookie
+        size = record.get("b", 0)
+        if size and record["m"] not in ("GET", "HEAD"):
+            headers["content-type"] = "application/json"
+            kwargs["content"] = _padded_json(size)
+        kwargs["headers"] = headers
+        return record["m"], url, kwargs
+
+    def _value(self, name: str, identity: Identity) -> str:
+        if name == "id" or name.endswith("_id"):
+            return identity.user_id or "USRREPLAY"
+        return f"replay{self.random.randrange(1_000_000)}"
+
+
+def _padded_json(size: int) -> bytes:
+    body = json.dumps({"pad": ""}).encode()
+    return json.dumps({"pad": "x" * max(size - len(body), 0)}).encode()
+
+
+async def prepare_identities(client: httpx.AsyncClient, count: int) -> list[Identity]:
+    """Log each replay user in once so cookie-authenticated routes work."""
+    identities = [
+        Identity(f"replay-{i}", f"replay-{i}@example.com") for i in range(count)
+    ]
+    for identity in identities:
+        try:
+            response = await client.get(
+                "/api/auth/exchange", headers={"authorization": identity.bearer}
+            )
+        except httpx.HTTPError:
+            continue
+        identity.cookie = "; ".join(f"{k}={v}" for k, v in response.cookies.items())
+        if response.status_code == 200:
+            user = response.json().get("data", {}).get("user", {})
+            identity.user_id = user.get("id")
+    return identities
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    records: list[Record],
+    speed: float,
+    builder: RequestBuilder,
+    max_in_flight: int,
+) -> tuple[LoadStats, float]:
+    stats = LoadStats()
+    in_flight: set[asyncio.Task[Any]] = set()
+    started = time.perf_counter()
+    for offset, record in schedule(records, speed):
+        # Built in capture order even when sends are skipped, so the stream
+        # stays the same for a given seed.
+        method, url, kwargs = builder.build(record)
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            # Open-loop: never queue behind a slow server, count instead.
+            stats.dropped += 1
+            continue
+        task = asyncio.create_task(
+            stats.request(
+                f"{record['m']} {record['r']}",
+                client,
+                method,
+                url,
+                expect=(record.get("s", 200),),
+                **kwargs,
+            )
+        )
+        stats.journeys += 1
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.wait(in_flight)
+    return stats, time.perf_counter() - started
+
+
+def summarize(stats: LoadStats) -> dict[str, dict[str, float]]:
+    summary = {}
+    for name, latencies in stats.latencies.items():
+        samples = sorted(latencies)
+        if not samples:
+            continue
+
+        def pct(p: float) -> float:
+            return round(
+                samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 3
+            )
+
+        summary[name] = {
+            "count": len(samples),
+            "p50_ms": round(statistics.median(samples) * 1000, 3),
+            "p90_ms": pct(0.90),
+            "p99_ms": pct(0.99),
+            "errors": stats.errors.get(name, 0),
+        }
+    return summary
+
+
+def compare(
+    before: dict[str, dict[str, float]],
+    after: dict[str, dict[str, float]],
+    tolerance: float = TOLERANCE,
+) -> tuple[list[str], bool]:
+    """Per-route percentile deltas; True when any route regressed."""
+    lines = [
+        f"{'route':<44}{'p50 before':>11}{'after':>9}{'p99 before':>11}"
+        f"{'after':>9}  change"
+    ]
+    regressed = False
+    for name in sorted(set(before) | set(after)):
+        old, new = before.get(name), after.get(name)
+        if old is None or new is None:
+            lines.append(
+                f"{name:<44}{'only in ' + ('after' if old is None else 'before'):>49}"
+            )
+            continue
+        changes = []
+        for key in ("p50_ms", "p99_ms"):
+            if old[key] and new[key] > old[key] * (1 + tolerance):
+                changes.append(f"{key[:3]} +{(new[key] / old[key] - 1) * 100:.0f}%")
+        regressed = regressed or bool(changes)
+        lines.append(
+            f"{name:<44}{old['p50_ms']:>11.2f}{new['p50_ms']:>9.2f}"
+            f"{old['p99_ms']:>11.2f}{new['p99_ms']:>9.2f}  "
+            f"{', '.join(changes) or 'ok'}"
+        )
+    return lines, regressed
+
+
+def _in_process_client() -> httpx.AsyncClient:
+    os.environ.setdefault("LOAD_FAKE_DB", "1")
+    from benchmarks.load.stub_app import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=30
+    )
+
+
+async def _run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    records = load_records(args.capture)
+    if args.limit:
+        records = records[: args.limit]
+    if not records:
+        raise SystemExit(f"No replayable records in {args.capture}")
+    if args.url:
+        limits = httpx.Limits(max_connections=args.max_in_flight)
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30)
+    else:
+        client = _in_process_client()
+    async with client:
+        identities = await prepare_identities(client, args.users)
+        builder = RequestBuilder(identities, args.seed)
+        stats, elapsed = await replay(
+            client, records, args.speed, builder, args.max_in_flight
+        )
+    print(stats.report(elapsed))
+    return summarize(stats)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "capture", nargs="?", help="Capture file (TRAFFIC_CAPTURE_PATH)"
+    )
+    parser.add_argument("--url", help="Target a running instance instead")
+    parser.add_argument("--speed", type=float, default=1.0, help="Rate multiplier")
+    parser.add_argument("--limit", type=int, help="Replay only the first N records")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-in-flight", type=int, default=512)
+    parser.add_argument("--save", help="Write the latency summary to this file")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare summaries"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        before, after = (json.loads(Path(p).read_text()) for p in args.compare)
+        lines, regressed = compare(before, after)
+        print("\n".join(lines))
+        sys.exit(1 if regressed else 0)
+    if not args.capture:
+        parser.error("a capture file is required unless --compare is given")
+
+    summary = asyncio.run(_run(args))
+    if args.save:
+        Path(args.save).write_text(json.dumps(summary, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
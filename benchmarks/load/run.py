@@ -0,0 +1,289 @@
+# benchmarks/load/run.py
+"""
+Multi-worker load generator for the login -> session -> user-read journey.
+
+Starts `benchmarks.load.stub_app` under uvicorn with several workers (Firebase,
+GitHub and pub/sub stubbed locally; see stub_app.py), replays a weighted mix
+of scripted journeys at a fixed arrival rate and reports throughput and
+latency percentiles per endpoint. Runs fully offline; the database is the
+one in DATABASE_URL (use a local Postgres), or in-memory with LOAD_FAKE_DB=1
+and --workers 1.
+
+    python -m benchmarks.load.run --workers 4 --rate 200 --duration 30 \\
+        --mix login=6,poll=3,register=1,github=1
+
+Use --url to target an already running instance instead of starting one.
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+Journey = Callable[["LoadStats", httpx.AsyncClient, int], Awaitable[None]]
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.journeys = 0
+        self.dropped = 0
+
+    async def request(
+        self,
+        name: str,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        expect: tuple[int, ...] = (200,),
+        **kwargs: Any,
+    ) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - started)
+        if response.status_code not in expect:
+            self.errors[name] += 1
+        return response
+
+    def report(self, elapsed: float) -> str:
+        lines = [
+            f"journeys={self.journeys} dropped={self.dropped} "
+            f"elapsed={elapsed:.1f}s",
+            f"{'endpoint':<22}{'count':>8}{'rps':>9}{'p50ms':>9}{'p90ms':>9}"
+            f"{'p99ms':>9}{'maxms':>9}{'errors':>8}",
+        ]
+        for name in sorted(self.latencies):
+            samples = sorted(self.latencies[name])
+            if not samples:
+                continue
+
+            def pct(p: float) -> float:
+                return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+            lines.append(
+                f"{name:<22}{len(samples):>8}{len(samples) / elapsed:>9.1f}"
+                f"{statistics.median(samples) * 1000:>9.2f}{pct(0.90):>9.2f}"
+                f"{pct(0.99):>9.2f}{samples[-1] * 1000:>9.2f}"
+                f"{self.errors[name]:>8}"
+            )
+        return "\n".join(lines)
+
+
+def _bearer(uid: int) -> dict[str, str]:
+    # Token format understood by the stubbed verifier (benchmarks/fakes.py).
+    return {"authorization": f"Bearer fake:load-{uid}:load-{uid}@example.com"}
+
+
+def _cookie_header(response: Optional[httpx.Response]) -> dict[str, str]:
+    if response is None:
+        return {}
+    cookies = "; ".join(f"{k}={v}" for k, v in response.cookies.items())
+    return {"cookie": cookies} if cookies else {}
+
+
+async def login_journey(stats: LoadStats, client: httpx.AsyncClient, uid: int) -> None:
+    exchange = await stats.request(
+        "auth_exchange", client, "GET", "/api/auth/exchange", headers=_bearer(uid)
+    )
+    cookies = _cookie_header(exchange)
+    session = await stats.request(
+        "auth_session", client, "GET", "/api/auth/session", headers=cookies
+    )
+    if session is None or session.status_code != 200:
+        return
+    user_id = session.json().get("data", {}).get("user", {}).get("id")
+    await stats.request(
+        "user_get", client, "GET", "/api/user/", params={"id": user_id}, headers=cookies
+    )
+
+
+async def poll_journey(stats: LoadStats, client: httpx.AsyncClient, uid: int) -> None:
+    login = await stats.request(
+        "login", client, "POST", "/api/user/action/login", headers=_bearer(uid)
+    )
+    cookies = _cookie_header(login)
+    for _ in range(3):
+        await stats.request(
+            "auth_session", client, "GET", "/api/auth/session", headers=cookies
+        )
+
+
+async def register_journey(
+    stats: LoadStats, client: httpx.AsyncClient, uid: int
+) -> None:
+    await stats.request(
+        "register",
+        client,
+        "GET",
+        "/api/user/action/register",
+        expect=(201,),
+        headers=_bearer(uid),
+    )
+
+
+async def github_journey(stats: LoadStats, client: httpx.AsyncClient, uid: int) -> None:
+    login = await stats.request(
+        "github_login", client, "GET", "/api/idp/github/login", expect=(307,)
+    )
+    if login is None or "location" not in login.headers:
+        return
+    # Read the state from the redirect URL and send back the cookie the
+    # route is meant to set (its first "-" separated part).
+    state = httpx.URL(login.headers["location"]).params.get("state", "")
+    await stats.request(
+        "github_callback",
+        client,
+        "GET",
+        "/api/idp/github/callback",
+        params={"code": "load", "state": state},
+        headers={"cookie": f"github_oauth_state={state.split('-')[0]}"},
+    )
+
+
+JOURNEYS: dict[str, Journey] = {
+    "login": login_journey,
+    "poll": poll_journey,
+    "register": register_journey,
+    "github": github_journey,
+}
+
+
+def parse_mix(spec: str) -> list[tuple[Journey, float]]:
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in JOURNEYS:
+            raise SystemExit(f"Unknown journey {name!r}; choose from {list(JOURNEYS)}")
+        mix.append((JOURNEYS[name], float(weight or 1)))
+    return mix
+
+
+async def drive(
+    url: str,
+    mix: list[tuple[Journey, float]],
+    rate: float,
+    duration: float,
+    users: int,
+    max_in_flight: int,
+) -> tuple[LoadStats, float]:
+    stats = LoadStats()
+    journeys, weights = zip(*mix)
+    limits = httpx.Limits(max_connections=max_in_flight)
+    in_flight: set[asyncio.Task[None]] = set()
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        # Warm the user pool so login/poll journeys find existing users.
+        await asyncio.gather(
+            *(login_journey(LoadStats(), client, uid) for uid in range(users))
+        )
+
+        started = time.perf_counter()
+        interval = 1.0 / rate
+        next_at = started
+        while (now := time.perf_counter()) - started < duration:
+            if now < next_at:
+                await asyncio.sleep(next_at - now)
+            next_at += interval
+            if len(in_flight) >= max_in_flight:
+                # Open-loop: never queue behind a slow server, count instead.
+                stats.dropped += 1
+                continue
+            journey = random.choices(journeys, weights)[0]
+            task = asyncio.create_task(journey(stats, client, random.randrange(users)))
+            stats.journeys += 1
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.wait(in_flight)
+        elapsed = time.perf_counter() - started
+    return stats, elapsed
+
+
+STUB_APP = "benchmarks.load.stub_app:app"
+
+
+def start_server(
+    workers: Optional[int], port: int, launcher: str = "uvicorn"
+) -> subprocess.Popen[bytes]:
+    """
+    launcher="uvicorn" is the plain uvicorn command (one process unless
+    `workers` is given); "server" is the production launcher, app/server.py,
+    which sizes workers itself when `workers` is None.
+    """
+    if launcher == "server":
+        command = ["-m", "app.server", "--app", STUB_APP, "--host", "127.0.0.1"]
+    else:
+        command = ["-m", "uvicorn", STUB_APP, "--host", "127.0.0.1"]
+        command += ["--log-level", "warning"]
+    command += ["--port", str(port)]
+    if workers:
+        command += ["--workers", str(workers)]
+    return subprocess.Popen([sys.executable, *command], env=os.environ.copy())
+
+
+def wait_ready(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/api/health/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise SystemExit(f"Server at {url} did not become ready in {timeout}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--url", help="Target a running instance instead")
+    parser.add_argument("--launcher", choices=("uvicorn", "server"), default="uvicorn")
+    parser.add_argument("--rate", type=float, default=100, help="journeys/s")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--max-in-flight", type=int, default=512)
+    parser.add_argument("--mix", default="login=6,poll=3,register=1")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args.workers, args.port, args.launcher)
+    try:
+        wait_ready(url)
+        stats, elapsed = asyncio.run(
+            drive(
+                url,
+                parse_mix(args.mix),
+                args.rate,
+                args.duration,
+                args.users,
+                args.max_in_flight,
+            )
+        )
+        print(stats.report(elapsed))
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
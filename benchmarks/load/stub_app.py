@@ -0,0 +1,92 @@
+# benchmarks/load/stub_app.py
+"""
+ASGI entrypoint for load tests: the real app with Firebase, GitHub and the
+pub/sub broker replaced by local fakes. Each uvicorn worker imports this
+module and installs the stubs in its own process.
+
+    uvicorn benchmarks.load.stub_app:app --workers 4
+
+Stub latencies (milliseconds) come from the environment:
+    LOAD_FIREBASE_LATENCY_MS  (default 2)  - blocking, like the real verify
+    LOAD_GITHUB_LATENCY_MS    (default 50)
+    LOAD_PUBSUB_LATENCY_MS    (default 1)
+LOAD_FAKE_DB=1 also swaps the database for in-memory DALs. That state is per
+worker, so only use it with a single worker.
+"""
+import asyncio
+import os
+import time
+from typing import Any
+
+import httpx
+from firebase_admin import auth as firebase_auth
+
+from benchmarks import fakes
+
+FIREBASE_LATENCY = float(os.getenv("LOAD_FIREBASE_LATENCY_MS", "2")) / 1000
+GITHUB_LATENCY = float(os.getenv("LOAD_GITHUB_LATENCY_MS", "50")) / 1000
+PUBSUB_LATENCY = float(os.getenv("LOAD_PUBSUB_LATENCY_MS", "1")) / 1000
+FAKE_DB = os.getenv("LOAD_FAKE_DB") == "1"
+
+
+class _Patcher:
+    """Minimal monkeypatch stand-in; stubs live for the whole process."""
+
+    def setattr(self, target: Any, name: str, value: Any) -> None:
+        setattr(target, name, value)
+
+
+class SlowPublisher:
+    def __init__(self) -> None:
+        # Only count; keeping every event would grow without bound.
+        self.published = 0
+
+    async def publish(self, channel: str, event: Any) -> None:
+        await asyncio.sleep(PUBSUB_LATENCY)
+        self.published += 1
+
+
+async def _github_handler(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(GITHUB_LATENCY)
+    if request.url.path == "/login/oauth/access_token":
+        return httpx.Response(200, json={"access_token": "gho_load_test"})
+    if request.url.path == "/user/emails":
+        return httpx.Response(
+            200,
+            json=[{"email": "gh@example.com", "primary": True, "verified": True}],
+        )
+    return httpx.Response(404)
+
+
+_RealAsyncClient = httpx.AsyncClient
+
+
+def _github_client(*args: Any, **kwargs: Any) -> httpx.AsyncClient:
+    kwargs["transport"] = httpx.MockTransport(_github_handler)
+    return _RealAsyncClient(*args, **kwargs)
+
+
+def _build_app() -> Any:
+    fakes.prevent_firebase_init()
+
+    from app.main import app
+    from app.pubsub.events import user_events
+    from app.utils import github_oauth
+
+    patcher = _Patcher()
+    backend = fakes.FakeBackend()
+    publisher = SlowPublisher()
+
+    def verify_id_token(id_token: str, *args: Any, **kwargs: Any) -> dict:
+        time.sleep(FIREBASE_LATENCY)
+        return backend.verify_id_token(id_token)
+
+    if FAKE_DB:
+        fakes.install(app, patcher)
+    patcher.setattr(firebase_auth, "verify_id_token", verify_id_token)
+    patcher.setattr(user_events, "get_publisher", lambda: publisher)
+    patcher.setattr(github_oauth.httpx, "AsyncClient", _github_client)
+    return app
+
+
+app = _build_app()
@@ -0,0 +1,164 @@
+# benchmarks/test_handler_benchmarks.py
+"""
+Per-endpoint micro-benchmarks, driven in process through the ASGI app with
+fake DALs, Firebase and publisher (see benchmarks/fakes.py).
+
+    make bench                       # compare against benchmarks/baseline.json
+    BENCH_UPDATE_BASELINE=1 make bench   # record a new baseline
+
+A scenario with no baseline entry fails; record one on the machine that
+runs the comparison, since timings don't transfer between machines.
+"""
+from typing import Any, Awaitable, Callable
+
+import httpx
+import pytest
+from platform_common.auth.jwt_utils import create_jwt
+from platform_common.models.user import User
+
+from benchmarks.conftest import client_for
+from benchmarks.fakes import FakeBackend, FakeUserDAL, FakeUserInviteDAL
+from benchmarks.harness import (
+    UPDATE_BASELINE,
+    measure,
+    regression,
+    save_baseline_entry,
+)
+
+Scenario = Callable[[httpx.AsyncClient, FakeBackend, int], Awaitable[httpx.Response]]
+
+EMAIL = "bench@example.com"
+UID = "bench-uid"
+
+
+def _bearer(backend: FakeBackend, uid: str = UID, email: str = EMAIL) -> dict:
+    return {"authorization": f"Bearer {backend.id_token(uid, email)}"}
+
+
+async def _seed_user(client: httpx.AsyncClient, backend: FakeBackend) -> Any:
+    response = await client.get("/api/auth/exchange", headers=_bearer(backend))
+    assert response.status_code == 200, response.text
+    user = next(iter(backend.users.values()))
+    token = create_jwt(payload={"sub": user.id}, expires_in=3600)
+    client.cookies.set("access_token", token)
+    client.cookies.set("refresh_token", response.cookies["refresh_token"])
+    return user
+
+
+async def health(client, backend, i):
+    return await client.get("/api/health/")
+
+
+async def auth_exchange(client, backend, i):
+    return await client.get("/api/auth/exchange", headers=_bearer(backend))
+
+
+async def auth_session(client, backend, i):
+    return await client.get("/api/auth/session")
+
+
+async def login(client, backend, i):
+    return await client.post("/api/user/action/login", headers=_bearer(backend))
+
+
+async def register(client, backend, i):
+    return await client.get(
+        "/api/user/action/register",
+        headers=_bearer(backend, f"reg-{i}", f"reg-{i}@example.com"),
+    )
+
+
+async def verify_account(client, backend, i):
+    invite = await _invite(backend, f"verify-{i}")
+    return await client.get(
+        "/api/user/action/verify-account", params={"token": invite.token}
+    )
+
+
+async def validate_team_invite(client, backend, i):
+    token = f"team-invite-{i % 50}"
+    if not backend.org_invites:
+        for n in range(50):
+            backend.add_org_invite(f"team-invite-{n}", EMAIL, "ORG1")
+    return await client.get(
+        "/api/user/action/validate-team-invite", params={"token": token}
+    )
+
+
+async def user_get(client, backend, i):
+    user = next(iter(backend.users.values()))
+    return await client.get("/api/user/", params={"id": user.id})
+
+
+async def user_list(client, backend, i):
+    return await client.get("/api/user/list")
+
+
+async def user_create(client, backend, i):
+    return await client.post(
+        "/api/user/",
+        json={"email": f"c{i}@example.com", "username": f"c{i}", "idp_uid": f"c{i}"},
+    )
+
+
+async def user_update(client, backend, i):
+    user = next(iter(backend.users.values()))
+    return await client.put(f"/api/user/{user.id}", json={"username": f"u{i}"})
+
+
+async def user_delete(client, backend, i):
+    user = await FakeUserDAL(backend).create(
+        User(email=f"d{i}@example.com", username=f"d{i}", idp_uid=f"d{i}")
+    )
+    return await client.delete(f"/api/user/{user.id}")
+
+
+async def _invite(backend: FakeBackend, uid: str) -> Any:
+    return await FakeUserInviteDAL(backend).create_invite(
+        email=f"{uid}@example.com",
+        roles=[],
+        expiration=2**31,
+        invited_by="bench",
+        idp_uid=uid,
+    )
+
+
+SCENARIOS: dict[str, tuple[Scenario, int]] = {
+    "health": (health, 200),
+    "auth_exchange": (auth_exchange, 200),
+    "auth_session": (auth_session, 200),
+    "login": (login, 200),
+    "register": (register, 201),
+    "verify_account": (verify_account, 200),
+    "validate_team_invite": (validate_team_invite, 200),
+    "user_get": (user_get, 200),
+    "user_list": (user_list, 200),
+    "user_create": (user_create, 201),
+    "user_update": (user_update, 200),
+    "user_delete": (user_delete, 200),
+}
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_endpoint_benchmark(name, bench_env, run):
+    app, backend = bench_env
+    scenario, expected_status = SCENARIOS[name]
+
+    async def go():
+        async with client_for(app) as client:
+            await _seed_user(client, backend)
+
+            async def call(i: int) -> None:
+                response = await scenario(client, backend, i)
+                assert response.status_code == expected_status, response.text
+
+            return await measure(call)
+
+    result = run(go())
+    print("\n" + result.summary(name))
+
+    if UPDATE_BASELINE:
+        save_baseline_entry(name, result)
+        return
+    problem = regression(name, result)
+    assert problem is None, f"{name} regressed: {problem}"
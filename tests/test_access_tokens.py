@@ -0,0 +1,48 @@
+# tests/test_access_tokens.py
+import time
+
+import jwt
+from starlette.requests import Request
+
+from app.auth.access_tokens import (
+    decode_access_token,
+    read_access_token,
+    seconds_remaining,
+)
+
+KEY = "test-secret"
+
+
+def _token(**claims):
+    payload = {"sub": "u1", "session_id": "s1", "exp": int(time.time()) + 900}
+    payload.update(claims)
+    return jwt.encode(payload, KEY, algorithm="HS256")
+
+
+def _request(headers):
+    raw = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+
+def test_valid_token_is_decoded_locally():
+    claims = decode_access_token(_token(), KEY, ("HS256",))
+
+    assert claims["sub"] == "u1" and claims["session_id"] == "s1"
+    assert 890 < seconds_remaining(claims, time.time()) <= 900
+
+
+def test_expired_tampered_or_incomplete_tokens_are_rejected():
+    assert (
+        decode_access_token(_token(exp=int(time.time()) - 1), KEY, ("HS256",)) is None
+    )
+    assert decode_access_token(_token(), "other-secret", ("HS256",)) is None
+    assert decode_access_token(_token(session_id=None), KEY, ("HS256",)) is None
+    assert decode_access_token("not-a-jwt", KEY, ("HS256",)) is None
+    # algorithm confusion: only the configured algorithms are accepted
+    assert decode_access_token(_token(), KEY, ("HS512",)) is None
+
+
+def test_token_read_from_cookie_then_bearer_header():
+    assert read_access_token(_request({"cookie": "access_token=abc"})) == "abc"
+    assert read_access_token(_request({"authorization": "Bearer xyz"})) == "xyz"
+    assert read_access_token(_request({"authorization": "Basic xyz"})) is None
@@ -0,0 +1,163 @@
+# tests/test_graphql.py
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.graphql.loaders import BatchLoaders
+from app.graphql.schema import schema
+
+metadata = MetaData()
+users = Table(
+    "users",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("email", String),
+    Column("username", String),
+)
+sessions = Table(
+    "user_sessions",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String),
+    Column("refresh_token", String),
+    Column("created_at", Integer),
+    Column("revoked_at", Integer, nullable=True),
+)
+memberships = Table(
+    "organization_members",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String),
+    Column("organization_id", String),
+    Column("role", String),
+)
+
+QUERY = """
+{
+  organizationMembers(organizationId: "o1") {
+    role
+    user {
+      email
+      sessions { id }
+      memberships { organizationId user { username } }
+    }
+  }
+}
+"""
+
+
+async def _execute(query: str, viewer_id="u1", variables=None):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(
+            users.insert(),
+            [dict(id=f"u{i}", email=f"u{i}@x.io", username=f"u{i}") for i in (1, 2, 3)],
+        )
+        await conn.execute(
+            sessions.insert(),
+            [
+                dict(id="s1", user_id="u1", created_at=1, revoked_at=None),
+                dict(id="s2", user_id="u1", created_at=2, revoked_at=None),
+                dict(id="s3", user_id="u2", created_at=3, revoked_at=5),
+            ],
+        )
+        await conn.execute(
+            memberships.insert(),
+            [
+                dict(id="m1", user_id="u1", organization_id="o1", role="admin"),
+                dict(id="m2", user_id="u2", organization_id="o1", role="member"),
+                dict(id="m3", user_id="u1", organization_id="o2", role="member"),
+            ],
+        )
+
+    statements: list[str] = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    async with AsyncSession(engine) as session:
+        loaders = BatchLoaders(session, users, sessions, memberships)
+        result = await schema.execute(
+            query,
+            variable_values=variables,
+            context_value=SimpleNamespace(loaders=loaders, viewer_id=viewer_id),
+        )
+    await engine.dispose()
+    return result, statements
+
+
+def test_nested_relations_are_batched_into_one_query_each():
+    result, statements = asyncio.run(_execute(QUERY))
+
+    assert result.errors is None
+    members = result.data["organizationMembers"]
+    assert [m["user"]["email"] for m in members] == ["u1@x.io", "u2@x.io"]
+    # newest first, revoked sessions hidden, no refresh token in the schema
+    assert members[0]["user"]["sessions"] == [{"id": "s2"}, {"id": "s1"}]
+    assert members[1]["user"]["sessions"] == []
+    assert [m["organizationId"] for m in members[0]["user"]["memberships"]] == [
+        "o1",
+        "o2",
+    ]
+    # the viewer's memberships, memberships by org, users, sessions, the other
+    # member's memberships; users reached again through memberships come from
+    # the loader cache
+    assert len(statements) == 5
+
+
+def test_depth_and_complexity_limits_reject_before_any_query():
+    too_deep = """
+    { user(id: "u1") { memberships { user { memberships { user {
+        memberships { user { id } } } } } } } }
+    """
+    result, statements = asyncio.run(_execute(too_deep))
+    assert result.errors and "maximum operation depth" in result.errors[0].message
+    assert statements == []
+
+    too_costly = """
+    { users(ids: ["u1", "u2"]) {
+        sessions(limit: 100) { id }
+        memberships(limit: 100) { user { sessions(limit: 100) { id } } } } }
+    """
+    result, statements = asyncio.run(_execute(too_costly))
+    assert result.errors and "complexity" in result.errors[0].message
+    assert statements == []
+
+
+def test_callers_only_see_their_own_sessions_and_organizations():
+    query = """
+    {
+      user(id: "u1") { sessions { id } memberships { organizationId } }
+      o2: organizationMembers(organizationId: "o2") { userId }
+      o1: organizationMembers(organizationId: "o1") { userId }
+    }
+    """
+    result, _ = asyncio.run(_execute(query, viewer_id="u2"))
+
+    assert result.errors is None
+    assert result.data["user"] == {
+        "sessions": [],
+        "memberships": [{"organizationId": "o1"}],
+    }
+    assert result.data["o2"] == []
+    assert [m["userId"] for m in result.data["o1"]] == ["u1", "u2"]
+
+    anonymous, _ = asyncio.run(_execute(query, viewer_id=None))
+    assert anonymous.data["user"] == {"sessions": [], "memberships": []}
+    assert anonymous.data["o1"] == []
+
+
+def test_variable_lists_are_priced_at_the_maximum_size():
+    query = """
+    query ($ids: [ID!]!) {
+      users(ids: $ids) { memberships { user { sessions { id } } } }
+    }
+    """
+    result, statements = asyncio.run(_execute(query, variables={"ids": ["u1"]}))
+
+    assert result.errors and "complexity" in result.errors[0].message
+    assert statements == []
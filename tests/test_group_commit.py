@@ -0,0 +1,133 @@
+# tests/test_group_commit.py
+import asyncio
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, event, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.group_commit import GroupCommitter, GroupWrite
+
+metadata = MetaData()
+invites = Table(
+    "invites",
+    metadata,
+    Column("id", String(32), primary_key=True),
+    Column("email", String(128), nullable=False),
+)
+outbox = Table(
+    "outbox",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("idempotency_key", String(128), unique=True, nullable=False),
+    Column("aggregate_id", String(32)),
+)
+
+
+def _registration(n, key=None):
+    return [
+        GroupWrite(invites, {"id": f"I{n}", "email": f"u{n}@example.com"}),
+        GroupWrite(
+            outbox,
+            {"id": n, "idempotency_key": key or f"email:I{n}", "aggregate_id": f"I{n}"},
+            conflict=("idempotency_key",),
+        ),
+    ]
+
+
+async def _engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    commits = []
+    event.listen(engine.sync_engine, "commit", lambda conn: commits.append(1))
+    return engine, commits
+
+
+def test_concurrent_submissions_share_one_transaction():
+    async def run():
+        engine, commits = await _engine()
+        commits.clear()
+        writer = GroupCommitter(engine, "test", window=0.01, max_rows=100)
+        results = await asyncio.gather(
+            *(writer.submit(_registration(n)) for n in range(5))
+        )
+        async with engine.connect() as conn:
+            rows = (await conn.execute(select(outbox.c.aggregate_id))).scalars().all()
+        await engine.dispose()
+        return len(commits), results, rows
+
+    commits, results, rows = asyncio.run(run())
+
+    assert commits == 1
+    assert sorted(rows) == [f"I{n}" for n in range(5)]
+    for n, (invite, notification) in enumerate(results):
+        assert invite.row["id"] == f"I{n}" and invite.inserted
+        assert notification.row["aggregate_id"] == f"I{n}" and notification.inserted
+
+
+def test_conflicting_idempotency_keys_return_the_stored_row():
+    async def run():
+        engine, _ = await _engine()
+        async with engine.begin() as conn:
+            await conn.execute(
+                outbox.insert(),
+                {"id": 99, "idempotency_key": "dup", "aggregate_id": "old"},
+            )
+        writer = GroupCommitter(engine, "test", window=0.01)
+        results = await asyncio.gather(
+            writer.submit(_registration(1, key="dup")),
+            writer.submit(_registration(2, key="fresh")),
+            writer.submit(_registration(3, key="fresh")),
+        )
+        await engine.dispose()
+        return [notification for _, notification in results]
+
+    old, first, repeat = asyncio.run(run())
+
+    assert old.row["id"] == 99 and not old.inserted
+    assert first.row["id"] == 2 and first.inserted
+    assert repeat.row["id"] == 2 and not repeat.inserted
+
+
+def test_a_failing_submission_only_fails_its_caller():
+    async def run():
+        engine, _ = await _engine()
+        writer = GroupCommitter(engine, "test", window=0.01)
+        bad = [GroupWrite(invites, {"id": "X", "email": None})]
+        results = await asyncio.gather(
+            writer.submit(_registration(1)),
+            writer.submit(bad),
+            writer.submit(_registration(2)),
+            return_exceptions=True,
+        )
+        async with engine.connect() as conn:
+            ids = (await conn.execute(select(invites.c.id))).scalars().all()
+        await engine.dispose()
+        return results, ids
+
+    results, ids = asyncio.run(run())
+
+    assert isinstance(results[1], Exception)
+    assert not isinstance(results[0], Exception)
+    assert not isinstance(results[2], Exception)
+    assert sorted(ids) == ["I1", "I2"]
+
+
+def test_a_full_batch_does_not_wait_for_the_window():
+    async def run():
+        engine, _ = await _engine()
+        writer = GroupCommitter(engine, "test", window=60, max_rows=4)
+        await asyncio.wait_for(
+            asyncio.gather(
+                writer.submit(_registration(1)), writer.submit(_registration(2))
+            ),
+            timeout=5,
+        )
+        pending = asyncio.create_task(writer.submit(_registration(3)))
+        await asyncio.sleep(0.05)
+        waiting = not pending.done()
+        await writer.close()
+        await pending
+        await engine.dispose()
+        return waiting
+
+    assert asyncio.run(run())
@@ -0,0 +1,147 @@
+# tests/test_idempotency.py
+import asyncio
+
+import httpx
+from fastapi import FastAPI, Request
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.idempotency.middleware import IdempotencyMiddleware
+from app.idempotency.store import (
+    DatabaseIdempotencyStore,
+    InMemoryIdempotencyStore,
+    StoredResponse,
+)
+
+
+def _app(store=None):
+    app = FastAPI()
+    app.state.calls = 0
+    release = asyncio.Event()
+
+    @app.post("/items")
+    async def create(request: Request):
+        app.state.calls += 1
+        body = await request.json()
+        if body.get("slow"):
+            await release.wait()
+        if body.get("fail"):
+            raise RuntimeError("boom")
+        return {"call": app.state.calls}
+
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=store or InMemoryIdempotencyStore(),
+        routes={("POST", "/items")},
+    )
+    return app, release
+
+
+def _client(app):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def test_replays_stored_response_without_rerunning_handler():
+    async def scenario():
+        app, _ = _app()
+        async with _client(app) as client:
+            headers = {"idempotency-key": "k1", "authorization": "Bearer a"}
+            first = await client.post("/items", json={}, headers=headers)
+            second = await client.post("/items", json={}, headers=headers)
+            other_caller = await client.post(
+                "/items",
+                json={},
+                headers={"idempotency-key": "k1", "authorization": "Bearer b"},
+            )
+            mismatch = await client.post("/items", json={"x": 1}, headers=headers)
+            no_key = await client.post("/items", json={})
+        return app, first, second, other_caller, mismatch, no_key
+
+    app, first, second, other_caller, mismatch, no_key = asyncio.run(scenario())
+
+    assert first.json() == second.json() == {"call": 1}
+    assert second.headers["idempotent-replayed"] == "true"
+    assert other_caller.json() == {"call": 2}
+    assert mismatch.status_code == 422
+    assert no_key.json() == {"call": 3}
+    assert app.state.calls == 3
+
+
+def test_coalesces_in_flight_duplicates():
+    async def scenario():
+        app, release = _app()
+        async with _client(app) as client:
+            headers = {"idempotency-key": "k2"}
+            requests = [
+                asyncio.create_task(
+                    client.post("/items", json={"slow": True}, headers=headers)
+                )
+                for _ in range(5)
+            ]
+            await asyncio.sleep(0.05)
+            release.set()
+            responses = await asyncio.gather(*requests)
+        return app, responses
+
+    app, responses = asyncio.run(scenario())
+
+    assert app.state.calls == 1
+    assert all(r.json() == {"call": 1} for r in responses)
+
+
+def test_server_errors_are_not_stored():
+    async def scenario():
+        app, _ = _app()
+        async with _client(app) as client:
+            headers = {"idempotency-key": "k3"}
+            failed = await client.post("/items", json={"fail": True}, headers=headers)
+            retried = await client.post("/items", json={"fail": True}, headers=headers)
+        return app, failed, retried
+
+    app, failed, retried = asyncio.run(scenario())
+
+    assert failed.status_code == retried.status_code == 500
+    assert app.state.calls == 2
+
+
+def test_database_store_claims_each_key_once():
+    now = [1000.0]
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        store = DatabaseIdempotencyStore(engine, clock=lambda: now[0])
+        response = StoredResponse("f", 201, [(b"x-a", b"1")], b"{}")
+        steps = [await store.reserve("k", 60), await store.reserve("k", 60)]
+        await store.complete("k", response, ttl=3600)
+        await store.release("k")  # a stored response is not a claim
+        steps += [await store.get("k"), await store.reserve("k", 60)]
+        await store.reserve("lapsed", 60)
+        now[0] += 120
+        steps.append(await store.reserve("lapsed", 60))
+        now[0] += 3600
+        steps += [await store.get("k"), await store.reserve("k", 60)]
+        await engine.dispose()
+        return steps, response
+
+    steps, response = asyncio.run(scenario())
+
+    assert steps == [True, False, response, False, True, None, True]
+
+
+def test_database_store_replays_across_workers():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        workers = [_app(DatabaseIdempotencyStore(engine))[0] for _ in range(2)]
+        headers = {"idempotency-key": "k4"}
+        responses = []
+        for app in workers:
+            async with _client(app) as client:
+                responses.append(await client.post("/items", json={}, headers=headers))
+        await engine.dispose()
+        return workers, responses
+
+    workers, (first, second) = asyncio.run(scenario())
+
+    assert [app.state.calls for app in workers] == [1, 0]
+    assert first.json() == second.json() == {"call": 1}
+    assert second.headers["idempotent-replayed"] == "true"
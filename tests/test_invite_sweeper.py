@@ -0,0 +1,70 @@
+# tests/test_invite_sweeper.py
+import asyncio
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.jobs.invite_sweeper import InviteSweeper, SweepTarget
+
+metadata = MetaData()
+invites = Table(
+    "organization_invites",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("status", String(16)),
+    Column("expires_at", Integer, index=True),
+)
+
+TARGET = SweepTarget(
+    kind="organization_invite",
+    table=invites,
+    expires_column="expires_at",
+    pending={"status": "pending"},
+    expired={"status": "expired"},
+)
+
+
+async def _run(batch_size: int, max_batches: int):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(
+            invites.insert(),
+            [{"id": i, "status": "pending", "expires_at": 100 + i} for i in range(7)]
+            + [
+                {"id": 10, "status": "accepted", "expires_at": 50},
+                {"id": 11, "status": "pending", "expires_at": 10_000},
+            ],
+        )
+
+    sweeper = InviteSweeper(
+        engine,
+        [TARGET],
+        batch_size=batch_size,
+        max_batches=max_batches,
+        batch_pause=0,
+        clock=lambda: 1000,
+    )
+    counts = await sweeper.run_once()
+    async with engine.connect() as conn:
+        rows = (
+            await conn.execute(
+                select(invites.c.status, func.count()).group_by(invites.c.status)
+            )
+        ).all()
+    await engine.dispose()
+    return counts, dict(rows)
+
+
+def test_expires_overdue_pending_invites_in_batches():
+    counts, statuses = asyncio.run(_run(batch_size=3, max_batches=10))
+
+    assert counts == {"organization_invite": 7}
+    assert statuses == {"expired": 7, "accepted": 1, "pending": 1}
+
+
+def test_run_is_bounded_by_max_batches():
+    counts, statuses = asyncio.run(_run(batch_size=2, max_batches=2))
+
+    assert counts == {"organization_invite": 4}
+    assert statuses["pending"] == 4
@@ -0,0 +1,88 @@
+import asyncio
+
+from app.cache.bloom import BloomFilter
+from app.cache.ttl_cache import TTLCache
+from app.invites.token_guard import InviteTokenGuard
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        bloom.add(f"hash-{i}")
+
+    assert all(bloom.might_contain(f"hash-{i}") for i in range(5000))
+    false_positives = sum(bloom.might_contain(f"other-{i}") for i in range(10000))
+    assert false_positives < 300
+
+
+def test_ttl_cache_expires_and_evicts_oldest():
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(10, max_entries=2, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    clock.now += 11
+    assert cache.get("c") is None
+
+
+def test_guard_filters_unknown_hashes_once_built():
+    clock = FakeClock()
+    guard = InviteTokenGuard(60, max_staleness_seconds=30, clock=clock)
+
+    # No filter yet: everything goes to the database
+    assert guard.might_exist("unknown")
+
+    guard.rebuild(["known"])
+    assert guard.might_exist("known")
+    assert not guard.might_exist("unknown")
+
+    guard.add(["new"])
+    assert guard.might_exist("new")
+
+    # A filter that could not be refreshed is no longer trusted
+    clock.now += 31
+    assert guard.might_exist("unknown")
+
+
+def test_negative_cache_is_cleared_when_invite_appears():
+    clock = FakeClock()
+    guard = InviteTokenGuard(60, clock=clock)
+    guard.remember_missing("h")
+
+    assert not guard.might_exist("h")
+
+    guard.add(["h"])
+    assert guard.might_exist("h")
+
+    guard.remember_missing("x")
+    clock.now += 61
+    assert guard.might_exist("x")
+
+
+def test_filter_miss_catches_up_before_rejecting():
+    guard = InviteTokenGuard(60, clock=FakeClock())
+    guard.rebuild(["known"])
+    catch_ups = []
+
+    async def catch_up():
+        catch_ups.append(1)
+        guard.add(["created-since-refresh"])
+
+    guard.attach(catch_up)
+
+    assert asyncio.run(guard.admits("created-since-refresh"))
+    assert not asyncio.run(guard.admits("unknown"))
+    assert asyncio.run(guard.admits("known"))
+    assert len(catch_ups) == 2  # only for misses
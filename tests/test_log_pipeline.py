@@ -0,0 +1,106 @@
+# tests/test_log_pipeline.py
+import io
+import json
+
+import structlog
+from structlog.contextvars import bind_contextvars, clear_contextvars, merge_contextvars
+
+from app.logs.pipeline import EventSampler, LogPipeline, parse_sample_rates
+
+
+def _logger(pipeline):
+    out = io.StringIO()
+    processors = [
+        merge_contextvars,
+        structlog.processors.add_log_level,
+        structlog.processors.JSONRenderer(),
+    ]
+    logger = structlog.wrap_logger(structlog.PrintLogger(out), processors=processors)
+    # What install() does to the global list, on a private one
+    pipeline.split(processors)
+    processors[:] = [pipeline]
+    return logger, out
+
+
+def _lines(out):
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_events_are_rendered_by_the_writer_with_call_time_context():
+    pipeline = LogPipeline(level="info")
+    logger, out = _logger(pipeline)
+    pipeline.start()
+
+    bind_contextvars(request_id="r1")
+    try:
+        logger.info("Session created", session_id="s1")
+        logger.debug("not at this level")
+    finally:
+        clear_contextvars()
+    logger.error("boom")
+    pipeline.stop()
+
+    assert _lines(out) == [
+        {
+            "request_id": "r1",
+            "session_id": "s1",
+            "event": "Session created",
+            "level": "info",
+        },
+        {"event": "boom", "level": "error"},
+    ]
+
+
+def test_sampling_keeps_the_configured_fraction_of_info_events_only():
+    sampler = EventSampler(parse_sample_rates("Health check=0.1"))
+    assert sum(sampler.keep("Health check") for _ in range(100)) == 10
+    assert all(sampler.keep("Session created") for _ in range(10))
+
+    pipeline = LogPipeline(sample_rates={"Health check": 0.0})
+    logger, out = _logger(pipeline)
+    pipeline.start()
+    logger.info("Health check")
+    logger.warning("Health check")
+    pipeline.stop()
+
+    assert [line["level"] for line in _lines(out)] == ["warning"]
+    assert pipeline.dropped["sampled"] == 1
+
+
+def test_full_queue_drops_instead_of_blocking():
+    pipeline = LogPipeline(queue_size=2)
+    logger, out = _logger(pipeline)
+
+    for i in range(5):  # writer not started yet: nothing drains the queue
+        logger.info("event", i=i)
+    assert pipeline.dropped["queue_full"] == 3
+
+    pipeline.start()
+    pipeline.stop()
+    assert [line["i"] for line in _lines(out)] == [0, 1]
+
+
+def test_call_time_processors_stay_on_the_caller_after_other_processors():
+    out = io.StringIO()
+
+    def tag(logger, method_name, event_dict):
+        event_dict["tagged"] = True
+        return event_dict
+
+    processors = [tag, merge_contextvars, structlog.processors.JSONRenderer()]
+    logger = structlog.wrap_logger(structlog.PrintLogger(out), processors=processors)
+    pipeline = LogPipeline(level="info")
+    pipeline.split(processors)
+    processors[:] = [pipeline]
+    pipeline.start()
+
+    bind_contextvars(request_id="r1")
+    try:
+        logger.info("Session created")
+    finally:
+        clear_contextvars()
+    pipeline.stop()
+
+    assert _lines(out) == [
+        {"event": "Session created", "request_id": "r1", "tagged": True}
+    ]
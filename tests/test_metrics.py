@@ -0,0 +1,109 @@
+# tests/test_metrics.py
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.metrics.dal import InstrumentedDAL
+from app.metrics.instruments import DAL_CALL_SECONDS, HTTP_REQUEST_SECONDS
+from app.metrics.middleware import MetricsMiddleware
+from app.metrics.multiprocess import merge, read_snapshots, render, write_snapshot
+from app.metrics.registry import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), (0.1, 1))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.1, route="/a")
+    histogram.observe(5, route="/a")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+def test_counter_and_callback_gauge():
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits").inc(2)
+    registry.gauge("depth", "Depth", collect=lambda: [({}, 7)])
+
+    text = registry.render()
+    assert "hits_total 2" in text
+    assert "depth 7" in text
+
+
+def test_instrumented_dal_times_coroutines_and_passes_attributes():
+    class FakeDAL:
+        model = "User"
+
+        async def get_by_id(self, user_id):
+            return {"id": user_id}
+
+    dal = InstrumentedDAL(FakeDAL())
+    before = DAL_CALL_SECONDS.count(dal="FakeDAL", method="get_by_id", outcome="ok")
+
+    assert dal.model == "User"
+    assert asyncio.run(dal.get_by_id("USR1")) == {"id": "USR1"}
+    assert (
+        DAL_CALL_SECONDS.count(dal="FakeDAL", method="get_by_id", outcome="ok")
+        == before + 1
+    )
+
+
+def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/widgets/{widget_id}")
+    async def get_widget(widget_id: str):
+        return {"id": widget_id}
+
+    client = TestClient(app)
+    client.get("/widgets/1")
+    client.get("/widgets/2")
+    client.get("/nope")
+
+    labels = {"method": "GET", "route": "/widgets/{widget_id}", "status": "200"}
+    assert HTTP_REQUEST_SECONDS.count(**labels) == 2
+    assert HTTP_REQUEST_SECONDS.count(method="GET", route="unmatched", status="404")
+
+
+def _worker_registry(hits, latency, depth):
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits", ("route",)).inc(hits, route="/a")
+    registry.histogram("latency_seconds", "Latency", (), (0.1, 1)).observe(latency)
+    registry.gauge("depth", "Depth", collect=lambda: [({}, depth)])
+    return registry
+
+
+def test_workers_snapshots_are_merged(tmp_path):
+    first = _worker_registry(hits=2, latency=0.05, depth=3)
+    second = _worker_registry(hits=5, latency=0.5, depth=4)
+    write_snapshot(str(tmp_path), first, pid=101)
+    write_snapshot(str(tmp_path), second, pid=102)
+    # Worker 103 has exited: its counts stay, its gauges go
+    write_snapshot(str(tmp_path), _worker_registry(1, 5, 9), pid=103)
+
+    snapshots = read_snapshots(str(tmp_path))
+    text = merge(first, snapshots, alive=lambda pid: pid != 103).render()
+
+    assert 'hits_total{route="/a"} 8' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert 'depth{pid="101"} 3' in text
+    assert 'depth{pid="102"} 4' in text
+    assert 'pid="103"' not in text
+
+
+def test_render_includes_this_workers_latest_counts(tmp_path):
+    registry = _worker_registry(hits=1, latency=0.05, depth=1)
+    write_snapshot(str(tmp_path), registry)
+    registry.counter("hits_total", "Hits", ("route",)).inc(route="/a")
+
+    assert 'hits_total{route="/a"} 2' in render(registry, str(tmp_path))
+    assert 'hits_total{route="/a"} 2' in render(registry, None)
@@ -0,0 +1,66 @@
+# tests/test_msgpack_codec.py
+import datetime
+import enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.api.msgpack_codec import (
+    is_msgpack,
+    model_encoder,
+    packb,
+    unpackb,
+    wants_msgpack,
+)
+
+
+class Role(enum.Enum):
+    ADMIN = "admin"
+
+
+class Profile(BaseModel):
+    id: str
+    email: str
+    role: Role = Role.ADMIN
+    created: Optional[datetime.datetime] = None
+
+
+def test_accept_negotiation():
+    assert wants_msgpack("application/msgpack")
+    assert wants_msgpack("application/json;q=0.5, application/x-msgpack")
+    assert wants_msgpack("application/msgpack, application/json")
+    assert not wants_msgpack("application/json, application/msgpack;q=0.2")
+    assert not wants_msgpack("application/msgpack;q=0")
+    assert not wants_msgpack("*/*")
+    assert not wants_msgpack(None)
+
+
+def test_content_type_detection():
+    assert is_msgpack("application/msgpack")
+    assert is_msgpack("Application/X-MsgPack; charset=binary")
+    assert not is_msgpack("application/json")
+    assert not is_msgpack(None)
+
+
+def test_models_round_trip_with_cached_encoder():
+    created = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    users = [
+        Profile(id="u1", email="a@x.io", created=created),
+        Profile(id="u2", email="b@x.io"),
+    ]
+
+    decoded = unpackb(packb({"data": users}))
+
+    assert decoded == {
+        "data": [
+            {
+                "id": "u1",
+                "email": "a@x.io",
+                "role": "admin",
+                "created": created.isoformat(),
+            },
+            {"id": "u2", "email": "b@x.io", "role": "admin", "created": None},
+        ]
+    }
+    assert model_encoder(Profile) is model_encoder(Profile)
+    assert model_encoder(dict) is None
@@ -0,0 +1,122 @@
+# tests/test_prepared_statements.py
+import asyncio
+
+import pytest
+from sqlalchemy import Column, MetaData, String, Table, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.prepared import PreparedStatementRegistry
+
+metadata = MetaData()
+users = Table(
+    "user",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("idp_uid", String),
+)
+
+
+def _by_idp_uid():
+    return select(users).where(users.c.idp_uid == bindparam("idp_uid")).limit(1)
+
+
+def test_statement_is_compiled_once_with_positional_params():
+    registry = PreparedStatementRegistry()
+    first = registry.get("user.get_by_idp_uid", _by_idp_uid)
+    second = registry.get("user.get_by_idp_uid", lambda: None)
+
+    assert first is second
+    assert "$1" in first.sql
+    assert first.positional_args({"idp_uid": "abc"}) == ["abc", 1]
+
+
+def test_non_asyncpg_driver_falls_back_to_session_execute():
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(users.insert(), [{"id": "USR1", "idp_uid": "abc"}])
+
+        registry = PreparedStatementRegistry()
+        async with AsyncSession(engine) as session:
+            hit = await registry.fetch_one(
+                session, "user.get_by_idp_uid", _by_idp_uid, idp_uid="abc"
+            )
+            miss = await registry.fetch_one(
+                session, "user.get_by_idp_uid", _by_idp_uid, idp_uid="nope"
+            )
+        return hit, miss, registry.stats()
+
+    hit, miss, stats = asyncio.run(run())
+    assert hit == {"id": "USR1", "idp_uid": "abc"}
+    assert miss is None
+    assert stats["queries"]["user.get_by_idp_uid"]["fallbacks"] == 2
+    assert stats["queries"]["user.get_by_idp_uid"]["hits"] == 0
+
+
+class InvalidCachedStatementError(Exception):
+    pass
+
+
+class FakeDriverConnection:
+    """asyncpg-shaped connection whose first cached plan has gone stale."""
+
+    def __init__(self, in_transaction):
+        self.events = []
+        self.stale = True
+        self.in_transaction = in_transaction
+
+    def is_in_transaction(self):
+        return self.in_transaction
+
+    async def prepare(self, sql):
+        self.events.append("prepare")
+        return self
+
+    async def fetchrow(self, *args):
+        self.events.append("fetch")
+        if self.stale:
+            self.stale = False
+            raise InvalidCachedStatementError("cached plan must not change")
+        return {"id": "USR1"}
+
+
+def _registry(connection):
+    registry = PreparedStatementRegistry()
+    cache = {}
+
+    async def driver_connection(session):
+        return connection, cache
+
+    registry._driver_connection = driver_connection
+    return registry, cache
+
+
+class _Session:
+    new = dirty = deleted = ()
+
+
+def _fetch(registry):
+    return registry.fetch_one(
+        _Session(), "user.get_by_idp_uid", _by_idp_uid, idp_uid="abc"
+    )
+
+
+def test_stale_plan_is_re_prepared_and_retried_outside_a_transaction():
+    connection = FakeDriverConnection(in_transaction=False)
+    registry, _ = _registry(connection)
+
+    assert asyncio.run(_fetch(registry)) == {"id": "USR1"}
+    assert connection.events == ["prepare", "fetch", "prepare", "fetch"]
+
+
+def test_stale_plan_in_a_transaction_is_dropped_for_the_next_one():
+    connection = FakeDriverConnection(in_transaction=True)
+    registry, cache = _registry(connection)
+
+    with pytest.raises(InvalidCachedStatementError):
+        asyncio.run(_fetch(registry))
+    assert cache == {}  # no savepoint per lookup; the plan is just dropped
+
+    assert asyncio.run(_fetch(registry)) == {"id": "USR1"}
+    assert connection.events == ["prepare", "fetch", "prepare", "fetch"]
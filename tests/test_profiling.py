@@ -0,0 +1,51 @@
+# tests/test_profiling.py
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.profiling.middleware import ProfilingMiddleware
+
+
+def _app(output_dir):
+    app = FastAPI()
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=0,
+        token="let-me-in",
+        interval=0.001,
+        output_dir=str(output_dir),
+    )
+
+    @app.get("/slow")
+    async def slow_endpoint():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    return app
+
+
+def test_authorised_header_writes_collapsed_profile(tmp_path):
+    client = TestClient(_app(tmp_path))
+    response = client.get(
+        "/slow", headers={"x-profile": "let-me-in", "x-request-id": "req-123"}
+    )
+
+    assert response.headers["x-profile-id"] == "req-123"
+    path = tmp_path / "req-123.folded"
+    for _ in range(100):
+        if path.exists():
+            break
+        time.sleep(0.01)
+    folded = path.read_text()
+    assert "slow_endpoint" in folded
+    assert "<await" in folded
+
+
+def test_requests_without_header_are_not_profiled(tmp_path):
+    client = TestClient(_app(tmp_path))
+    response = client.get("/slow", headers={"x-profile": "wrong"})
+
+    assert "x-profile-id" not in response.headers
+    assert list(tmp_path.iterdir()) == []
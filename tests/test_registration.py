@@ -0,0 +1,88 @@
+# tests/test_registration.py
+import asyncio
+import itertools
+
+from sqlalchemy import Integer, String, event, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.db.group_commit import GroupCommitter
+from app.invites.registration import register
+
+_ids = itertools.count(1)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Invite(Base):
+    __tablename__ = "user_invites"
+
+    id: Mapped[str] = mapped_column(
+        String(32), primary_key=True, default=lambda: f"INV{next(_ids)}"
+    )
+    token: Mapped[str] = mapped_column(String(64), unique=True)
+    email: Mapped[str] = mapped_column(String(128))
+    expiration: Mapped[int] = mapped_column(Integer)
+    redeemed: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class Outbox(Base):
+    __tablename__ = "notification_outbox"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    idempotency_key: Mapped[str] = mapped_column(String(128), unique=True)
+    aggregate_id: Mapped[str] = mapped_column(String(32))
+    accept_url: Mapped[str] = mapped_column(String(256))
+    status: Mapped[str] = mapped_column(String(16), default="pending")
+
+
+def _notification(invite):
+    return dict(
+        idempotency_key=f"email:{invite.id}",
+        aggregate_id=invite.id,
+        accept_url=f"https://app.example.com/accept-invite?token={invite.token}",
+    )
+
+
+def test_registrations_are_built_in_memory_and_written_in_one_batch():
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        statements = []
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        writer = GroupCommitter(engine, "test", window=0.01)
+        invites = await asyncio.gather(
+            *(
+                register(
+                    writer,
+                    Invite,
+                    Outbox,
+                    {"email": f"u{n}@example.com", "expiration": 100},
+                    _notification,
+                )
+                for n in range(3)
+            )
+        )
+        async with engine.connect() as conn:
+            outbox = (await conn.execute(select(Outbox.__table__))).mappings().all()
+        await engine.dispose()
+        return statements, invites, outbox
+
+    statements, invites, outbox = asyncio.run(run())
+
+    # One INSERT per table for all three registrations, then the read-back
+    assert [s.split()[0] for s in statements] == ["INSERT", "INSERT", "SELECT"]
+    assert len({invite.token for invite in invites}) == 3
+    assert all(invite.redeemed == 0 for invite in invites)
+    by_invite = {row["aggregate_id"]: row for row in outbox}
+    for invite in invites:
+        row = by_invite[invite.id]
+        assert row["accept_url"].endswith(invite.token)
+        assert row["status"] == "pending"
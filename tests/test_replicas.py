@@ -0,0 +1,120 @@
+# tests/test_replicas.py
+import asyncio
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.replicas import (
+    READ_AFTER_COOKIE,
+    READ_AFTER_HEADER,
+    ReadYourWritesMiddleware,
+    Replica,
+    ReplicaPool,
+)
+from app.db.unit_of_work import UnitOfWork
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _pool(lag: float, clock: Clock, max_lag: float = 5.0) -> ReplicaPool:
+    replicas = [
+        Replica(name=f"replica{i}", engine=create_async_engine("sqlite+aiosqlite://"))
+        for i in range(2)
+    ]
+    return ReplicaPool(replicas, max_lag=max_lag, simulated_lag=lag, clock=clock)
+
+
+async def _refresh(pool: ReplicaPool) -> None:
+    for replica in pool.replicas:
+        await pool.check(replica)
+
+
+def test_reads_go_to_primary_until_replicas_are_checked():
+    pool = _pool(lag=1.0, clock=Clock(1000.0))
+
+    assert pool.choose() == (None, "replicas_unavailable")
+
+
+def test_round_robins_over_fresh_replicas():
+    async def run():
+        pool = _pool(lag=1.0, clock=Clock(1000.0))
+        await _refresh(pool)
+        chosen = [pool.choose()[0].name for _ in range(4)]
+        await pool.dispose()
+        return chosen
+
+    assert asyncio.run(run()) == ["replica0", "replica1", "replica0", "replica1"]
+
+
+def test_lagging_replicas_fall_back_to_primary():
+    async def run():
+        pool = _pool(lag=10.0, clock=Clock(1000.0), max_lag=5.0)
+        await _refresh(pool)
+        choice = pool.choose()
+        await pool.dispose()
+        return choice
+
+    assert asyncio.run(run()) == (None, "replicas_unavailable")
+
+
+def test_read_your_writes_waits_for_replay_position():
+    async def run():
+        clock = Clock(1000.0)
+        pool = _pool(lag=2.0, clock=clock)
+        wrote_at = 1000 * 1000  # position handed out at the write
+        await _refresh(pool)
+        before = pool.choose(read_after=wrote_at)
+        clock.now = 1002.5  # the replicas have replayed past the write
+        await _refresh(pool)
+        replica, after = pool.choose(read_after=wrote_at)
+        await pool.dispose()
+        return before, after
+
+    before, after = asyncio.run(run())
+
+    assert before == (None, "read_your_writes")
+    assert after == "replica"
+
+
+def test_commit_hands_out_read_after_position():
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    async def uow():
+        async with UnitOfWork(engine) as unit:
+            yield unit
+
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/write")
+    async def write(unit: UnitOfWork = Depends(uow)):
+        await unit.commit()
+        return {}
+
+    @app.get("/read")
+    async def read_only():
+        return {}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            wrote = await client.post("/write")
+            read = await client.get("/read")
+        await engine.dispose()
+        return wrote, read
+
+    wrote, read = asyncio.run(run())
+
+    position = wrote.headers[READ_AFTER_HEADER]
+    assert int(position) > 0
+    assert f"{READ_AFTER_COOKIE}={position}" in wrote.headers["set-cookie"]
+    assert READ_AFTER_HEADER not in read.headers
@@ -0,0 +1,302 @@
+# tests/test_resilience.py
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.unit_of_work import UnitOfWork
+from app.resilience.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    DependencySaturatedError,
+    DependencyTimeoutError,
+)
+from app.resilience.budget import (
+    LatencyBudgetMiddleware,
+    _deadline,
+    budget_for,
+    call_timeout,
+    parse_budgets,
+    remaining,
+    statement_timeout_ms,
+)
+from app.resilience.dependencies import ExternalDependency
+from app.resilience.threads import BoundedExecutor
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock):
+    return CircuitBreaker("dep", failure_threshold=2, recovery_seconds=10, clock=clock)
+
+
+def test_opens_after_consecutive_failures_and_probes_when_half_open():
+    clock = Clock()
+    breaker = _breaker(clock)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.on_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 10
+
+    clock.now = 10
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()  # the single probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.on_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 20
+    breaker.before_call()
+    breaker.on_success()
+    assert breaker.state == CLOSED
+
+
+def test_success_resets_the_consecutive_failure_count():
+    breaker = _breaker(Clock())
+    breaker.on_failure()
+    breaker.on_success()
+    breaker.on_failure()
+    assert breaker.state == CLOSED
+
+
+def test_dependency_times_out_counts_failures_but_not_client_errors():
+    breaker = _breaker(Clock())
+    dependency = ExternalDependency(
+        "dep", 0.01, breaker, is_failure=lambda e: not isinstance(e, ValueError)
+    )
+
+    async def bad_input():
+        raise ValueError("invalid token")
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await dependency.call("verify", bad_input)
+        assert breaker.state == CLOSED
+        for _ in range(2):
+            with pytest.raises(DependencyTimeoutError):
+                await dependency.call("verify", hang)
+        with pytest.raises(CircuitOpenError):
+            await dependency.call("verify", bad_input)
+
+    asyncio.run(scenario())
+
+
+def test_call_timeouts_are_capped_by_the_request_budget():
+    budgets = parse_budgets("/api/=5,/api/auth/=2")
+    assert budget_for("/api/auth/exchange", budgets, 10) == 2
+    assert budget_for("/api/user/", budgets, 10) == 5
+    assert budget_for("/metrics", budgets, 10) == 10
+
+    assert call_timeout(3) == 3  # outside a request
+    token = _deadline.set(0.0)  # monotonic deadline long past
+    try:
+        assert call_timeout(3) == 0
+        dependency = ExternalDependency("dep", 3, _breaker(Clock()))
+
+        async def never_called():
+            raise AssertionError
+
+        with pytest.raises(DependencyTimeoutError):
+            asyncio.run(dependency.call("op", never_called))
+        assert dependency.breaker._failures == 0
+    finally:
+        _deadline.reset(token)
+
+
+def test_hung_blocking_calls_fill_only_their_own_threads():
+    threads = BoundedExecutor("dep", max_workers=2)
+    breaker = CircuitBreaker("dep", failure_threshold=5, clock=Clock())
+    dependency = ExternalDependency("dep", 0.01, breaker)
+    release = threading.Event()
+
+    async def scenario():
+        # Two calls time out but keep their threads until the call returns
+        for _ in range(2):
+            with pytest.raises(DependencyTimeoutError):
+                await dependency.call("verify", lambda: threads.run(release.wait))
+        with pytest.raises(DependencySaturatedError):
+            await dependency.call("verify", lambda: threads.run(lambda: "ok"))
+        # Failing fast neither counts against the breaker nor resets it
+        assert breaker._failures == 2
+        # The default executor is free for everything else
+        assert await asyncio.to_thread(lambda: "free") == "free"
+        release.set()
+        for _ in range(100):
+            try:
+                return await threads.run(lambda: "ok")
+            except DependencySaturatedError:
+                await asyncio.sleep(0.01)
+
+    try:
+        assert asyncio.run(scenario()) == "ok"
+    finally:
+        release.set()
+
+
+class Channel:
+    """An ASGI server side: scripted client messages, recorded responses."""
+
+    def __init__(self, disconnect_after=None):
+        self.sent = []
+        self.disconnect_after = disconnect_after
+        self._reads = 0
+
+    async def receive(self):
+        self._reads += 1
+        if self._reads == 1:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        if self.disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    @property
+    def status(self):
+        return next(m["status"] for m in self.sent if "status" in m)
+
+
+def _scope(path="/api/auth/session", headers=()):
+    return {"type": "http", "method": "GET", "path": path, "headers": list(headers)}
+
+
+async def _respond(send, status=200, body=b"ok"):
+    await send({"type": "http.response.start", "status": status, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+def test_client_header_can_only_shorten_the_budget():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(remaining())
+        await _respond(send)
+
+    middleware = LatencyBudgetMiddleware(app, budgets=[("/api/", 2.0)])
+
+    async def scenario():
+        for value in (b"500", b"60000", b"junk"):
+            scope = _scope(headers=[(b"x-request-timeout-ms", value)])
+            await middleware(scope, Channel().receive, Channel().send)
+
+    asyncio.run(scenario())
+
+    assert 0.4 < seen[0] <= 0.5
+    assert 1.9 < seen[1] <= 2.0 and 1.9 < seen[2] <= 2.0
+
+
+def test_expired_deadline_cancels_the_handler_and_answers_504():
+    events = []
+
+    async def app(scope, receive, send):
+        await receive()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        await _respond(send)
+
+    channel = Channel()
+    middleware = LatencyBudgetMiddleware(app, budgets=[("/api/", 0.05)])
+    asyncio.run(middleware(_scope(), channel.receive, channel.send))
+
+    assert events == ["cancelled"]
+    assert channel.status == 504
+
+
+def test_client_disconnect_cancels_the_handler():
+    events = []
+
+    async def app(scope, receive, send):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+    channel = Channel(disconnect_after=0.02)
+    middleware = LatencyBudgetMiddleware(app, budgets=[("/api/", 5.0)])
+    asyncio.run(middleware(_scope(), channel.receive, channel.send))
+
+    assert events == ["cancelled"]
+    assert channel.sent == []  # nobody left to answer
+
+
+def test_work_after_a_complete_response_is_not_cancelled():
+    events = []
+
+    async def app(scope, receive, send):
+        assert (await receive())["type"] == "http.request"  # buffered body
+        await _respond(send)
+        await asyncio.sleep(0.1)  # background task outliving budget and client
+        events.append("finished")
+
+    channel = Channel(disconnect_after=0.01)
+    middleware = LatencyBudgetMiddleware(app, budgets=[("/api/", 0.05)])
+    asyncio.run(middleware(_scope(), channel.receive, channel.send))
+
+    assert events == ["finished"]
+    assert channel.status == 200
+
+
+def test_handler_is_not_cancelled_once_its_unit_of_work_committed():
+    events = []
+
+    async def app(scope, receive, send):
+        await receive()
+        async with UnitOfWork(scope["engine"]) as uow:
+            await uow.session.execute(text("SELECT 1"))
+            await uow.commit()
+        await asyncio.sleep(0.1)  # post-commit tail outliving the budget
+        events.append(remaining())  # its calls get their own timeouts
+        await _respond(send)
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        channel = Channel()
+        middleware = LatencyBudgetMiddleware(app, budgets=[("/api/", 0.05)])
+        await middleware(dict(_scope(), engine=engine), channel.receive, channel.send)
+        await engine.dispose()
+        return channel
+
+    channel = asyncio.run(scenario())
+
+    assert events == [None]
+    assert channel.status == 200
+
+
+def test_statement_timeout_follows_the_remaining_budget():
+    assert statement_timeout_ms() is None  # outside a request
+    token = _deadline.set(time.monotonic() + 2)
+    try:
+        assert 1900 < statement_timeout_ms(grace_ms=100) <= 2100
+    finally:
+        _deadline.reset(token)
+    token = _deadline.set(0.0)
+    try:
+        assert statement_timeout_ms(grace_ms=100) == 100
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,48 @@
+# tests/test_server.py
+import os
+
+from app.server import cgroup_cpu_quota, share_metrics, uvicorn_options
+
+
+def test_cgroup_v2_quota(tmp_path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert cgroup_cpu_quota(tmp_path) == 1.5
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cgroup_cpu_quota(tmp_path) is None
+
+
+def test_cgroup_v1_quota(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("400000\n")
+    assert cgroup_cpu_quota(tmp_path) == 4
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    assert cgroup_cpu_quota(tmp_path) is None
+
+
+def test_no_cgroup_files(tmp_path):
+    assert cgroup_cpu_quota(tmp_path) is None
+
+
+def test_forwarded_headers_trusted_only_from_localhost_by_default():
+    options = uvicorn_options(2)
+    assert options["proxy_headers"] is True
+    assert options["forwarded_allow_ips"] == "127.0.0.1"
+
+
+def test_workers_share_a_fresh_metrics_directory(tmp_path, monkeypatch):
+    (tmp_path / "4242.json").write_text("{}")
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+    share_metrics(4)
+    assert list(tmp_path.iterdir()) == []
+    assert os.environ["METRICS_MULTIPROC_DIR"] == str(tmp_path)
+
+    monkeypatch.delenv("METRICS_MULTIPROC_DIR")
+    share_metrics(1)
+    assert "METRICS_MULTIPROC_DIR" not in os.environ
+    monkeypatch.setattr("tempfile.mkdtemp", lambda prefix: str(tmp_path / "fresh"))
+    share_metrics(2)
+    assert os.environ["METRICS_MULTIPROC_DIR"] == str(tmp_path / "fresh")
+    assert (tmp_path / "fresh").is_dir()
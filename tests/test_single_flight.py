@@ -0,0 +1,161 @@
+# tests/test_single_flight.py
+import asyncio
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.db.single_flight import SingleFlight
+
+
+class Lookup:
+    """A query that blocks until released, counting how often it ran."""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_callers_share_one_query():
+    async def run():
+        flight = SingleFlight()
+        lookup = Lookup(result={"id": "u1"})
+        tasks = [asyncio.create_task(flight.do("user", "u1", lookup)) for _ in range(5)]
+        await _settle()
+        lookup.release.set()
+        results = await asyncio.gather(*tasks)
+        return lookup.calls, results, flight.in_flight()
+
+    calls, results, in_flight = asyncio.run(run())
+
+    assert calls == 1
+    assert results == [{"id": "u1"}] * 5
+    assert in_flight == 0
+
+
+def test_different_keys_and_later_calls_query_again():
+    async def run():
+        flight = SingleFlight()
+        lookup = Lookup(result=1)
+        lookup.release.set()
+        await asyncio.gather(
+            flight.do("user", "a", lookup), flight.do("user", "b", lookup)
+        )
+        await flight.do("user", "a", lookup)
+        return lookup.calls
+
+    assert asyncio.run(run()) == 3
+
+
+def test_errors_reach_every_caller():
+    async def run():
+        flight = SingleFlight()
+        lookup = Lookup(error=RuntimeError("db down"))
+        tasks = [asyncio.create_task(flight.do("user", "u1", lookup)) for _ in range(3)]
+        await _settle()
+        lookup.release.set()
+        return lookup.calls, await asyncio.gather(*tasks, return_exceptions=True)
+
+    calls, results = asyncio.run(run())
+
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_waiters_beyond_the_bound_run_their_own_query():
+    async def run():
+        flight = SingleFlight(max_waiters=2)
+        lookup = Lookup(result=1)
+        tasks = [asyncio.create_task(flight.do("user", "u1", lookup)) for _ in range(5)]
+        await _settle()
+        lookup.release.set()
+        await asyncio.gather(*tasks)
+        return lookup.calls
+
+    # One leader, two waiters, two overflow callers
+    assert asyncio.run(run()) == 3
+
+
+def test_waiters_requery_when_the_leader_is_cancelled():
+    async def run():
+        flight = SingleFlight()
+        lookup = Lookup(result=1)
+        leader = asyncio.create_task(flight.do("user", "u1", lookup))
+        await _settle()
+        follower = asyncio.create_task(flight.do("user", "u1", lookup))
+        await _settle()
+        leader.cancel()
+        await _settle()
+        lookup.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, lookup.calls
+
+    assert asyncio.run(run()) == (1, 2)
+
+
+def test_cancelled_waiter_does_not_cancel_the_query():
+    async def run():
+        flight = SingleFlight()
+        lookup = Lookup(result=1)
+        leader = asyncio.create_task(flight.do("user", "u1", lookup))
+        await _settle()
+        follower = asyncio.create_task(flight.do("user", "u1", lookup))
+        await _settle()
+        follower.cancel()
+        await _settle()
+        lookup.release.set()
+        return await leader
+
+    assert asyncio.run(run()) == 1
+
+
+class StatementTimeout(Exception):
+    sqlstate = "57014"
+
+
+class TimesOutOnce(Lookup):
+    """The first (leading) caller runs out of time; later calls succeed."""
+
+    async def __call__(self):
+        try:
+            return await super().__call__()
+        finally:
+            self.error = None
+
+
+@pytest.mark.parametrize(
+    "timeout",
+    [
+        asyncio.TimeoutError(),
+        OperationalError("SELECT ...", {}, StatementTimeout()),
+    ],
+)
+def test_waiters_requery_when_the_leader_runs_out_of_time(timeout):
+    async def run():
+        flight = SingleFlight()
+        lookup = TimesOutOnce(result=1, error=timeout)
+        leader = asyncio.create_task(flight.do("user", "u1", lookup))
+        await _settle()
+        follower = asyncio.create_task(flight.do("user", "u1", lookup))
+        await _settle()
+        # The leader's deadline fires; the follower still has budget left
+        lookup.release.set()
+        with pytest.raises(type(timeout)):
+            await leader
+        return await follower, lookup.calls
+
+    assert asyncio.run(run()) == (1, 2)
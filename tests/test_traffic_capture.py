@@ -0,0 +1,126 @@
+# tests/test_traffic_capture.py
+import asyncio
+import json
+import os
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.capture.middleware import TrafficCaptureMiddleware
+from app.capture.recorder import CaptureRecorder, process_path
+from benchmarks.load.replay import (
+    Identity,
+    RequestBuilder,
+    compare,
+    load_records,
+    schedule,
+)
+
+
+class ListRecorder:
+    def __init__(self):
+        self.records = []
+
+    def record(self, record):
+        self.records.append(record)
+
+
+def _app(recorder):
+    app = FastAPI()
+
+    @app.post("/api/user/{user_id}")
+    async def update(user_id: str, request: Request):
+        await request.body()
+        return {"id": user_id}
+
+    app.add_middleware(TrafficCaptureMiddleware, recorder=recorder, sample_rate=1.0)
+    return app
+
+
+def test_records_sanitised_metadata_only():
+    recorder = ListRecorder()
+
+    async def run():
+        transport = httpx.ASGITransport(app=_app(recorder))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            await c.post(
+                "/api/user/USR123",
+                params={"token": "secret-value", "id": "USR123"},
+                headers={"authorization": "Bearer eyJsecret"},
+                content=b'{"name": "x"}',
+            )
+            await c.get("/nowhere/USR123", headers={"cookie": "access_token=abc"})
+
+    asyncio.run(run())
+
+    matched, unmatched = recorder.records
+    assert matched["m"] == "POST" and matched["r"] == "/api/user/{user_id}"
+    assert matched["q"] == ["id", "token"]
+    assert matched["a"] == "bearer" and matched["b"] == 13 and matched["s"] == 200
+    assert matched["o"] > 0 and matched["d"] >= 0
+    assert unmatched["r"] == "unmatched" and unmatched["a"] == "cookie"
+    serialised = json.dumps(recorder.records)
+    for secret in ("secret-value", "eyJsecret", "USR123", "abc"):
+        assert secret not in serialised
+
+
+def test_recorder_rotates_and_replay_reads_oldest_first(tmp_path):
+    path = str(tmp_path / "traffic.jsonl")
+    recorder = CaptureRecorder(path, max_bytes=200, backup_count=10)
+    for n in range(20):
+        recorder.record({"t": 1000 + n, "m": "GET", "r": "/api/user/", "q": []})
+    recorder.stop()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    records = load_records(path)
+
+    assert len(files) > 1
+    assert all(name.startswith(f"traffic.{os.getpid()}.jsonl") for name in files)
+    assert [r["t"] for r in records] == [1000 + n for n in range(20)]
+    assert [offset for offset, _ in schedule(records[:3], speed=2)] == [0, 0.5, 1.0]
+
+
+def test_replay_reads_every_worker_file(tmp_path):
+    path = str(tmp_path / "traffic.jsonl")
+    for name, t in [
+        (process_path(path, 101), 3),
+        (process_path(path, 101) + ".1", 1),
+        (process_path(path, 202), 2),
+    ]:
+        with open(name, "w") as f:
+            f.write(json.dumps({"t": t, "m": "GET", "r": "/api/user/"}) + "\n")
+    (tmp_path / "traffic.other.jsonl").write_text("not a worker file\n")
+
+    assert [r["t"] for r in load_records(path)] == [1, 2, 3]
+
+
+def test_request_stream_is_deterministic_for_a_seed():
+    identities = [Identity(f"u{i}", f"u{i}@example.com", f"USR{i}") for i in range(5)]
+    record = {"m": "POST", "r": "/api/user/{user_id}", "q": ["id", "page"], "b": 40}
+
+    def stream(seed):
+        builder = RequestBuilder(identities, seed)
+        return [builder.build(record) for _ in range(10)]
+
+    first = stream(7)
+
+    assert first == stream(7)
+    assert first != stream(8)
+    method, url, kwargs = first[0]
+    assert method == "POST" and url.startswith("/api/user/USR")
+    assert kwargs["params"]["id"] == url.rsplit("/", 1)[1]
+    assert len(kwargs["content"]) == 40
+
+
+def test_compare_flags_regressed_routes():
+    before = {"GET /a": {"p50_ms": 10.0, "p99_ms": 40.0}}
+    after = {
+        "GET /a": {"p50_ms": 10.5, "p99_ms": 80.0},
+        "GET /b": {"p50_ms": 1.0, "p99_ms": 2.0},
+    }
+
+    lines, regressed = compare(before, after, tolerance=0.25)
+
+    assert regressed
+    assert "p99 +100%" in lines[1]
+    assert "only in after" in lines[2]
@@ -0,0 +1,91 @@
+# tests/test_unit_of_work.py
+import asyncio
+
+from sqlalchemy import String, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.db.unit_of_work import UnitOfWork
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Widget(Base):
+    __tablename__ = "widget"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(32))
+
+
+class WidgetDAL:
+    """Mimics a platform_common DAL that commits after every write."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, name: str) -> Widget:
+        widget = Widget(name=name)
+        self.session.add(widget)
+        await self.session.commit()
+        return widget
+
+
+async def _engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINT; let
+    # SQLAlchemy emit BEGIN itself (the recipe from the SQLAlchemy docs).
+    @event.listens_for(engine.sync_engine, "connect")
+    def _connect(dbapi_connection, _record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+async def _count(engine) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count(Widget.id)))).scalar_one()
+
+
+def test_dals_share_one_session():
+    async def run():
+        engine = await _engine()
+        async with UnitOfWork(engine) as uow:
+            assert uow.get(WidgetDAL) is uow.get(WidgetDAL)
+            assert uow.get(WidgetDAL).session is uow.session
+
+    asyncio.run(run())
+
+
+def test_commit_persists_all_writes():
+    async def run():
+        engine = await _engine()
+        async with UnitOfWork(engine) as uow:
+            await uow.get(WidgetDAL).create("a")
+            await uow.get(WidgetDAL).create("b")
+            await uow.commit()
+        return await _count(engine)
+
+    assert asyncio.run(run()) == 2
+
+
+def test_exit_without_commit_rolls_back_dal_commits():
+    async def run():
+        engine = await _engine()
+        try:
+            async with UnitOfWork(engine) as uow:
+                await uow.get(WidgetDAL).create("a")
+                raise ValueError("boom")
+        except ValueError:
+            pass
+        return await _count(engine)
+
+    assert asyncio.run(run()) == 0
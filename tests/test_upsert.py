@@ -0,0 +1,131 @@
+# tests/test_upsert.py
+import asyncio
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    select,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import registry
+
+from app.db.upsert import idp_user_upsert, insert_values, upsert_idp_user
+
+metadata = MetaData()
+users = Table(
+    "users",
+    metadata,
+    Column("id", String(32), primary_key=True),
+    Column("idp_uid", String(64), unique=True, nullable=False),
+    Column("email", String(128), nullable=False),
+    Column("is_verified", Boolean, nullable=False, default=False),
+    Column("deleted_at", Integer),
+)
+
+
+def _values(id, uid, verified):
+    return {
+        "id": id,
+        "idp_uid": uid,
+        "email": f"{uid}@example.com",
+        "is_verified": verified,
+        "deleted_at": None,
+    }
+
+
+async def _engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    return engine
+
+
+def test_creates_then_finds_then_verifies():
+    async def run():
+        engine = await _engine()
+        async with engine.begin() as conn:
+            created = await upsert_idp_user(conn, users, _values("U1", "fb1", False))
+            # Second login: a new candidate id, but the existing row comes back
+            found = await upsert_idp_user(conn, users, _values("U2", "fb1", False))
+            verified = await upsert_idp_user(conn, users, _values("U3", "fb1", True))
+            again = await upsert_idp_user(conn, users, _values("U4", "fb1", True))
+            count = len((await conn.execute(select(users.c.id))).all())
+        await engine.dispose()
+        return created, found, verified, again, count
+
+    created, found, verified, again, count = asyncio.run(run())
+
+    assert (created.row["id"], created.created, created.newly_verified) == (
+        "U1",
+        True,
+        False,
+    )
+    assert (found.row["id"], found.created, found.newly_verified) == (
+        "U1",
+        False,
+        False,
+    )
+    assert verified.row["is_verified"] and verified.newly_verified
+    assert again.row["id"] == "U1" and not again.newly_verified
+    assert count == 1
+
+
+def test_never_downgrades_and_skips_deleted_users():
+    async def run():
+        engine = await _engine()
+        async with engine.begin() as conn:
+            await conn.execute(users.insert(), _values("U1", "fb1", True))
+            deleted = dict(_values("U2", "fb2", False), deleted_at=123)
+            await conn.execute(users.insert(), deleted)
+            kept = await upsert_idp_user(conn, users, _values("U3", "fb1", False))
+            gone = await upsert_idp_user(conn, users, _values("U4", "fb2", True))
+            still_deleted = await conn.scalar(
+                select(users.c.is_verified).where(users.c.id == "U2")
+            )
+        await engine.dispose()
+        return kept, gone, still_deleted
+
+    kept, gone, still_deleted = asyncio.run(run())
+
+    assert kept.row["is_verified"] and not kept.created
+    assert gone is None
+    assert still_deleted is False
+
+
+def test_postgres_statement_is_a_single_round_trip():
+    statement = idp_user_upsert(users, _values("U1", "fb1", True))
+    sql = " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+
+    assert sql.startswith("WITH upserted AS (INSERT INTO users")
+    assert "ON CONFLICT (idp_uid) DO UPDATE SET is_verified = true" in sql
+    assert "(xmax = 0) AS created" in sql
+    assert "UNION ALL" in sql
+
+
+def test_insert_values_leave_server_defaults_to_the_database():
+    audited = Table(
+        "audited",
+        MetaData(),
+        Column("id", String(32), primary_key=True),
+        Column("name", String(64)),
+        Column("created_at", Integer, server_default=func.now()),
+    )
+
+    class Audited:
+        def __init__(self, **fields):
+            self.id = "A1"  # stands in for a model's Python-side id default
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    registry().map_imperatively(Audited, audited)
+
+    table, values = insert_values(Audited(name="x"))
+
+    assert table is audited
+    assert values == {"id": "A1", "name": "x"}
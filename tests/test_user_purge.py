@@ -0,0 +1,188 @@
+# tests/test_user_purge.py
+import asyncio
+
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.jobs.user_purge import (
+    DELETE,
+    DETACH,
+    UserPurger,
+    create_table,
+    enqueue_purge,
+    purge_jobs,
+    purge_steps,
+)
+
+metadata = MetaData()
+users = Table(
+    "users",
+    metadata,
+    Column("id", String(32), primary_key=True),
+    Column("deleted_at", Integer),
+)
+sessions = Table(
+    "user_sessions",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", String(32), ForeignKey("users.id"), nullable=False),
+)
+user_invites = Table(
+    "user_invites",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("invited_by", String(32), ForeignKey("users.id"), nullable=True),
+)
+invites = Table(
+    "organization_invites",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("invited_by", String(32), ForeignKey("users.id"), nullable=True),
+)
+memberships = Table(
+    "organization_members",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", String(32), nullable=False),
+)
+# Another service's table in the same MetaData: never purged from here
+organizations = Table(
+    "organizations",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("owner_id", String(32), ForeignKey("users.id"), nullable=False),
+)
+
+
+def _steps():
+    return purge_steps(sessions, user_invites, invites, memberships)
+
+
+def test_purges_only_the_listed_tables():
+    steps = {(s.table.name, s.column): s.action for s in _steps()}
+
+    assert steps == {
+        ("user_sessions", "user_id"): DELETE,
+        ("user_invites", "invited_by"): DETACH,
+        ("organization_invites", "invited_by"): DETACH,
+        ("organization_members", "user_id"): DELETE,
+    }
+
+
+async def _setup():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(users.insert(), [{"id": "gone"}, {"id": "kept"}])
+        await conn.execute(
+            sessions.insert(),
+            [{"id": i, "user_id": "gone"} for i in range(7)]
+            + [{"id": 100, "user_id": "kept"}],
+        )
+        await conn.execute(
+            invites.insert(),
+            [{"id": 1, "invited_by": "gone"}, {"id": 2, "invited_by": "kept"}],
+        )
+        await conn.execute(
+            memberships.insert(),
+            [{"id": 1, "user_id": "gone"}, {"id": 2, "user_id": "kept"}],
+        )
+        await conn.execute(user_invites.insert(), [{"id": 1, "invited_by": "gone"}])
+        await conn.execute(organizations.insert(), [{"id": 1, "owner_id": "gone"}])
+    async with engine.begin() as conn:
+        await create_table(conn)
+        await enqueue_purge(conn, "gone", now=1000)
+        await enqueue_purge(conn, "gone", now=1001)  # repeated delete
+    return engine
+
+
+def _purger(engine, max_batches: int) -> UserPurger:
+    return UserPurger(
+        engine,
+        users,
+        _steps(),
+        batch_size=3,
+        max_batches=max_batches,
+        batch_pause=0,
+        clock=lambda: 2000,
+    )
+
+
+async def _state(engine):
+    async with engine.connect() as conn:
+        return {
+            "users": sorted((await conn.execute(select(users.c.id))).scalars()),
+            "sessions": len((await conn.execute(select(sessions))).all()),
+            "invites": dict((await conn.execute(select(invites))).all()),
+            "members": len((await conn.execute(select(memberships))).all()),
+            "user_invites": dict((await conn.execute(select(user_invites))).all()),
+            "organizations": len((await conn.execute(select(organizations))).all()),
+            "jobs": [
+                dict(row) for row in (await conn.execute(select(purge_jobs))).mappings()
+            ],
+        }
+
+
+def test_purges_dependents_in_batches_then_the_user():
+    async def run():
+        engine = await _setup()
+        counts = await _purger(engine, max_batches=100).run_once()
+        state = await _state(engine)
+        await engine.dispose()
+        return counts, state
+
+    counts, state = asyncio.run(run())
+
+    assert counts == {"users_purged": 1, "failed": 0, "rows_purged": 10}
+    assert state["users"] == ["kept"]
+    assert state["sessions"] == 1
+    assert state["user_invites"] == {1: None}
+    assert state["invites"] == {1: None, 2: "kept"}
+    assert state["members"] == 1
+    assert state["organizations"] == 1
+    [job] = state["jobs"]
+    assert job["status"] == "done"
+    assert job["rows_purged"] == 10
+
+
+def test_resumes_with_recorded_progress_across_runs():
+    async def run():
+        engine = await _setup()
+        # Three batches per run: the seven sessions take three on their own
+        first = await _purger(engine, max_batches=3).run_once()
+        midway = await _state(engine)
+        # Re-checks the sessions (one empty batch), then the three other tables
+        second = await _purger(engine, max_batches=4).run_once()
+        done = await _state(engine)
+        await engine.dispose()
+        return first, midway, second, done
+
+    first, midway, second, done = asyncio.run(run())
+
+    assert first == {"users_purged": 0, "failed": 0, "rows_purged": 7}
+    [job] = midway["jobs"]
+    assert job["status"] == "pending"
+    assert job["rows_purged"] == 7
+    assert midway["users"] == ["gone", "kept"]
+
+    assert second == {"users_purged": 1, "failed": 0, "rows_purged": 3}
+    assert done["jobs"][0]["status"] == "done"
+    assert done["users"] == ["kept"]
+
+
+def test_enqueue_keeps_the_first_job_for_a_user():
+    async def run():
+        engine = await _setup()
+        # The request path enqueues through the unit of work's session
+        async with AsyncSession(engine) as session:
+            await enqueue_purge(session, "gone", now=1002)
+            await enqueue_purge(session, "kept", now=1002)
+            await session.commit()
+        state = await _state(engine)
+        await engine.dispose()
+        return state
+
+    state = asyncio.run(run())
+
+    jobs = {job["user_id"]: job["requested_at"] for job in state["jobs"]}
+    assert jobs == {"gone": 1000, "kept": 1002}
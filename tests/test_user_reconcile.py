@@ -0,0 +1,249 @@
+# tests/test_user_reconcile.py
+import asyncio
+import itertools
+
+from sqlalchemy import Boolean, Column, Integer, MetaData, String, Table, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.jobs.user_reconcile import (
+    Checkpoint,
+    RateLimiter,
+    SourceUser,
+    UserPage,
+    UserReconciler,
+)
+
+metadata = MetaData()
+users = Table(
+    "users",
+    metadata,
+    Column("id", String(32), primary_key=True),
+    Column("idp_uid", String(64), unique=True, nullable=False),
+    Column("email", String(128), unique=True, nullable=False),
+    Column("username", String(64)),
+    Column("is_verified", Boolean, nullable=False, default=False),
+    Column("deleted_at", Integer),
+)
+
+_ids = itertools.count(1)
+
+
+def make_row(user: SourceUser) -> dict:
+    return {
+        "id": f"USR{next(_ids)}",
+        "idp_uid": user.uid,
+        "email": user.email,
+        "username": user.email.split("@")[0],
+        "is_verified": user.verified,
+        "deleted_at": None,
+    }
+
+
+class FakeUserSource:
+    def __init__(self, users: list[SourceUser], page_size: int):
+        self.users = users
+        self.page_size = page_size
+        self.requested: list = []
+
+    async def fetch_page(self, page_token, max_results):
+        self.requested.append(page_token)
+        start = int(page_token or 0)
+        end = start + self.page_size
+        return UserPage(
+            users=self.users[start:end],
+            next_page_token=str(end) if end < len(self.users) else None,
+        )
+
+
+SOURCE = [
+    SourceUser("fb-new", "new@example.com", email_verified=True),
+    # Not verified by Firebase: left for its first exchange to verify
+    SourceUser("fb-oauth", "gh@example.com"),
+    SourceUser("fb-moved", "moved-new@example.com", email_verified=True),
+    SourceUser("fb-verify", "verify@example.com", email_verified=True),
+    SourceUser("fb-same", "same@example.com", email_verified=True),
+    SourceUser("fb-disabled", "off@example.com", disabled=True),
+    SourceUser("fb-noemail", None),
+    SourceUser("fb-deleted", "deleted@example.com", email_verified=True),
+    # Email already used by another account: conflicts, the rest still land
+    SourceUser("fb-clash", "same@example.com", email_verified=True),
+]
+
+EXISTING = [
+    ("USRm", "fb-moved", "moved-old@example.com", True, None),
+    ("USRv", "fb-verify", "verify@example.com", False, None),
+    ("USRs", "fb-same", "same@example.com", True, None),
+    ("USRd", "fb-deleted", "deleted@example.com", False, 123),
+]
+
+
+async def _engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(
+            users.insert(),
+            [
+                dict(
+                    id=id,
+                    idp_uid=uid,
+                    email=email,
+                    username=email.split("@")[0],
+                    is_verified=verified,
+                    deleted_at=deleted_at,
+                )
+                for id, uid, email, verified, deleted_at in EXISTING
+            ],
+        )
+    return engine
+
+
+async def _rows(engine):
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(users.c.idp_uid, users.c.email, users.c.is_verified)
+        )
+        return {uid: (email, verified) for uid, email, verified in result}
+
+
+def _reconciler(engine, source, **kwargs):
+    return UserReconciler(
+        engine,
+        users,
+        source,
+        make_row,
+        page_size=3,
+        batch_size=2,
+        limiter=RateLimiter(0),
+        **kwargs,
+    )
+
+
+def test_upserts_missing_and_stale_users_and_announces_them(tmp_path):
+    events = []
+
+    async def publish(event, row):
+        events.append((event, row["idp_uid"]))
+
+    async def run():
+        engine = await _engine()
+        source = FakeUserSource(SOURCE, page_size=3)
+        stats = await _reconciler(
+            engine,
+            source,
+            checkpoint=Checkpoint(str(tmp_path / "cp.json")),
+            publish=publish,
+        ).run()
+        rows = await _rows(engine)
+        await engine.dispose()
+        return stats, rows
+
+    stats, rows = asyncio.run(run())
+
+    assert stats["created"] == 3  # fb-new, fb-oauth, fb-clash (conflicted)
+    assert stats["conflicts"] == 1
+    assert stats["events_failed"] == 0
+    assert stats["email_updated"] == 1
+    assert stats["verified"] == 1
+    assert stats["unchanged"] == 1
+    assert stats["skipped"] == 3
+    assert rows["fb-new"] == ("new@example.com", True)
+    assert rows["fb-oauth"] == ("gh@example.com", False)
+    assert rows["fb-moved"] == ("moved-new@example.com", True)
+    assert rows["fb-verify"] == ("verify@example.com", True)
+    assert rows["fb-deleted"] == ("deleted@example.com", False)
+    assert "fb-clash" not in rows and "fb-disabled" not in rows
+    assert sorted(events) == [
+        ("user_updated", "fb-moved"),
+        ("user_updated", "fb-oauth"),
+        ("user_verified", "fb-new"),
+        ("user_verified", "fb-verify"),
+    ]
+
+
+def test_resumes_from_checkpoint(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "cp.json"))
+
+    async def run():
+        engine = await _engine()
+        first = FakeUserSource(SOURCE, page_size=3)
+        await _reconciler(engine, first, checkpoint=checkpoint).run(max_pages=1)
+        saved = checkpoint.load()
+        second = FakeUserSource(SOURCE, page_size=3)
+        stats = await _reconciler(engine, second, checkpoint=checkpoint).run()
+        await engine.dispose()
+        return saved, second.requested, stats
+
+    saved, requested, stats = asyncio.run(run())
+
+    assert saved["page_token"] == "3" and not saved["done"]
+    assert requested == ["3", "6"]  # the first page was not fetched again
+    assert checkpoint.load()["done"]
+    assert stats["created"] == 3  # counts cover the whole pass
+
+
+def test_failed_announcements_are_retried_on_the_next_run(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "cp.json"))
+    events = []
+
+    async def publish(event, row):
+        if row["idp_uid"] == "fb-new" and not events:
+            events.append(("failed", row["idp_uid"]))
+            raise ConnectionError("pubsub down")
+        events.append((event, row["idp_uid"]))
+
+    async def run():
+        engine = await _engine()
+        source = FakeUserSource(SOURCE[:1], page_size=3)
+        first = await _reconciler(
+            engine, source, checkpoint=checkpoint, publish=publish
+        ).run()
+        saved = checkpoint.load()
+        second = await _reconciler(
+            engine, source, checkpoint=checkpoint, publish=publish
+        ).run()
+        await engine.dispose()
+        return first, saved, second
+
+    first, saved, second = asyncio.run(run())
+
+    assert first["events_failed"] == 1
+    assert saved["unannounced"] == {"fb-new": "user_verified"}
+    # Already written, so the second pass only has the announcement to make
+    assert second["unchanged"] == 1
+    assert events == [("failed", "fb-new"), ("user_verified", "fb-new")]
+    assert checkpoint.load()["unannounced"] == {}
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    async def run():
+        engine = await _engine()
+        stats = await _reconciler(
+            engine, FakeUserSource(SOURCE, page_size=3), dry_run=True
+        ).run()
+        rows = await _rows(engine)
+        await engine.dispose()
+        return stats, rows
+
+    stats, rows = asyncio.run(run())
+
+    assert stats["created"] == 3
+    assert len(rows) == len(EXISTING)
+
+
+def test_rate_limiter_spaces_calls():
+    now = [0.0]
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    async def run():
+        limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            await limiter.wait()
+
+    asyncio.run(run())
+
+    assert slept == [0.25, 0.25]
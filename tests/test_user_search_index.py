@@ -0,0 +1,60 @@
+from app.search.user_index import UserSearchIndex
+
+
+def _ids(results):
+    return [u.id for u in results]
+
+
+def _index():
+    index = UserSearchIndex()
+    index.bulk_load(
+        [
+            ("u1", "alice@example.com", "alice"),
+            ("u2", "alicia.keys@music.io", "akeys"),
+            ("u3", "bob@example.com", "bobby"),
+            ("u4", "malice@villains.org", "mal"),
+        ]
+    )
+    index.mark_ready()
+    return index
+
+
+def test_ranks_exact_then_prefix_then_substring():
+    index = _index()
+
+    assert _ids(index.search("alice")) == ["u1", "u4"]
+    assert _ids(index.search("ALI")) == ["u1", "u2", "u4"]
+    assert _ids(index.search("ali", limit=2)) == ["u1", "u2"]
+
+
+def test_short_queries_use_prefixes_and_domains_are_searchable():
+    index = _index()
+
+    assert _ids(index.search("b")) == ["u3"]
+    assert _ids(index.search("example.com")) == ["u1", "u3"]
+    assert index.search("zzz") == []
+
+
+def test_updates_and_removals_replace_old_terms():
+    index = _index()
+
+    index.upsert("u3", "robert@example.com", "rob")
+    index.remove("u1")
+
+    assert index.search("bob") == []
+    assert _ids(index.search("rob")) == ["u3"]
+    assert _ids(index.search("alice")) == ["u4"]
+    assert len(index) == 3
+
+
+def test_scan_does_not_overwrite_live_writes():
+    index = UserSearchIndex()
+    index.upsert("u1", "new@example.com", "new")
+    index.remove("u2")
+
+    index.bulk_load([("u1", "old@example.com", "old"), ("u2", "gone@x.io", "gone")])
+    index.mark_ready()
+
+    assert _ids(index.search("new")) == ["u1"]
+    assert index.search("old") == []
+    assert index.search("gone") == []